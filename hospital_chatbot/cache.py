@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+프로세스 공유 LRU 캐시와 동시 요청 병합
+여러 세션이 같은 검색어(거즈, 격리실 등)를 반복할 때 계산 결과를 재사용하고,
+같은 순간에 들어온 동일한 계산은 한 번만 수행하여 결과를 나눠 가짐
+"""
+
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """최근 사용 순서를 유지하는 스레드 안전 LRU 캐시 (적중/미적중/제거 횟수 집계)"""
+    
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key, default=None):
+        """값 조회 - 적중하면 가장 최근 사용으로 이동"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+    
+    def peek(self, key, default=None):
+        """값 조회 - 집계와 사용 순서를 바꾸지 않음 (같은 요청 안에서 다시 확인할 때)"""
+        with self._lock:
+            return self._data.get(key, default)
+    
+    def put(self, key, value):
+        """값 저장 - 용량을 넘으면 가장 오래 사용하지 않은 항목 제거"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """전체 비우기 (데이터 재로드 시 무효화)"""
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self):
+        """상태 확인용 집계"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else None
+            }
+    
+    def snapshot(self):
+        """메모리 보고용 사본 (잠금을 잡고 복사 - 다른 스레드가 바꾸는 중인 딕셔너리를 순회하지 않도록)"""
+        with self._lock:
+            return OrderedDict(self._data)
+    
+    def __len__(self):
+        return len(self._data)
+
+class SingleFlight:
+    """
+    동일 키의 동시 계산 병합
+    같은 키로 진행 중인 계산이 있으면 새로 계산하지 않고 그 결과(또는 예외)를 기다려 공유
+    """
+    
+    class _Call:
+        """진행 중인 계산 하나"""
+        __slots__ = ("done", "result", "error", "waiters")
+        
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+            self.waiters = 0
+    
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0    # 실제로 계산한 횟수
+        self.shared = 0      # 다른 요청의 계산 결과를 공유받은 횟수
+    
+    def do(self, key, function):
+        """key에 대한 function() 결과 반환 (동시 요청은 한 번만 실행)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = self._Call()
+                self.executed += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = function()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # 완료된 계산은 즉시 제거 - 이후 요청은 캐시 또는 새 계산 사용
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+    
+    def snapshot(self):
+        """메모리 보고용 진행 중인 계산 사본 (잠금을 잡고 복사)"""
+        with self._lock:
+            return dict(self._calls)
+    
+    def stats(self):
+        """상태 확인용 집계"""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "shared": self.shared
+            }
+
+# 자유텍스트 검색 결과 캐시 ((카탈로그 버전, 정규화 검색어, 개수) → 점수순 결과 목록)
+search_cache = LRUCache(maxsize=512)
+
+# 검색·카탈로그 생성 등 비용이 큰 계산의 동시 요청 병합 (키 첫 요소로 종류 구분)
+single_flight = SingleFlight()
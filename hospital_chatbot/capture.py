@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+실제 트래픽 기록 (선택 기능, server.py --capture)
+채팅 요청의 익명화한 메시지, 세션 순서, 도착 간격을 gzip JSON lines 파일에 기록하여
+replay.py로 로컬 서버에 같은 부하 모양을 다시 재현
+- 세션 ID는 기록마다 1, 2, 3 … 번호로 바꾸고 (서버 세션 ID는 남기지 않음)
+- 이름 설정 문장("제 이름은 김철수")의 이름, 환자·님·선생님 앞의 세 글자 이름("김철수 환자"),
+  6자리 이상 숫자(환자·전화 번호), 전화번호, 이메일은 가림
+  (3~5자리 내선 번호는 연락처 조회 재현을 위해 유지)
+- 이름 가림은 모양으로만 판별하므로 완전한 익명화는 아님 - 두 글자·네 글자 이름, 흔하지 않은 성,
+  호칭 없이 쓴 이름은 그대로 남으므로 기록 파일은 원본 대화와 같은 수준으로 관리
+"""
+
+import gzip
+import json
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+
+CAPTURE_VERSION = 1
+
+# 이름 설정 문장 (hierarchical_chatbot._handle_name_setting과 같은 패턴) - 뒤가 이름 한 단어일 때만 가림
+# ("나는 간호사인데 ekg 수리 어디"처럼 문장이 이어지면 질문이므로 그대로 기록해 같은 검색을 재현)
+NAME_PATTERNS = ("제 이름은", "내 이름은", "이름:", "name is", "나는")
+NAME_ENDINGS = ("입니다", "이에요", "예요", ".", "!")
+MAX_NAME_LENGTH = 10
+NAME_PLACEHOLDER = "사용자"
+
+# 호칭 앞의 사람 이름 ("김철수 환자", "이영희님", "박민수 선생님") - 흔한 성으로 시작하는 세 글자만
+# (격리실 환자, 간호사님처럼 호칭 앞에 오는 일반 단어는 성으로 시작하지 않아 가리지 않음)
+COMMON_SURNAMES = "김이박최정강조윤장임한오서신권황안송류유전홍고문양손배백허남심노하곽성차주우구민진나지엄채원천방공현함변염여추도"
+PERSON_NAME_PATTERN = re.compile(rf"(?<![가-힣])[{COMMON_SURNAMES}][가-힣]{{2}}(?=\s*(?:환자|님|선생님|씨))")
+PERSON_PLACEHOLDER = "홍길동"
+
+PHONE_PATTERN = re.compile(r"\d{2,4}-\d{3,4}-\d{4}")
+LONG_NUMBER_PATTERN = re.compile(r"\d{6,}")
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+def _is_name(rest):
+    """이름 설정 문장 뒤가 이름 한 단어인지 ("김철수입니다" → True, "간호사인데 ekg 수리 어디" → False)"""
+    name = rest.strip()
+    for ending in NAME_ENDINGS:
+        name = name.replace(ending, "")
+    name = name.strip()
+    return bool(name) and " " not in name and len(name) <= MAX_NAME_LENGTH
+
+def anonymize_message(text):
+    """개인정보로 볼 수 있는 부분을 같은 모양의 값으로 바꾼 메시지"""
+    text_lower = text.lower()
+    for pattern in NAME_PATTERNS:
+        index = text_lower.find(pattern)
+        if index >= 0 and _is_name(text[index + len(pattern):]):
+            text = f"{text[:index + len(pattern)]} {NAME_PLACEHOLDER}"
+            break
+    
+    text = PERSON_NAME_PATTERN.sub(PERSON_PLACEHOLDER, text)
+    text = EMAIL_PATTERN.sub("user@example.com", text)
+    text = PHONE_PATTERN.sub(lambda match: re.sub(r"\d", "0", match.group(0)), text)
+    return LONG_NUMBER_PATTERN.sub(lambda match: "0" * len(match.group(0)), text)
+
+def read_capture(path):
+    """
+    기록 파일 읽기
+    Returns:
+        tuple: (헤더 dict, 도착 시각순 요청 기록 목록)
+    """
+    header, records = {}, []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if "capture" in entry:
+                header = entry
+            else:
+                records.append(entry)
+    records.sort(key=lambda entry: entry["t"])
+    return header, records
+
+class TrafficCapture:
+    """
+    채팅 요청 기록기
+    요청 스레드는 대기열에 넣기만 하고, 기록 스레드가 묶어서 gzip 멤버 하나씩 파일 끝에 추가
+    (프로세스가 중간에 끝나도 앞의 묶음은 그대로 읽을 수 있음)
+    기록 항목: t(기록 시작 후 도착 시각 ms), p(경로), s(세션 번호), m(메시지), n(네비게이션), tn(테넌트)
+    """
+    
+    def __init__(self, path, flush_interval=1.0, maxsize=10000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize)
+        self._sessions = {}   # 서버 세션 ID → 세션 번호
+        self._lock = threading.Lock()
+        self.started_at = time.perf_counter()
+        self.recorded = 0
+        self.dropped = 0
+        # 기록 시각이 0부터 다시 시작하므로 기존 파일에 이어 쓰지 않음 (있으면 FileExistsError)
+        header = {"capture": CAPTURE_VERSION, "started": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        with open(path, "xb") as f:
+            f.write(gzip.compress((json.dumps(header) + "\n").encode("utf-8")))
+        threading.Thread(target=self._run, name="traffic-capture", daemon=True).start()
+    
+    def _session_number(self, session_id):
+        """서버 세션 ID의 기록용 번호 (처음 보는 세션이면 새 번호)"""
+        if not session_id:
+            return None
+        with self._lock:
+            number = self._sessions.get(session_id)
+            if number is None:
+                number = self._sessions[session_id] = len(self._sessions) + 1
+            return number
+    
+    def record(self, arrived_at, path, message, session_id=None, navigation=None, tenant_id=None):
+        """
+        요청 하나 기록 (기다리지 않음)
+        Args:
+            arrived_at (float): 연결 접수 시각 (perf_counter 기준)
+            session_id (str): 응답한 서버 세션 ID (새 세션이면 응답에서 받은 ID)
+        """
+        entry = {
+            "t": round(((arrived_at or time.perf_counter()) - self.started_at) * 1000, 1),
+            "p": path,
+            "s": self._session_number(session_id),
+            "m": anonymize_message(message)
+        }
+        if navigation:
+            entry["n"] = navigation
+        if tenant_id:
+            entry["tn"] = tenant_id
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _run(self):
+        """기록 루프 - flush_interval 동안 모은 기록을 gzip 멤버 하나로 추가"""
+        while True:
+            batch = [self._queue.get()]
+            time.sleep(self.flush_interval)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                data = "".join(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n" for entry in batch)
+                with open(self.path, "ab") as f:
+                    f.write(gzip.compress(data.encode("utf-8")))
+                self.recorded += len(batch)
+            except Exception as e:
+                print(f"트래픽 기록 오류: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def flush(self, timeout=3.0):
+        """대기열의 기록을 모두 쓸 때까지 대기 (서버 종료 시)"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+    
+    def stats(self):
+        """상태 확인용 집계"""
+        return {
+            "path": self.path,
+            "recorded": self.recorded,
+            "sessions": len(self._sessions),
+            "pending": self._queue.qsize(),
+            "dropped": self.dropped
+        }
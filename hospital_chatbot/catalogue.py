@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+클라이언트용 카탈로그 번들
+HIERARCHICAL_WORK_DATA의 모든 네비게이션 화면을 미리 렌더링하여
+버전(ETag)이 붙은 압축 JSON으로 제공
+"""
+
+import gzip
+import hashlib
+import json
+from excel_data import EMERGENCY_KEYWORDS
+from chatbot_engine import get_engine
+from cache import single_flight
+from tenants import DEFAULT_TENANT
+
+# 테넌트별 번들 캐시 (테넌트 ID → (엔진, 번들), 엔진이 바뀌지 않는 한 한 번만 생성)
+_bundles = {}
+
+def _screen(rendered):
+    """(message, category, buttons) 튜플을 화면 딕셔너리로 변환"""
+    message, category, buttons = rendered
+    return {"message": message, "category": category, "buttons": buttons}
+
+def build_catalogue_screens(engine):
+    """카테고리 > 세부항목 > 세부항목2 전체 화면 트리 생성 (엔진의 사전 렌더링 화면 사용)"""
+    categories = {}
+    for category_name, category_data in engine.data.items():
+        subcategories = {}
+        for subcat_key, subcat_data in category_data["subcategories"].items():
+            items = {}
+            for item_key in subcat_data["sub_items"]:
+                items[item_key] = _screen(engine.screen("item", category_name, subcat_key, item_key))
+            
+            subcategories[subcat_key] = {
+                "name": subcat_data["name"],
+                "screen": _screen(engine.screen("subcategory", category_name, subcat_key)),
+                "items": items
+            }
+        
+        categories[category_name] = {
+            "screen": _screen(engine.screen("category", category_name)),
+            "subcategories": subcategories
+        }
+    
+    # 오프라인에서도 응급 안내는 즉시 표시할 수 있도록 포함
+    emergency = {keyword: _screen(engine.screen("emergency", keyword)) for keyword in EMERGENCY_KEYWORDS}
+    
+    return {
+        "main": _screen(engine.screen("main")),
+        "categories": categories,
+        "emergency": emergency
+    }
+
+def get_catalogue_bundle(tenant_id=DEFAULT_TENANT):
+    """
+    테넌트 카탈로그 번들 반환 (최초 호출 시 생성)
+    Returns:
+        dict: version, etag, body(JSON bytes), gzip_body(압축 bytes)
+    Raises:
+        KeyError: 등록되지 않은 테넌트
+    """
+    engine = get_engine(tenant_id)
+    cached = _bundles.get(tenant_id)
+    if cached is not None and cached[0] is engine:
+        return cached[1]
+    
+    # 카탈로그 내용이 같은 테넌트가 이미 만든 번들은 그대로 공유
+    for other_engine, other_bundle in list(_bundles.values()):
+        if other_engine.version == engine.version:
+            bundle = other_bundle
+            break
+    else:
+        # 동시에 들어온 첫 요청들은 번들 생성 한 번을 함께 기다림
+        bundle = single_flight.do(("catalogue", engine.version), lambda: _build_bundle(engine))
+    
+    _bundles[tenant_id] = (engine, bundle)
+    return bundle
+
+def _build_bundle(engine):
+    """엔진의 사전 렌더링 화면으로 번들 생성"""
+    screens = build_catalogue_screens(engine)
+    # 버전은 화면 내용의 해시 - 데이터가 같으면 재시작해도 동일한 ETag
+    content = json.dumps(screens, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    version = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+    
+    body = json.dumps(
+        {"version": version, **screens},
+        ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+    
+    return {
+        "version": version,
+        "etag": f'"{version}"',
+        "body": body,
+        "gzip_body": gzip.compress(body, compresslevel=9, mtime=0)
+    }
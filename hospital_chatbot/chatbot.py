@@ -2,29 +2,25 @@
 """
 차치업무 도우미 챗봇 - 로직 모듈
 키워드 매칭 기반의 간단한 챗봇 구현
+매칭과 화면은 공유 엔진(chatbot_engine)을 사용
 """
 
 import random
 from datetime import datetime
 from excel_data import (
-    HIERARCHICAL_WORK_DATA, WORK_CATEGORIES, GREETING_RESPONSES, 
-    DEFAULT_RESPONSES, FAQ_DATA, TIME_GREETINGS, EMERGENCY_KEYWORDS, 
-    DEPARTMENT_CONTACTS
+    WORK_CATEGORIES, GREETING_RESPONSES, DEFAULT_RESPONSES
 )
+from chatbot_engine import get_engine, new_navigation
 
 class SimpleHospitalChatbot:
     """차치업무 도우미 챗봇 클래스"""
     
-    def __init__(self):
+    def __init__(self, engine=None):
         """챗봇 초기화"""
+        self.engine = engine or get_engine()
         self.conversation_history = []
         self.user_name = None
-        self.current_navigation = {
-            "level": 0,  # 0: 메인 카테고리 선택, 1: 세부항목 선택, 2: 세부항목2 선택
-            "main_category": None,      # 선택된 메인 카테고리 (예: "수리")
-            "subcategory_key": None,    # 선택된 세부항목 키 (예: "의료기기")
-            "sub_item_key": None        # 선택된 세부항목2 키
-        }
+        self.current_navigation = new_navigation()
         print("🏥 차치업무 도우미 챗봇이 시작되었습니다!")
     
     def process_message(self, user_input):
@@ -92,33 +88,19 @@ class SimpleHospitalChatbot:
     
     def _check_emergency(self, text):
         """응급상황 키워드 확인"""
-        for keyword, response in EMERGENCY_KEYWORDS.items():
-            if keyword in text:
-                return self._format_response(
-                    f"🚨 {response}", 
-                    "응급상황", 
-                    priority="HIGH"
-                )
+        keyword = self.engine.find_emergency(text)
+        if keyword:
+            message, _, _ = self.engine.screen("emergency", keyword)
+            return self._format_response(message, "응급상황", priority="HIGH")
         return None
     
     def _is_greeting(self, text):
         """인사말 감지"""
-        greetings = ["안녕", "hello", "hi", "반가워", "처음", "시작", "헬로"]
-        return any(greeting in text for greeting in greetings)
+        return self.engine.is_greeting(text)
     
     def _get_greeting_response(self):
         """시간대별 인사말 생성"""
-        current_hour = datetime.now().hour
-        
-        if 6 <= current_hour < 12:
-            time_greeting = TIME_GREETINGS["morning"]
-        elif 12 <= current_hour < 18:
-            time_greeting = TIME_GREETINGS["afternoon"]
-        elif 18 <= current_hour < 22:
-            time_greeting = TIME_GREETINGS["evening"]
-        else:
-            time_greeting = TIME_GREETINGS["night"]
-        
+        time_greeting = self.engine.time_greeting()
         base_greeting = random.choice(GREETING_RESPONSES)
         
         if self.user_name:
@@ -161,23 +143,17 @@ class SimpleHospitalChatbot:
     
     def _search_faq(self, text):
         """FAQ 검색"""
-        for keyword, answer in FAQ_DATA.items():
-            if keyword in text:
-                return f"📋 {answer}"
+        answer = self.engine.find_faq(text)
+        if answer:
+            return f"📋 {answer}"
         return None
     
     def _search_contacts(self, text):
-        """부서 연락처 검색"""
-        if "연락처" in text or "번호" in text or "내선" in text:
-            for department, contact in DEPARTMENT_CONTACTS.items():
-                if department in text:
-                    return f"📞 {department}: {contact}"
-            
-            # 전체 연락처 목록 요청
-            if "전체" in text or "모든" in text:
-                contact_list = "\n".join([f"{dept}: {num}" for dept, num in DEPARTMENT_CONTACTS.items()])
-                return f"📞 부서별 연락처:\n{contact_list}"
-        
+        """부서 연락처 검색 (엔진 연락처 색인 - 이름 일부, 초성, 내선 역조회, "전체 연락처")"""
+        records = self.engine.find_contacts(text)
+        if records:
+            message, _, _ = self.engine.render_contacts(text, records)
+            return message
         return None
     
     def _match_category(self, text):
@@ -221,195 +197,50 @@ class SimpleHospitalChatbot:
     
     def _handle_navigation(self, text):
         """계층적 네비게이션 처리"""
+        command = self.engine.navigation_command(text)
+        
         # 메인 메뉴로 돌아가기
-        if any(keyword in text for keyword in ["메인", "처음", "홈", "돌아가기", "초기화"]):
-            self.current_navigation = {
-                "level": 0,
-                "category": None,
-                "subcategory": None,
-                "sub_item": None
-            }
-            return self._show_main_categories()
+        if command == "main":
+            self.current_navigation = new_navigation()
+            return self._show_screen(self.engine.screen("main"))
         
         # 뒤로 가기
-        if any(keyword in text for keyword in ["뒤로", "이전", "상위"]):
-            return self._navigate_back()
-        
-        # 카테고리 선택 (Level 1)
-        if self.current_navigation["level"] == 0:
-            for category_key, category_data in HIERARCHICAL_WORK_DATA.items():
-                if any(keyword in text for keyword in category_data["keywords"]) or category_data["name"] in text:
-                    self.current_navigation = {
-                        "level": 1,
-                        "category": category_key,
-                        "subcategory": None,
-                        "sub_item": None
-                    }
-                    return self._show_subcategories(category_key)
-        
-        # 세부항목 선택 (Level 2)
-        elif self.current_navigation["level"] == 1:
-            category_key = self.current_navigation["category"]
-            category_data = HIERARCHICAL_WORK_DATA[category_key]
-            
-            for subcat_key, subcat_data in category_data["subcategories"].items():
-                if any(keyword in text for keyword in subcat_data["keywords"]) or subcat_data["name"] in text:
-                    self.current_navigation["subcategory"] = subcat_key
-                    self.current_navigation["level"] = 2
-                    return self._show_sub_items(category_key, subcat_key)
+        if command == "back":
+            self.current_navigation, screen = self.engine.back(self.current_navigation)
+            return self._show_screen(screen)
         
-        # 세부항목2 선택 (Level 3)
-        elif self.current_navigation["level"] == 2:
-            category_key = self.current_navigation["category"]
-            subcat_key = self.current_navigation["subcategory"]
-            subcat_data = HIERARCHICAL_WORK_DATA[category_key]["subcategories"][subcat_key]
-            
-            for item_key, item_data in subcat_data["sub_items"].items():
-                if item_data["name"] in text or any(keyword in text for keyword in item_data["name"].split()):
-                    self.current_navigation["sub_item"] = item_key
-                    self.current_navigation["level"] = 3
-                    return self._show_item_details(category_key, subcat_key, item_key)
+        # 현재 단계에서 항목 선택
+        selection = self.engine.select(self.current_navigation, text)
+        if selection:
+            self.current_navigation, screen = selection
+            return self._show_screen(screen)
         
         return None
     
-    def _show_main_categories(self):
-        """메인 카테고리 목록 표시"""
-        categories = []
-        for key, data in HIERARCHICAL_WORK_DATA.items():
-            categories.append(f"• {data['name']}: {data['description']}")
-        
-        response = f"""🏥 차치업무 카테고리 선택
-
-{chr(10).join(categories)}
-
-원하는 카테고리를 선택해주세요.
-예: "수리", "물품", "멸균품거즈", "격리실" 등"""
-        
-        return self._format_response(response, "메인메뉴")
-    
-    def _show_subcategories(self, category_key):
-        """세부항목 목록 표시"""
-        category_data = HIERARCHICAL_WORK_DATA[category_key]
-        subcategories = []
-        
-        for key, data in category_data["subcategories"].items():
-            subcategories.append(f"• {data['name']}: {data['description']}")
-        
-        response = f"""📂 {category_data['name']} - 세부항목
-
-{chr(10).join(subcategories)}
-
-원하는 세부항목을 선택해주세요.
-💡 "뒤로" 또는 "메인"으로 이전 단계로 이동 가능합니다."""
-        
-        return self._format_response(response, f"{category_data['name']}_세부항목")
-    
-    def _show_sub_items(self, category_key, subcat_key):
-        """세부항목2 목록 표시"""
-        category_data = HIERARCHICAL_WORK_DATA[category_key]
-        subcat_data = category_data["subcategories"][subcat_key]
-        items = []
-        
-        for key, data in subcat_data["sub_items"].items():
-            items.append(f"• {data['name']}")
-        
-        response = f"""📋 {category_data['name']} > {subcat_data['name']}
-
-{chr(10).join(items)}
-
-원하는 항목을 선택해주세요.
-💡 "뒤로" 또는 "메인"으로 이전 단계로 이동 가능합니다."""
-        
-        return self._format_response(response, f"{subcat_data['name']}_항목목록")
-    
-    def _show_item_details(self, category_key, subcat_key, item_key):
-        """세부항목2 상세 정보 표시"""
-        item_data = HIERARCHICAL_WORK_DATA[category_key]["subcategories"][subcat_key]["sub_items"][item_key]
-        
-        response = f"""📝 {item_data['name']} 상세 정보
-
-🔧 요청방법:
-{item_data['request_method']}
-
-{item_data['contact']}
-
-💡 추가정보: {item_data['free_text']}
-
-💬 다른 항목을 보려면 "뒤로", 처음부터 시작하려면 "메인"을 입력하세요."""
-        
-        return self._format_response(response, f"{item_data['name']}_상세")
-    
-    def _navigate_back(self):
-        """이전 단계로 이동"""
-        if self.current_navigation["level"] == 3:
-            # 세부항목2에서 세부항목으로
-            self.current_navigation["level"] = 2
-            self.current_navigation["sub_item"] = None
-            return self._show_sub_items(
-                self.current_navigation["category"], 
-                self.current_navigation["subcategory"]
-            )
-        elif self.current_navigation["level"] == 2:
-            # 세부항목에서 항목으로
-            self.current_navigation["level"] = 1
-            self.current_navigation["subcategory"] = None
-            return self._show_subcategories(self.current_navigation["category"])
-        elif self.current_navigation["level"] == 1:
-            # 항목에서 메인으로
-            self.current_navigation = {
-                "level": 0,
-                "category": None,
-                "subcategory": None,
-                "sub_item": None
-            }
-            return self._show_main_categories()
-        else:
-            # 이미 메인 메뉴
-            return self._show_main_categories()
+    def _show_screen(self, screen):
+        """엔진이 미리 렌더링한 화면을 응답으로 변환 (버튼 없이 텍스트만 사용)"""
+        message, category, _ = screen
+        return self._format_response(message, category)
     
     def _search_free_text(self, text):
         """자유입력 텍스트 검색 (2글자 이상)"""
-        if len(text.strip()) < 2:
-            return None
-        
-        search_results = []
-        
-        # 모든 계층 데이터에서 free_text 필드 검색
-        for category_key, category_data in HIERARCHICAL_WORK_DATA.items():
-            for subcat_key, subcat_data in category_data["subcategories"].items():
-                for item_key, item_data in subcat_data["sub_items"].items():
-                    # free_text에서 2글자 이상 매칭되는 부분 찾기
-                    if self._text_similarity(text, item_data["free_text"]) >= 2:
-                        search_results.append({
-                            "category": category_data["name"],
-                            "subcategory": subcat_data["name"],
-                            "item_name": item_data["name"],
-                            "request_method": item_data["request_method"],
-                            "contact": item_data["contact"],
-                            "free_text": item_data["free_text"],
-                            "match_score": self._text_similarity(text, item_data["free_text"])
-                        })
+        search_results = self.engine.search(text.strip())
         
         if search_results:
-            # 매칭 점수순으로 정렬
-            search_results.sort(key=lambda x: x["match_score"], reverse=True)
-            
-            # 상위 3개 결과만 표시
-            top_results = search_results[:3]
-            
             response_parts = ["🔍 검색 결과:\n"]
             
-            for i, result in enumerate(top_results, 1):
+            for i, result in enumerate(search_results, 1):
+                item_data = result["item"]
                 response_parts.append(f"""
-{i}. **{result['item_name']}**
+{i}. **{item_data['name']}**
    📂 {result['category']} > {result['subcategory']}
    
    🔧 요청방법:
-   {result['request_method']}
+   {item_data['request_method']}
    
-   {result['contact']}
+   {item_data['contact']}
    
-   💡 {result['free_text']}
+   💡 {item_data['free_text']}
    {"="*50}""")
             
             response_parts.append("\n💬 더 자세한 내용을 원하시면 해당 카테고리로 이동해주세요.")
@@ -417,22 +248,6 @@ class SimpleHospitalChatbot:
             return self._format_response("\n".join(response_parts), "검색결과")
         
         return None
-    
-    def _text_similarity(self, search_text, target_text):
-        """텍스트 유사도 계산 (2글자 이상 연속 매칭)"""
-        search_text = search_text.lower().strip()
-        target_text = target_text.lower()
-        
-        max_match_length = 0
-        
-        # 2글자 이상의 연속 매칭 찾기
-        for i in range(len(search_text) - 1):
-            for length in range(2, len(search_text) - i + 1):
-                substring = search_text[i:i + length]
-                if substring in target_text:
-                    max_match_length = max(max_match_length, length)
-        
-        return max_match_length
 
     def get_help_message(self):
         """도움말 메시지"""
@@ -463,25 +278,24 @@ class SimpleHospitalChatbot:
     
     def _get_current_location(self):
         """현재 네비게이션 위치 표시"""
-        if self.current_navigation["level"] == 0:
+        navigation = self.current_navigation
+        if navigation["level"] == 0:
             return "메인 메뉴"
-        elif self.current_navigation["level"] == 1:
-            category_name = HIERARCHICAL_WORK_DATA[self.current_navigation["category"]]["name"]
-            return f"{category_name}"
-        elif self.current_navigation["level"] == 2:
-            category_name = HIERARCHICAL_WORK_DATA[self.current_navigation["category"]]["name"]
-            subcat_name = HIERARCHICAL_WORK_DATA[self.current_navigation["category"]]["subcategories"][self.current_navigation["subcategory"]]["name"]
-            return f"{category_name} > {subcat_name}"
-        elif self.current_navigation["level"] == 3:
-            category_name = HIERARCHICAL_WORK_DATA[self.current_navigation["category"]]["name"]
-            subcat_name = HIERARCHICAL_WORK_DATA[self.current_navigation["category"]]["subcategories"][self.current_navigation["subcategory"]]["name"]
-            item_name = HIERARCHICAL_WORK_DATA[self.current_navigation["category"]]["subcategories"][self.current_navigation["subcategory"]]["sub_items"][self.current_navigation["sub_item"]]["name"]
-            return f"{category_name} > {subcat_name} > {item_name}"
         
-        return "알 수 없음"
+        data = self.engine.data
+        category_data = data[navigation["main_category"]]
+        parts = [category_data["name"]]
+        
+        if navigation["subcategory_key"]:
+            subcat_data = category_data["subcategories"][navigation["subcategory_key"]]
+            parts.append(subcat_data["name"])
+            if navigation["sub_item_key"]:
+                parts.append(subcat_data["sub_items"][navigation["sub_item_key"]]["name"])
+        
+        return " > ".join(parts)
 
-# 챗봇 인스턴스를 전역으로 사용할 수 있도록 생성
-chatbot_instance = SimpleHospitalChatbot()
+# 외부 호출용 인스턴스 (import 시점이 아니라 첫 호출 시 생성)
+_chatbot_instance = None
 
 def get_chatbot_response(user_input):
     """
@@ -491,7 +305,10 @@ def get_chatbot_response(user_input):
     Returns:
         dict: 챗봇 응답
     """
-    return chatbot_instance.process_message(user_input)
+    global _chatbot_instance
+    if _chatbot_instance is None:
+        _chatbot_instance = SimpleHospitalChatbot()
+    return _chatbot_instance.process_message(user_input)
 
 if __name__ == "__main__":
     # 테스트용 대화형 실행
@@ -0,0 +1,790 @@
+# -*- coding: utf-8 -*-
+"""
+차치업무 도우미 공유 매칭 엔진
+응급/인사/FAQ/네비게이션 판별, 자유텍스트 검색, 미리 렌더링된 화면을
+한 곳에 모아 두고 SimpleHospitalChatbot, HierarchicalHospitalChatbot이 함께 사용
+"""
+
+import hashlib
+import heapq
+import json
+from datetime import datetime
+from excel_data import FAQ_DATA, TIME_GREETINGS, EMERGENCY_KEYWORDS, DEPARTMENT_CONTACTS
+from synonym_data import SYNONYM_GROUPS
+from search_index import (FuzzyIndex, ChosungIndex, PrefixTrie, JamoSubstringIndex, SynonymTable, decompose_jamo,
+                          is_chosung_query, tokenize)
+from vector_search import HashedNgramIndex
+from contacts import ContactIndex
+from cache import search_cache, single_flight
+from emergency import emergency_message
+from tenants import DEFAULT_TENANT, string_pool, tenant_data
+from tracing import tracer
+
+# 판별용 키워드
+GREETING_KEYWORDS = ["안녕", "hello", "hi", "하이", "헬로", "반가", "처음", "시작"]
+MAIN_MENU_KEYWORDS = ["메인", "처음", "홈", "돌아가기", "초기화"]
+BACK_KEYWORDS = ["뒤로", "이전", "상위", "back"]
+
+NAV_BUTTONS = [
+    {"text": "🔙 뒤로", "action": "nav", "value": "back"},
+    {"text": "🏠 메인", "action": "nav", "value": "main"}
+]
+
+HELP_TEXT = """
+🏥 삼성서울병원 중앙간호사 도우미 사용법
+
+📋 주요 기능:
+• 3단계 계층 네비게이션: 간호업무 → 세부업무 → 상세절차
+• 자유텍스트 검색: 2글자 이상 입력으로 관련 간호업무 검색
+• 실시간 버튼 네비게이션: 단계별 선택 버튼 제공
+
+🎯 사용 방법:
+1. 간호업무 카테고리 선택 (수리, 물품, 제제약/수액 등)
+2. 세부간호업무 선택 (의료기기, 일반적인 수리 업무 등)
+3. 상세절차 선택하여 최종 정보 확인
+
+💬 네비게이션 명령어:
+• "메인", "처음", "홈" - 메인 카테고리로 이동
+• "뒤로", "이전" - 이전 단계로 이동
+
+🔍 검색 기능:
+• 2글자 이상 입력하면 자동 검색
+• 예: "수리", "거즈", "격리실" 등
+• 초성만 입력해도 검색: "ㄱㄹㅅ" → 격리실
+
+🆘 응급상황:
+• "응급", "화재", "코드블루" 등의 키워드 사용
+
+📞 주요 연락처:
+• 의공기술실: T.9233
+• 정보지원팀: T.3217
+• 통신실: T.3333
+""".strip()
+
+def new_navigation():
+    """초기 네비게이션 상태 (0: 메인, 1: 세부항목, 2: 세부항목2)"""
+    return {
+        "level": 0,
+        "main_category": None,
+        "subcategory_key": None,
+        "sub_item_key": None
+    }
+
+# 자유텍스트 검색에 사용할 최대 입력 길이 (match_score는 입력 길이에 비례해 느려짐)
+MAX_SEARCH_QUERY_LENGTH = 100
+
+# 검색 결과 화면 카테고리 (스트리밍 응답은 결과 단락보다 먼저 전송)
+SEARCH_RESULTS_CATEGORY = "검색결과"
+
+# 동의어·약어 (자동완성·오타 허용·입력 중 검색 색인에는 덧붙이고, 자유텍스트 검색은 검색어 쪽에서 바꿔 검색 - 모든 테넌트 엔진이 공유)
+SYNONYMS = SynonymTable(SYNONYM_GROUPS)
+
+# 입력 중 검색 상태에 보관하는 최대 후보 수 (넘으면 보관하지 않고 다음 입력에서 색인 다시 조회)
+MAX_NARROWING_CANDIDATES = 2000
+
+def normalize_query(text):
+    """
+    검색어 정규화 (소문자, 앞뒤 공백 제거, 연속 공백은 하나로, 최대 길이 제한)
+    검색 캐시 키로도 사용
+    """
+    return " ".join(text.lower().split())[:MAX_SEARCH_QUERY_LENGTH]
+
+def match_score(search_text, target_text):
+    """
+    매칭 점수 계산 (연속 2글자 이상)
+    공유 2글자마다 2점, 이어지는 더 긴 일치마다 보너스 점수
+    두 인자 모두 소문자로 정규화된 문자열이어야 함
+    """
+    if len(search_text) < 2:
+        return 0
+    
+    score = 0
+    for i in range(len(search_text) - 1):
+        substring = search_text[i:i+2]
+        if substring in target_text:
+            score += 2
+            # 더 긴 매칭에 대해 보너스 점수
+            for j in range(3, min(len(search_text) - i + 1, 10)):
+                longer_substring = search_text[i:i+j]
+                if longer_substring in target_text:
+                    score += j - 1
+                else:
+                    break
+    
+    return score
+
+def data_version(data):
+    """계층 데이터 내용 해시 (같은 내용이면 테넌트가 달라도 같은 값)"""
+    content = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+class ChatbotEngine:
+    """카탈로그 하나에 대한 인덱스와 사전 렌더링 화면을 보관하는 공유 엔진"""
+    
+    def __init__(self, data):
+        """
+        엔진 초기화 - 인덱스와 화면을 한 번만 생성
+        Args:
+            data (dict): HIERARCHICAL_WORK_DATA 형식의 계층 데이터
+        """
+        self.data = data
+        # 카탈로그 데이터 버전 (검색 캐시 키 - 데이터가 바뀌면 이전 결과를 쓰지 않음)
+        self.version = data_version(data)
+        self._build_indexes()
+        self._build_screens()
+    
+    def _build_indexes(self):
+        """소문자 정규화된 이름/키워드/검색 대상 인덱스 생성"""
+        self.category_names = []      # (카테고리명, 소문자명)
+        self.category_keywords = []   # (카테고리명, 소문자 키워드)
+        self.subcategory_names = {}   # 카테고리명 → [(세부항목 키, 소문자명)]
+        self.sub_item_names = {}      # (카테고리명, 세부항목 키) → [(세부항목2 키, 소문자명)]
+        self.items = []               # 자유텍스트 검색 대상 세부항목2 목록
+        self.fuzzy_index = FuzzyIndex()   # 오타 허용 자모 n-gram 색인 (items 번호 기준)
+        self.narrowing_index = JamoSubstringIndex()   # 입력 중 검색용 자모 2-gram 색인 (items 번호 기준)
+        self.item_suggestions = []    # items 번호 → suggest_entries 번호
+        self.chosung_index = ChosungIndex()   # 초성 줄임말 → 화면 키
+        self.suggest_trie = PrefixTrie()      # 자동완성 접두어 → suggest_entries 번호
+        self.suggest_entries = []             # 자동완성 후보 (text, label, path, button)
+        suggest_ids = {}                      # 화면 키 → suggest_entries 번호
+        self.contact_index = ContactIndex()   # 부서 이름/초성/내선 → 연락처 기록
+        
+        for department, contact in DEPARTMENT_CONTACTS.items():
+            self.contact_index.add(f"{department} {contact}")
+
+        for category_name, category_data in self.data.items():
+            self.category_names.append((category_name, category_name.lower()))
+            self.chosung_index.add(category_name, ("category", category_name))
+            self._add_suggestion(suggest_ids, ("category", category_name),
+                                 [category_name] + category_data.get("keywords", []))
+            for keyword in category_data.get("keywords", []):
+                self.category_keywords.append((category_name, keyword.lower()))
+            
+            subcategories = []
+            for subcat_key, subcat_data in category_data["subcategories"].items():
+                subcategories.append((subcat_key, subcat_data["name"].lower()))
+                
+                # 세부항목2가 하나뿐인 세부항목은 초성 입력 시 최종 화면으로 바로 이동
+                item_keys = list(subcat_data["sub_items"])
+                if len(item_keys) == 1:
+                    subcat_node = ("item", category_name, subcat_key, item_keys[0])
+                else:
+                    subcat_node = ("subcategory", category_name, subcat_key)
+                self.chosung_index.add(subcat_data["name"], subcat_node)
+                self._add_suggestion(suggest_ids, subcat_node,
+                                     [subcat_data["name"]] + subcat_data.get("keywords", []))
+                
+                sub_items = []
+                for item_key, item_data in subcat_data["sub_items"].items():
+                    sub_items.append((item_key, item_data["name"].lower()))
+                    item_node = ("item", category_name, subcat_key, item_key)
+                    searchable = " ".join([
+                        category_name, subcat_data["name"], item_data["name"],
+                        " ".join(subcat_data.get("keywords", [])), item_data.get("free_text", "")
+                    ]).lower()
+                    # 항목에 나오는 장비명·약어의 다른 표기를 자동완성·오타 허용·입력 중 검색 색인에 덧붙임
+                    # (자유텍스트 검색 점수는 원문으로 계산 - 동의어 글자가 다른 검색어의 순위를 바꾸지 않도록)
+                    synonyms = SYNONYMS.expand(searchable)
+                    searchable = " ".join([searchable] + synonyms)
+                    self.chosung_index.add(item_data["name"], item_node)
+                    self._add_suggestion(suggest_ids, item_node, [item_data["name"]] + synonyms)
+                    if item_data.get("contact"):
+                        self.contact_index.add(item_data["contact"], item_node, "/".join(item_node[1:]))
+                    self.fuzzy_index.add(len(self.items), searchable)
+                    self.narrowing_index.add(searchable)
+                    self.item_suggestions.append(suggest_ids[item_node])
+                    self.items.append({
+                        "category": category_name,
+                        "subcategory_key": subcat_key,
+                        "subcategory": subcat_data["name"],
+                        "item_key": item_key,
+                        "item": item_data,
+                        "free_text": item_data.get("free_text", "").lower(),
+                        "path": f"{category_name} > {subcat_data['name']} > {item_data['name']}"
+                    })
+                self.sub_item_names[(category_name, subcat_key)] = sub_items
+            
+            self.subcategory_names[category_name] = subcategories
+        
+        # 자유텍스트 검색 후보 선별용 해시 n-gram 행렬 (items 번호 기준)
+        self.vector_index = HashedNgramIndex([entry["free_text"] for entry in self.items])
+    
+    def _add_suggestion(self, suggest_ids, node, texts):
+        """자동완성 후보 등록 - 이름 전체와 이름 속 각 단어부터 시작하는 접두어로 색인"""
+        entry_id = suggest_ids.get(node)
+        if entry_id is None:
+            entry_id = len(self.suggest_entries)
+            suggest_ids[node] = entry_id
+            button = self._node_button(node)
+            self.suggest_entries.append({
+                "text": button["text"].replace("\n", " "),
+                "label": self._node_label(node),
+                "path": "/".join(node[1:]),
+                "button": button
+            })
+        
+        # "일반적인 수리 업무"는 "수리", "업무"로 입력해도 후보에 포함
+        for text in texts:
+            text_lower = text.lower()
+            self.suggest_trie.insert(text_lower, entry_id)
+            for word in tokenize(text_lower)[1:]:
+                self.suggest_trie.insert(text_lower[text_lower.find(word):], entry_id)
+    
+    def _build_screens(self):
+        """모든 고정 화면을 미리 렌더링 (message, category, buttons)"""
+        self.screens = {("main",): self._render_main_categories()}
+        for keyword in EMERGENCY_KEYWORDS:
+            self.screens[("emergency", keyword)] = self._render_emergency(keyword)
+        
+        for category_name, category_data in self.data.items():
+            self.screens[("category", category_name)] = self._render_subcategories(category_name)
+            for subcat_key, subcat_data in category_data["subcategories"].items():
+                self.screens[("subcategory", category_name, subcat_key)] = \
+                    self._render_sub_items(category_name, subcat_key)
+                for item_key in subcat_data["sub_items"]:
+                    self.screens[("item", category_name, subcat_key, item_key)] = \
+                        self._render_final_result(category_name, subcat_key, item_key)
+        
+        # 렌더링 결과도 프로세스 문자열 풀로 - 다른 테넌트의 같은 화면·버튼 문구와 공유
+        self.screens = string_pool.intern_data(self.screens)
+        self.suggest_entries = string_pool.intern_data(self.suggest_entries)
+    
+    def screen(self, *key):
+        """
+        미리 렌더링된 화면 조회
+        예: screen("main"), screen("category", "수리"), screen("item", 카테고리, 세부항목, 세부항목2)
+        """
+        return self.screens[key]
+    
+    # ---- 판별 ----
+    
+    def find_emergency(self, text_lower):
+        """응급 키워드 반환 (없으면 None)"""
+        for keyword in EMERGENCY_KEYWORDS:
+            if keyword in text_lower:
+                return keyword
+        return None
+    
+    def is_greeting(self, text_lower):
+        """인사말 감지"""
+        return any(keyword in text_lower for keyword in GREETING_KEYWORDS)
+    
+    def time_greeting(self):
+        """시간대별 인사 문구"""
+        hour = datetime.now().hour
+        if 5 <= hour < 12:
+            return TIME_GREETINGS["morning"]
+        elif 12 <= hour < 17:
+            return TIME_GREETINGS["afternoon"]
+        elif 17 <= hour < 21:
+            return TIME_GREETINGS["evening"]
+        return TIME_GREETINGS["night"]
+    
+    def find_contacts(self, text, require_intent=True, chosung=True):
+        """
+        부서 연락처 조회 ("의공 번호", "9233 어디", "ㅌㅅㅅ")
+        Returns:
+            list: 연락처 기록 (연락처를 찾는 입력이 아니거나 일치가 없으면 빈 목록)
+        """
+        return self.contact_index.lookup(text, require_intent, chosung)
+    
+    def find_faq(self, text_lower):
+        """FAQ 답변 반환 (없으면 None)"""
+        for keyword, answer in FAQ_DATA.items():
+            if keyword.lower() in text_lower:
+                return answer
+        return None
+    
+    def navigation_command(self, text_lower):
+        """네비게이션 명령어 판별 - "main", "back" 또는 None"""
+        if any(keyword in text_lower for keyword in MAIN_MENU_KEYWORDS):
+            return "main"
+        if any(keyword in text_lower for keyword in BACK_KEYWORDS):
+            return "back"
+        return None
+    
+    # ---- 계층 네비게이션 ----
+    
+    def select(self, navigation, text_lower):
+        """
+        현재 위치에서 입력에 해당하는 항목 선택
+        Args:
+            navigation (dict): 현재 네비게이션 상태 (변경하지 않음)
+            text_lower (str): 소문자 입력
+        Returns:
+            tuple: (새 네비게이션 상태, 화면) 또는 매칭 실패 시 None
+        """
+        level = navigation["level"]
+        category_name = navigation["main_category"]
+        subcat_key = navigation["subcategory_key"]
+        
+        if level == 0:
+            category_name = self._match_category(text_lower)
+            if category_name:
+                return self._navigation(1, category_name), self.screen("category", category_name)
+        elif level == 1 and category_name in self.subcategory_names:
+            for key, name_lower in self.subcategory_names[category_name]:
+                if name_lower in text_lower or text_lower in name_lower:
+                    return (self._navigation(2, category_name, key),
+                            self.screen("subcategory", category_name, key))
+        elif level == 2 and (category_name, subcat_key) in self.sub_item_names:
+            for key, name_lower in self.sub_item_names[(category_name, subcat_key)]:
+                if name_lower in text_lower or text_lower in name_lower:
+                    return (self._navigation(2, category_name, subcat_key, key),
+                            self.screen("item", category_name, subcat_key, key))
+        
+        return None
+    
+    def select_chosung(self, text):
+        """
+        초성 줄임말 입력으로 화면 선택 ("ㄱㄹㅅ" → 격리실)
+        Returns:
+            tuple: (새 네비게이션 상태 또는 None, 화면) - 후보가 여럿이면 네비게이션은 None, 화면은 선택 목록
+                   초성 입력이 아니거나 일치 항목이 없으면 None
+        """
+        if not is_chosung_query(text):
+            return None
+        
+        nodes = self.chosung_index.lookup(text)
+        if not nodes:
+            return None
+        
+        if len(nodes) == 1:
+            node = nodes[0]
+            return self._navigation(min(len(node) - 1, 2), *node[1:]), self.screen(*node)
+        
+        return None, self._render_chosung_choices(text, nodes)
+    
+    def suggest(self, prefix, limit=5, popularity=None):
+        """
+        입력 중인 접두어의 자동완성 후보
+        Args:
+            prefix (str): 입력 중인 검색어
+            limit (int): 최대 후보 수
+            popularity (dict): 화면 경로("카테고리/세부항목 키/세부항목2 키") → 조회 수
+        Returns:
+            list: 조회 수 많은 순(같으면 짧은 이름, 카탈로그 순) 후보 딕셔너리
+        """
+        prefix = prefix.strip()
+        if not prefix:
+            return []
+        
+        popularity = popularity or {}
+        entry_ids = self.suggest_trie.lookup(prefix)
+        top = heapq.nsmallest(limit, entry_ids, key=lambda entry_id: (
+            -popularity.get(self.suggest_entries[entry_id]["path"], 0),
+            len(self.suggest_entries[entry_id]["text"]),
+            entry_id
+        ))
+        return [self.suggest_entries[entry_id] for entry_id in top]
+    
+    def narrow_search(self, text, limit=3, state=None):
+        """
+        입력 중(키 입력마다) 검색 - 검색어의 모든 단어가 들어 있는 세부항목2
+        이전 입력을 이어 쓴 검색어("격리" → "격리실")는 결과가 좁혀지기만 하므로 이전 후보만 다시 확인하고,
+        지우거나 고친 입력일 때만 색인 조회
+        Args:
+            state (tuple): 같은 세션의 이전 호출이 돌려준 상태 (없으면 색인 조회)
+        Returns:
+            tuple: (자동완성 후보 형식의 결과 목록, 다음 호출에 넘길 상태)
+        """
+        query = normalize_query(text)
+        if len(query) < 2:
+            return [], None
+        
+        jamo_query = decompose_jamo(query)
+        terms = jamo_query.split()
+        incremental = (state is not None and state[0] == self.version and state[2] is not None
+                       and jamo_query.startswith(state[1]))
+        tracer.annotate(incremental=incremental)
+        if incremental:
+            candidates = self.narrowing_index.narrow(state[2], terms)
+        else:
+            candidates = self.narrowing_index.lookup(terms)
+        
+        # 후보는 모든 단어를 포함하므로 검색어 전체가 이어서 들어 있는 항목, 짧은 항목(구체적인 항목) 순
+        jamo_texts = self.narrowing_index.jamo_texts
+        top = heapq.nsmallest(limit, candidates, key=lambda item_id: (
+            jamo_query not in jamo_texts[item_id], len(jamo_texts[item_id]), item_id
+        ))
+        kept = tuple(candidates) if len(candidates) <= MAX_NARROWING_CANDIDATES else None
+        return [self.suggest_entries[self.item_suggestions[item_id]] for item_id in top], (self.version, jamo_query, kept)
+    
+    def back(self, navigation):
+        """
+        이전 단계로 이동
+        Returns:
+            tuple: (새 네비게이션 상태, 화면)
+        """
+        if navigation["level"] == 2 and navigation["main_category"] in self.data:
+            category_name = navigation["main_category"]
+            return self._navigation(1, category_name), self.screen("category", category_name)
+        return new_navigation(), self.screen("main")
+    
+    def _match_category(self, text_lower):
+        """카테고리명 → 키워드 순으로 메인 카테고리 매칭"""
+        for category_name, name_lower in self.category_names:
+            if name_lower in text_lower or text_lower in name_lower:
+                return category_name
+        for category_name, keyword in self.category_keywords:
+            if keyword in text_lower:
+                return category_name
+        return None
+    
+    def _navigation(self, level, category_name, subcat_key=None, sub_item_key=None):
+        """네비게이션 상태 딕셔너리 생성"""
+        return {
+            "level": level,
+            "main_category": category_name,
+            "subcategory_key": subcat_key,
+            "sub_item_key": sub_item_key
+        }
+    
+    # ---- 자유텍스트 검색 ----
+    
+    def search(self, text, limit=3):
+        """
+        세부항목2의 free_text에서 2글자 이상 일치 검색
+        같은 검색어가 동시에 들어오면 한 번만 계산 (교대 시간 동시 검색)
+        Returns:
+            list: 점수순 결과 (score, category, subcategory, item, path 등)
+        """
+        query = normalize_query(text)
+        if len(query) < 2:
+            return []
+        
+        key = (self.version, query, limit)
+        cached = search_cache.get(key)
+        tracer.annotate(cache_hit=cached is not None)
+        if cached is None:
+            cached = single_flight.do(("search",) + key, lambda: self._search_uncached(query, limit))
+        return list(cached)
+    
+    def _search_uncached(self, query, limit):
+        """
+        캐시에 없는 검색어 하나를 계산하여 캐시에 저장
+        앞 계산이 끝나 캐시에 넣은 직후 도착한 요청은 병합되지 않으므로 계산 전에 캐시를 다시 확인
+        """
+        cached = search_cache.peek((self.version, query, limit))
+        if cached is not None:
+            return cached
+        return self._compute_search(query, limit)
+    
+    def _compute_search(self, query, limit):
+        """검색어 하나를 계산하여 캐시에 저장 (동의어 표기로 바꾼 검색어의 후보도 함께 재채점)"""
+        variants = [query] + SYNONYMS.variants(query)
+        candidates = [candidate for row in self.vector_index.top_k_batch(variants, max(limit * 10, 50))
+                      for candidate in row]
+        results = tuple(self._rescore(query, candidates, variants)[:limit])
+        # 세션 간에 공유되므로 변경할 수 없는 튜플로 저장
+        search_cache.put((self.version, query, limit), results)
+        return results
+    
+    def search_batch(self, texts, limit=3):
+        """
+        여러 검색어를 한 번에 검색 (오프라인 평가용으로도 사용)
+        프로세스 공유 캐시에 없는 검색어만 해시 n-gram 행렬 곱으로 후보를 고른 뒤
+        match_score로 정확히 재채점
+        Returns:
+            list: 검색어별 search() 결과
+        """
+        queries = [normalize_query(text) for text in texts]
+        all_results = []
+        missing = []
+        for i, query in enumerate(queries):
+            cached = search_cache.get((self.version, query, limit)) if len(query) >= 2 else ()
+            if cached is None:
+                missing.append(i)
+            all_results.append(list(cached) if cached is not None else None)
+        
+        if not missing:
+            return all_results
+        
+        # 검색어마다 동의어 표기로 바꾼 검색어까지 한 번의 행렬 곱으로 후보 조회
+        variant_lists = [[queries[i]] + SYNONYMS.variants(queries[i]) for i in missing]
+        candidate_rows = iter(self.vector_index.top_k_batch(
+            [variant for variants in variant_lists for variant in variants], max(limit * 10, 50)
+        ))
+        for i, variants in zip(missing, variant_lists):
+            candidates = [candidate for _ in variants for candidate in next(candidate_rows)]
+            results = self._rescore(queries[i], candidates, variants)[:limit]
+            # 세션 간에 공유되므로 변경할 수 없는 튜플로 저장
+            search_cache.put((self.version, queries[i], limit), tuple(results))
+            all_results[i] = results
+        
+        return all_results
+    
+    def _rescore(self, text_lower, candidates, variants=None):
+        """
+        벡터 후보를 match_score로 재채점 (일치가 없으면 오타 허용 색인 조회)
+        Args:
+            variants (list): 검색어와 동의어 표기로 바꾼 검색어 - 항목 점수는 그중 가장 높은 점수
+        """
+        variants = variants or [text_lower]
+        results = []
+        # 후보는 카탈로그 순서로 재채점 (같은 점수는 카탈로그 순서 유지)
+        for item_id in sorted({item_id for item_id, _ in candidates}):
+            entry = self.items[item_id]
+            score = max(match_score(variant, entry["free_text"]) for variant in variants)
+            if score > 0:
+                results.append({"score": score, **entry})
+        
+        # 일치하는 글자가 없으면 오타 허용 색인 조회
+        if not results:
+            results = self.fuzzy_search(text_lower)
+        
+        # 점수순으로 정렬 (같은 점수는 카탈로그 순서 유지)
+        results.sort(key=lambda x: x["score"], reverse=True)
+        return results
+    
+    def fuzzy_search(self, text_lower):
+        """자모 n-gram 색인으로 오타 허용 검색 (matched_term: 오타를 교정한 단어)"""
+        return [
+            {"score": score, "matched_term": term, **self.items[entry_id]}
+            for entry_id, (score, term) in self.fuzzy_index.search(text_lower).items()
+            if score > 0
+        ]
+    
+    def render_search_results(self, text, results, on_chunk=None):
+        """
+        검색 결과 화면
+        Args:
+            on_chunk (callable): on_chunk(단락) - 제목과 결과 단락을 만드는 대로 호출 (스트리밍 응답)
+        """
+        paragraphs = []
+        
+        def add(paragraph):
+            paragraphs.append(paragraph)
+            if on_chunk:
+                on_chunk(paragraph)
+        
+        add(f"🔍 **'{text}' 검색 결과**\n\n")
+        corrected = results[0].get("matched_term") if results else None
+        if corrected:
+            add(f"💡 '{corrected}'(으)로 찾은 결과입니다.\n\n")
+        buttons = []
+
+        for i, result in enumerate(results, 1):
+            add(f"{i}. **{result['path']}**\n   {result['item']['request_method'][:100]}...\n\n")
+            
+            buttons.append({
+                "text": result['item']['name'],
+                "action": "direct_result",
+                "value": f"{result['category']}|{result['subcategory']}|{result['item']['name']}"
+            })
+        
+        buttons.extend([
+            {"text": "🏠 메인", "action": "nav", "value": "main"},
+            {"text": "🔍 새 검색", "action": "search", "value": "new"}
+        ])
+        
+        return "".join(paragraphs), SEARCH_RESULTS_CATEGORY, buttons
+    
+    def render_contacts(self, text, records, limit=4):
+        """연락처 조회 결과 화면 (부서가 하나면 그 연락처를 쓰는 업무 버튼 포함)"""
+        message = f"📞 **'{text}' 연락처**\n\n"
+        for record in records:
+            name = record["department"]
+            if record["aliases"]:
+                name += f" ({', '.join(record['aliases'])})"
+            message += f"• {name}: {record['label']}"
+            if record["location"]:
+                message += f" - {record['location']}"
+            message += "\n"
+        
+        buttons = [self._node_button(node) for node in records[0]["nodes"][:limit]] if len(records) == 1 else []
+        buttons.extend(NAV_BUTTONS)
+        
+        return message, "연락처", buttons
+    
+    def _render_chosung_choices(self, text, nodes, limit=8):
+        """초성 입력에 여러 항목이 일치할 때의 선택 화면"""
+        message = f"🔤 **'{text}' 초성 검색 결과**\n\n"
+        message += "찾으시는 항목을 선택해주세요:\n\n"
+        buttons = []
+        
+        for i, node in enumerate(nodes[:limit], 1):
+            message += f"{i}. **{self._node_label(node)}**\n"
+            buttons.append(self._node_button(node))
+        
+        buttons.append({"text": "🏠 메인", "action": "nav", "value": "main"})
+        return message, "초성검색", buttons
+    
+    def _node_label(self, node):
+        """화면 키의 위치 표시 ("카테고리 > 세부항목 > 세부항목2")"""
+        category_name = node[1]
+        if node[0] == "category":
+            return category_name
+        
+        subcat_data = self.data[category_name]["subcategories"][node[2]]
+        if node[0] == "subcategory":
+            return f"{category_name} > {subcat_data['name']}"
+        return f"{category_name} > {subcat_data['name']} > {subcat_data['sub_items'][node[3]]['name']}"
+    
+    def _node_button(self, node):
+        """화면 키로 이동하는 버튼 (클라이언트가 카탈로그로 바로 처리할 수 있는 형식)"""
+        category_name = node[1]
+        if node[0] == "category":
+            return {"text": category_name, "action": "category", "value": category_name}
+        
+        subcat_data = self.data[category_name]["subcategories"][node[2]]
+        if node[0] == "subcategory":
+            # 선택 목록에서는 현재 위치와 다른 카테고리일 수 있어 소속 카테고리를 함께 전달
+            return {
+                "text": subcat_data["name"],
+                "action": "subcategory",
+                "value": node[2],
+                "category": category_name
+            }
+        
+        item_name = subcat_data["sub_items"][node[3]]["name"]
+        return {
+            "text": item_name,
+            "action": "direct_result",
+            "value": f"{category_name}|{subcat_data['name']}|{item_name}"
+        }
+    
+    # ---- 화면 렌더링 (엔진 생성 시 한 번) ----
+    
+    def _render_emergency(self, keyword):
+        """응급상황 안내 화면"""
+        return emergency_message(keyword), "응급", []
+    
+    def _render_main_categories(self):
+        """메인 카테고리 목록 화면"""
+        message = "🏥 **병동 간호업무 카테고리 선택**\n\n"
+        message += "원하는 간호업무 카테고리를 선택해주세요:\n\n"
+        
+        buttons = []
+        for i, (category_name, category_data) in enumerate(self.data.items(), 1):
+            message += f"{i}. **{category_name}** - {category_data['description']}\n"
+            buttons.append({
+                "text": category_name,
+                "action": "category",
+                "value": category_name
+            })
+        
+        message += "\n💡 **사용 팁:** 카테고리명을 입력하거나 버튼을 클릭하세요!"
+        
+        return message, "메인메뉴", buttons
+    
+    def _render_subcategories(self, category_name):
+        """세부항목 목록 화면"""
+        category_data = self.data[category_name]
+        
+        message = f"📁 **{category_name}** 세부간호업무\n\n"
+        message += f"{category_data['description']}\n\n"
+        message += "세부간호업무를 선택해주세요:\n\n"
+        
+        buttons = []
+        for i, (subcat_key, subcat_data) in enumerate(category_data["subcategories"].items(), 1):
+            subcat_name = subcat_data["name"]
+            message += f"{i}. **{subcat_name}**\n"
+            buttons.append({
+                "text": subcat_name,
+                "action": "subcategory",
+                "value": subcat_key
+            })
+        
+        # 네비게이션 버튼 추가
+        buttons.extend(NAV_BUTTONS)
+        
+        return message, f"{category_name}_세부항목", buttons
+    
+    def _render_sub_items(self, category_name, subcategory_key):
+        """세부항목2 목록 화면"""
+        subcat_data = self.data[category_name]["subcategories"][subcategory_key]
+        
+        message = f"📄 **{subcat_data['name']}** 상세절차\n\n"
+        message += f"{subcat_data['description']}\n\n"
+        message += "상세절차를 선택해주세요:\n\n"
+        
+        buttons = []
+        for i, (item_key, item_data) in enumerate(subcat_data["sub_items"].items(), 1):
+            item_name = item_data["name"]
+            message += f"{i}. **{item_name}**\n"
+            buttons.append({
+                "text": item_name,
+                "action": "sub_item",
+                "value": item_key
+            })
+        
+        # 네비게이션 버튼 추가
+        buttons.extend(NAV_BUTTONS)
+        
+        return message, f"{subcat_data['name']}_상세항목", buttons
+    
+    def _render_final_result(self, category_name, subcategory_key, sub_item_key):
+        """최종 결과 화면"""
+        item_data = self.data[category_name]["subcategories"][subcategory_key]["sub_items"][sub_item_key]
+        
+        message = f"✅ **{item_data['name']}**\n\n"
+        
+        # 요청방법
+        if item_data["request_method"]:
+            message += f"📋 **요청방법:**\n{item_data['request_method']}\n\n"
+        
+        # 연락처
+        if item_data["contact"]:
+            message += f"📞 **연락처:**\n{item_data['contact']}\n\n"
+        
+        # 관련 정보
+        if item_data["free_text"]:
+            message += f"🔍 **관련 정보:**\n{item_data['free_text']}\n\n"
+        
+        # 비고
+        if item_data.get("note"):
+            message += f"💡 **비고:**\n{item_data['note']}\n\n"
+        
+        # 네비게이션 버튼
+        buttons = NAV_BUTTONS + [
+            {"text": "🔍 다시 검색", "action": "search", "value": "new"}
+        ]
+        
+        return message, "최종결과", buttons
+
+# 프로세스 전체에서 공유하는 테넌트별 엔진 (테넌트 ID → 엔진, 최초 사용 시 생성)
+_engines = {}
+
+def _build_engine(data):
+    """
+    카탈로그 텍스트를 문자열 풀에 넣은 뒤 엔진 생성
+    내용이 같은 카탈로그의 엔진이 이미 있으면 인덱스·화면까지 그대로 공유
+    """
+    version = data_version(data)
+    for engine in list(_engines.values()):
+        if engine.version == version:
+            return engine
+    return ChatbotEngine(string_pool.intern_data(data))
+
+def get_engine(tenant_id=DEFAULT_TENANT):
+    """
+    테넌트 카탈로그 엔진 반환 (동시 첫 호출에도 테넌트마다 한 번만 생성)
+    기본 테넌트는 HIERARCHICAL_WORK_DATA
+    Raises:
+        KeyError: 등록되지 않은 테넌트
+    """
+    engine = _engines.get(tenant_id)
+    if engine is None:
+        engine = single_flight.do(
+            ("engine", tenant_id),
+            lambda: _engines.get(tenant_id) or _build_engine(tenant_data(tenant_id))
+        )
+        engine = _engines.setdefault(tenant_id, engine)
+    return engine
+
+def loaded_tenants():
+    """엔진이 만들어진 테넌트 ID 목록"""
+    return sorted(_engines)
+
+def reload_engine(data=None, tenant_id=DEFAULT_TENANT):
+    """
+    카탈로그 데이터 재로드 - 새 엔진으로 교체하고 검색 캐시 무효화
+    Args:
+        data (dict): 새 계층 데이터 (None이면 테넌트 카탈로그를 다시 읽음)
+        tenant_id (str): 교체할 테넌트
+    """
+    engine = _build_engine(data if data is not None else tenant_data(tenant_id))
+    _engines[tenant_id] = engine
+    search_cache.clear()
+    return engine
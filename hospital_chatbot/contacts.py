@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+부서 연락처 색인
+DEPARTMENT_CONTACTS와 카탈로그 contact 문자열("인프라엔지니어링팀(시설팀) T.9115")을
+엔진 생성 시 부서 → 내선 기록으로 풀어 두고, 부서 이름·별칭·이름 일부·초성·내선 번호(역조회)를
+딕셔너리 조회 한 번으로 찾음 ("의공 번호", "9233 어디", "ㅌㅅㅅ")
+"""
+
+import re
+from search_index import to_chosung, is_chosung_query, tokenize
+
+# 내선 번호 표기 ("T.9233", "T. 9233", "내선 1400")
+EXTENSION_PATTERN = re.compile(r"(?:T\.\s*|내선\s*)(\d{3,5})")
+
+# 검색어 속 내선 번호 (앞뒤가 숫자가 아닌 3~5자리)
+QUERY_EXTENSION_PATTERN = re.compile(r"(?<!\d)(\d{3,5})(?!\d)")
+
+PAREN_PATTERN = re.compile(r"\(([^()]*)\)")
+
+# 연락처를 찾는 입력으로 보는 단어 ("의공 번호", "9233 어디")
+CONTACT_INTENT_WORDS = ("번호", "연락처", "내선", "전화", "어디", "누구", "담당")
+ALL_CONTACTS_WORDS = ("전체", "모든")
+
+# 전체 목록은 입력이 "전체/모든"과 연락처 단어로만 이루어졌을 때만 ("전체 연락처", "모든 내선 번호", "연락처 전체")
+# ("전체 회의 담당 부서"처럼 다른 단어가 섞인 문장은 부서 이름으로 조회)
+_ALL_WORDS = "|".join(ALL_CONTACTS_WORDS)
+_LIST_WORDS = "|".join(("연락처", "번호", "내선", "전화"))
+ALL_CONTACTS_PATTERN = re.compile(
+    rf"(?:{_ALL_WORDS})(?:{_LIST_WORDS})+(?:목록)?[?]*|(?:{_LIST_WORDS})+(?:{_ALL_WORDS})(?:목록)?[?]*"
+)
+
+# 내선 앞 글자가 이보다 많은 단어면 문장으로 보고 내선 뒤 단어를 부서명으로 사용
+# ("... 필요한 경우 T.6089 제제실 전화 후" → 제제실)
+MAX_NAME_WORDS = 4
+
+# 조회 결과로 내보내는 기록 필드 (nodes는 엔진 내부용)
+CONTACT_FIELDS = ("department", "label", "extension", "aliases", "location", "paths")
+
+def parse_contacts(text):
+    """
+    연락처 문자열에서 부서별 내선 추출
+    예: "인프라엔지니어링팀(시설팀) T.9115" → [("인프라엔지니어링팀", ["시설팀"], None, "T.9115", "9115")]
+    Returns:
+        list: (부서명, 별칭 목록, 위치, 표기, 내선 번호)
+    """
+    contacts = []
+    for line in text.split("\n"):
+        for match in EXTENSION_PATTERN.finditer(line):
+            before = line[:match.start()].rstrip(" (:").lstrip("📞 ").strip()
+            if not before or len(before.split()) > MAX_NAME_WORDS:
+                after = line[match.end():].lstrip(" )").split()
+                before = after[0] if after else ""
+            if not before:
+                continue
+            
+            # 괄호 안의 숫자·층 표시는 위치, 나머지는 별칭 ("검사지원실(본관2층)", "인프라엔지니어링팀(시설팀)")
+            aliases, location = [], None
+            for note in PAREN_PATTERN.findall(before):
+                if "층" in note or any(char.isdigit() for char in note):
+                    location = note
+                elif note:
+                    aliases.append(note)
+            
+            name = PAREN_PATTERN.sub("", before).strip()
+            if name:
+                contacts.append((name, aliases, location, match.group(0).strip(), match.group(1)))
+    return contacts
+
+def _compact(text):
+    """조회 키 (소문자, 공백 제거)"""
+    return text.lower().replace(" ", "")
+
+class ContactIndex:
+    """부서 연락처 기록과 이름/별칭/이름 일부/초성/내선 → 기록 번호 사전"""
+    
+    def __init__(self):
+        self.records = []        # 부서 기록 (CONTACT_FIELDS + nodes)
+        self.record_ids = {}     # (부서명 키, 내선) → 기록 번호
+        self.names = {}          # 부서명/별칭 키 → 기록 번호 목록
+        self.partial = {}        # 부서명/별칭의 2글자 이상 부분 문자열 → 기록 번호 목록
+        self.chosung = {}        # 부서명/별칭 초성 → 기록 번호 목록
+        self.extensions = {}     # 내선 번호 → 기록 번호 목록
+    
+    def add(self, text, node=None, path=None):
+        """
+        연락처 문자열 색인 - 같은 부서·내선은 한 기록으로 합침
+        Args:
+            node (tuple): 이 연락처를 쓰는 카탈로그 화면 키 (관련 업무 버튼용)
+            path (str): 화면 경로 ("카테고리/세부항목 키/세부항목2 키")
+        """
+        for name, aliases, location, label, extension in parse_contacts(text):
+            key = (_compact(name), extension)
+            record_id = self.record_ids.get(key)
+            if record_id is None:
+                record_id = len(self.records)
+                self.record_ids[key] = record_id
+                self.records.append({
+                    "department": name,
+                    "label": label,
+                    "extension": extension,
+                    "aliases": [],
+                    "location": location,
+                    "paths": [],
+                    "nodes": []
+                })
+                self._link(self.extensions, extension, record_id)
+                self._index_name(name, record_id)
+            
+            record = self.records[record_id]
+            for alias in aliases:
+                if alias not in record["aliases"]:
+                    record["aliases"].append(alias)
+                    self._index_name(alias, record_id)
+            if location and not record["location"]:
+                record["location"] = location
+            if node is not None and node not in record["nodes"]:
+                record["nodes"].append(node)
+                record["paths"].append(path)
+    
+    def _index_name(self, name, record_id):
+        """이름 전체, 2글자 이상 부분 문자열, 초성으로 색인"""
+        key = _compact(name)
+        self._link(self.names, key, record_id)
+        for start in range(len(key)):
+            for end in range(start + 2, len(key) + 1):
+                self._link(self.partial, key[start:end], record_id)
+        chosung = to_chosung(name)
+        if len(chosung) >= 2:
+            self._link(self.chosung, chosung, record_id)
+    
+    @staticmethod
+    def _link(table, key, record_id):
+        """사전 항목에 기록 번호 추가 (중복 없이)"""
+        record_ids = table.setdefault(key, [])
+        if record_id not in record_ids:
+            record_ids.append(record_id)
+    
+    def lookup(self, text, require_intent=True, chosung=True, limit=5):
+        """
+        연락처 조회
+        Args:
+            require_intent (bool): True면 연락처를 찾는 입력("번호", "어디" 등 포함, 내선 번호만, 초성)일 때만 조회
+            chosung (bool): 초성 입력("ㅌㅅㅅ")도 조회할지
+        Returns:
+            list: 일치한 부서 기록 (이름 전체 일치 → 긴 부분 일치 순, 없으면 빈 목록)
+        """
+        text = text.strip()
+        compact = _compact(text)
+        if not compact:
+            return []
+        
+        if is_chosung_query(text):
+            return self._records(self.chosung.get(compact, ()), limit) if chosung else []
+        
+        has_intent = any(word in text for word in CONTACT_INTENT_WORDS)
+        extensions = QUERY_EXTENSION_PATTERN.findall(text)
+        
+        # 내선 번호 역조회 ("9233 어디", "T.9233", "9233")
+        if extensions and (has_intent or not require_intent or compact.lstrip("t.").isdigit()):
+            record_ids = [record_id for extension in extensions for record_id in self.extensions.get(extension, ())]
+            if record_ids:
+                return self._records(record_ids, limit)
+        
+        # 부서 이름만 입력 (전용 조회 경로) - 챗봇에서는 FAQ 등 다른 처리를 위해 건너뜀
+        if not require_intent and compact in self.names:
+            return self._records(self.names[compact], limit)
+        
+        if require_intent and not has_intent:
+            return []
+        
+        if ALL_CONTACTS_PATTERN.fullmatch(compact):
+            return list(self.records)
+        
+        # 단어별 이름 일부 일치 - 긴 단어로 일치한 부서 우선 ("의공번호"처럼 붙여 써도 의도 단어는 제외)
+        for word in CONTACT_INTENT_WORDS:
+            text = text.replace(word, " ")
+        scores = {}
+        for term in tokenize(text):
+            for record_id in self.names.get(term, ()):
+                scores[record_id] = max(scores.get(record_id, 0), len(term) + 100)
+            for record_id in self.partial.get(term, ()):
+                scores[record_id] = max(scores.get(record_id, 0), len(term))
+        ranked = sorted(scores, key=lambda record_id: (-scores[record_id], record_id))
+        return self._records(ranked, limit)
+    
+    def _records(self, record_ids, limit):
+        """기록 번호 목록 → 중복 없는 기록 목록 (최대 limit개)"""
+        records = []
+        for record_id in dict.fromkeys(record_ids):
+            records.append(self.records[record_id])
+            if len(records) >= limit:
+                break
+        return records
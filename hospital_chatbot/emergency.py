@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+응급 안내 빠른 경로
+응급 키워드 안내문은 고정 문구이므로 서버 시작 시 HTTP 응답 전체(상태 줄, 헤더, JSON/SSE 본문)를
+bytes로 만들어 두고, 요청이 오면 응답 시각·세션 ID·네비게이션 위치만 채워 소켓에 바로 씀
+세션 조회·대화 기록·JSON 직렬화를 거치지 않으며 감사 기록은 별도 스레드에서 남김
+"""
+
+import json
+import queue
+import re
+import threading
+from datetime import datetime
+
+EMERGENCY_CATEGORY = "응급"
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# 응답 시각 자리 (문자열 안에 실제 시각을 그대로 채움)
+TIMESTAMP_PLACEHOLDER = "0000-00-00 00:00:00"
+# 세션 ID·네비게이션 위치 자리 (따옴표까지 포함한 문자열 전체를 JSON 값으로 바꿈)
+SESSION_ID_PLACEHOLDER = "@@session_id@@"
+NAVIGATION_PLACEHOLDER = "@@navigation@@"
+_FIELD_PATTERN = re.compile(rb'(0000-00-00 00:00:00)|"@@(session_id|navigation)@@"')
+
+_keywords = None
+_responses = None
+
+def emergency_keywords():
+    """
+    응급 키워드 → 안내문 (처음 쓸 때 excel_data에서 읽음)
+    서버는 소켓 바인딩 후 prepare()로 미리 읽어 두어 카탈로그 모듈이 바인딩을 늦추지 않음
+    """
+    global _keywords
+    if _keywords is None:
+        from excel_data import EMERGENCY_KEYWORDS
+        _keywords = EMERGENCY_KEYWORDS
+    return _keywords
+
+def emergency_message(keyword):
+    """응급 키워드 안내 문구 (엔진 화면과 빠른 경로가 같은 문구 사용)"""
+    return f"🚨 **응급상황 감지!**\n\n{emergency_keywords()[keyword]}"
+
+def find_emergency_keyword(text):
+    """입력에 포함된 응급 키워드 (없으면 None, 엔진의 find_emergency와 같은 순서로 검사)"""
+    text_lower = text.lower()
+    for keyword in emergency_keywords():
+        if keyword in text_lower:
+            return keyword
+    return None
+
+def current_timestamp():
+    """응답 시각 bytes"""
+    return datetime.now().strftime(TIMESTAMP_FORMAT).encode('ascii')
+
+class PreparedResponse:
+    """상태 줄·헤더·본문을 미리 직렬화한 응답 (헤더 끝, 채울 자리로 나눈 본문 조각)"""
+    __slots__ = ("head", "sized", "segments", "fields")
+    
+    def __init__(self, body, content_type, extra_headers=()):
+        body = body.encode('utf-8')
+        lines = [
+            "HTTP/1.0 200 OK",
+            f"Content-Type: {content_type}",
+            "Cache-Control: no-store",
+            "Access-Control-Allow-Origin: *",
+            "Connection: close"
+        ]
+        lines.extend(extra_headers)
+        # 빈 줄 앞에서 끊어 두고 Content-Length·trace ID 헤더는 보낼 때 추가
+        self.head = ("\r\n".join(lines) + "\r\n").encode('ascii')
+        # 스트리밍 응답은 길이를 알리지 않는 기존 SSE 응답과 같은 형태 유지
+        self.sized = not content_type.startswith("text/event-stream")
+        # [조각, 자리, 조각, 자리, ..., 조각] 순서로 나눈 뒤 본문 조각과 자리 이름을 따로 보관
+        parts = _FIELD_PATTERN.split(body)
+        self.segments = parts[::3]
+        self.fields = [
+            "timestamp" if timestamp_field else name.decode('ascii')
+            for timestamp_field, name in zip(parts[1::3], parts[2::3])
+        ]
+    
+    def render(self, timestamp, trace_id=None, session_id=None, navigation=None):
+        """
+        자리를 채운 전체 응답 bytes
+        Args:
+            timestamp (bytes): 응답 시각
+            trace_id (str): 추적 중이면 X-Trace-ID 헤더로 추가
+            session_id (str): 응답의 세션 ID (없으면 null)
+            navigation (dict): 응답의 네비게이션 위치 (없으면 null)
+        """
+        values = {
+            "timestamp": timestamp,
+            "session_id": json.dumps(session_id).encode('ascii'),
+            "navigation": json.dumps(navigation, ensure_ascii=False).encode('utf-8')
+        }
+        body = [self.segments[0]]
+        for field, segment in zip(self.fields, self.segments[1:]):
+            body.append(values[field])
+            body.append(segment)
+        body = b"".join(body)
+        
+        head = self.head
+        if self.sized:
+            head += f"Content-Length: {len(body)}\r\n".encode('ascii')
+        if trace_id:
+            head += f"X-Trace-ID: {trace_id}\r\nAccess-Control-Expose-Headers: X-Trace-ID\r\n".encode('ascii')
+        return head + b"\r\n" + body
+
+def _sse_body(message):
+    """/chat/stream 응답과 같은 순서의 이벤트 (meta → 단락별 chunk → buttons → done)"""
+    events = [("meta", {
+        "session_id": SESSION_ID_PLACEHOLDER,
+        "category": EMERGENCY_CATEGORY,
+        "timestamp": TIMESTAMP_PLACEHOLDER,
+        "user_name": None,
+        "navigation": NAVIGATION_PLACEHOLDER
+    })]
+    paragraphs = message.split("\n\n")
+    for i, paragraph in enumerate(paragraphs):
+        chunk = paragraph if i == len(paragraphs) - 1 else paragraph + "\n\n"
+        if chunk:
+            events.append(("chunk", {"text": chunk}))
+    events.append(("buttons", {"buttons": []}))
+    events.append(("done", {}))
+    return "".join(
+        f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n" for event, data in events
+    )
+
+def _prepare_responses():
+    """응급 키워드별 JSON/SSE 응답"""
+    responses = {}
+    for keyword in emergency_keywords():
+        message = emergency_message(keyword)
+        json_body = json.dumps({
+            "message": message,
+            "category": EMERGENCY_CATEGORY,
+            "timestamp": TIMESTAMP_PLACEHOLDER,
+            "user_name": None,
+            "session_id": SESSION_ID_PLACEHOLDER,
+            "navigation": NAVIGATION_PLACEHOLDER
+        }, ensure_ascii=False, indent=2)
+        responses[keyword] = {
+            "json": PreparedResponse(json_body, "application/json; charset=utf-8"),
+            "sse": PreparedResponse(_sse_body(message), "text/event-stream; charset=utf-8",
+                                    ("X-Accel-Buffering: no",))
+        }
+    return responses
+
+def emergency_responses():
+    """응급 키워드 → {"json": PreparedResponse, "sse": PreparedResponse} (처음 쓸 때 한 번 만듦)"""
+    global _responses
+    if _responses is None:
+        _responses = _prepare_responses()
+    return _responses
+
+def prepare():
+    """응급 키워드와 응답을 미리 준비 (서버 소켓 바인딩 직후, 첫 응급 요청이 기다리지 않도록)"""
+    return emergency_responses()
+
+class EmergencyAudit:
+    """
+    응급 응답 감사 기록
+    요청 스레드는 대기열에 넣기만 하고, 출력과 세션 대화 기록 반영(sink)은 별도 스레드에서 처리
+    """
+    
+    def __init__(self, sink=None, maxsize=10000):
+        """
+        Args:
+            sink (callable): sink(record) - 기록마다 감사 스레드에서 호출 (세션 대화 기록 반영 등)
+            maxsize (int): 대기열 최대 길이 - 가득 차면 기록을 버리고 응답은 지연시키지 않음
+        """
+        self._sink = sink
+        self._queue = queue.Queue(maxsize)
+        self.recorded = 0
+        self.dropped = 0
+        threading.Thread(target=self._run, name="emergency-audit", daemon=True).start()
+    
+    def record(self, keyword, route, message=None, session_id=None, client=None):
+        """감사 기록 추가 (기다리지 않음)"""
+        entry = {
+            "timestamp": datetime.now().strftime(TIMESTAMP_FORMAT),
+            "keyword": keyword,
+            "route": route,
+            "message": message,
+            "session_id": session_id,
+            "client": client
+        }
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _run(self):
+        """감사 기록 루프"""
+        while True:
+            entry = self._queue.get()
+            try:
+                session = (entry["session_id"] or "-")[:8]
+                print(f"[{entry['timestamp']}] 🚨 응급 응답 ({entry['route']}) 세션 {session}: {entry['keyword']}")
+                if self._sink:
+                    self._sink(entry)
+                self.recorded += 1
+            except Exception as e:
+                print(f"응급 감사 기록 오류: {e}")
+    
+    def stats(self):
+        """상태 확인용 집계"""
+        return {
+            "recorded": self.recorded,
+            "pending": self._queue.qsize(),
+            "dropped": self.dropped
+        }
@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+"""
+메모리 사용량 보고
+세션 하나, 카탈로그 데이터, 엔진 색인, 캐시가 실제로 차지하는 bytes를 객체 그래프를 따라가며 계산하고
+(tracemalloc이 켜져 있으면 할당 위치별 사용량도 함께) 두 시점의 스냅샷 차이로 누수를 확인
+컨테이너 메모리 크기 결정과 메모리 최적화 확인용
+
+    python3 memory_report.py --sessions 200          # 이 프로세스에서 엔진과 세션을 만들어 측정
+    python3 memory_report.py --server http://localhost:8000 --token <관리자 토큰>   # 실행 중인 서버 보고서
+
+객체 그래프 계산은 GIL을 잡고 도는 순수 파이썬 반복이므로 운영 서버에서는 필요할 때만 호출
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+import types
+import urllib.request
+from collections import deque
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+# 따라가지 않는 객체 (모듈·클래스·함수는 여러 구조가 공유하는 코드)
+SKIP_TYPES = (
+    types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, types.CodeType, types.FrameType
+)
+
+# tracemalloc 할당 위치 보고에서 제외할 파일
+TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+)
+
+def deep_size(obj, seen=None, skip=()):
+    """
+    obj에서 닿는 모든 객체의 크기 합계 (bytes)
+    Args:
+        seen (set): 이미 센 객체 id - 여러 구조를 같은 set으로 세면 공유 객체는 처음 구조에만 포함
+        skip (set): 따라가지 않을 객체 id (세션이 참조하는 공유 엔진 등)
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        object_id = id(current)
+        if object_id in seen or object_id in skip or isinstance(current, SKIP_TYPES):
+            continue
+        seen.add(object_id)
+        total += sys.getsizeof(current)
+        
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        elif not isinstance(current, (str, bytes, int, float, bool)):
+            attributes = getattr(current, "__dict__", None)
+            if attributes is not None:
+                stack.append(attributes)
+            for cls in type(current).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if hasattr(current, slot):
+                        stack.append(getattr(current, slot))
+    return total
+
+def _percentile(samples, p):
+    """정렬된 표본의 백분위 값"""
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+def process_memory():
+    """프로세스 RSS (현재, 최대) - 확인할 수 없으면 None"""
+    rss = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    
+    peak = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux는 KB, macOS는 bytes 단위
+        peak = peak if sys.platform == "darwin" else peak * 1024
+    return {"rss_bytes": rss, "peak_rss_bytes": peak}
+
+def session_report(sessions, shared=()):
+    """
+    세션별 크기 분포 (공유 엔진은 제외하고 세션만의 상태: 대화 기록, 네비게이션, 이름)
+    Args:
+        sessions (dict): 세션 ID → 챗봇 세션
+        shared (iterable): 세션이 참조하지만 세지 않을 공유 객체 (엔진)
+    """
+    skip = {id(obj) for obj in shared}
+    sizes, history_bytes = [], 0
+    for session in list(sessions.values()):
+        sizes.append(deep_size(session, skip=skip))
+        history_bytes += deep_size(getattr(session, "conversation_history", ()))
+    sizes.sort()
+    total = sum(sizes)
+    return {
+        "count": len(sizes),
+        "total_bytes": total,
+        "mean_bytes": round(total / len(sizes)) if sizes else None,
+        "p99_bytes": _percentile(sizes, 0.99),
+        "max_bytes": sizes[-1] if sizes else None,
+        "history_bytes": history_bytes,
+        "history_share": round(history_bytes / total, 3) if total else None
+    }
+
+def engine_report(engine):
+    """엔진 속성별 크기 (앞 속성에서 센 공유 객체는 뒤 속성에 다시 포함하지 않음)"""
+    seen = set()
+    parts = {name: deep_size(value, seen) for name, value in vars(engine).items()}
+    return {
+        "total_bytes": sum(parts.values()) + sys.getsizeof(engine),
+        "parts": dict(sorted(parts.items(), key=lambda item: -item[1]))
+    }
+
+def loaded_structures():
+    """
+    이미 import된 모듈의 카탈로그·엔진·캐시 (아직 로드되지 않은 모듈은 건너뜀 - 보고서 때문에 로드하지 않음)
+    요청 스레드가 바꾸는 딕셔너리는 deep_size가 순회하는 도중 크기가 바뀌지 않도록 사본으로
+    (잠금이 있는 캐시는 snapshot()으로 잠금을 잡고 복사)
+    Returns:
+        tuple: (카탈로그 데이터 dict, 테넌트 → 엔진 dict, 캐시 dict)
+    """
+    catalogue, engines, caches = {}, {}, {}
+    excel_data = sys.modules.get("excel_data")
+    if excel_data is not None:
+        catalogue["HIERARCHICAL_WORK_DATA"] = excel_data.HIERARCHICAL_WORK_DATA
+        catalogue["WORK_CATEGORIES"] = excel_data.WORK_CATEGORIES
+    
+    chatbot_engine = sys.modules.get("chatbot_engine")
+    if chatbot_engine is not None:
+        engines.update(dict(chatbot_engine._engines))
+    
+    cache = sys.modules.get("cache")
+    if cache is not None:
+        caches["search_cache"] = cache.search_cache.snapshot()
+        caches["single_flight"] = cache.single_flight.snapshot()
+    catalogue_module = sys.modules.get("catalogue")
+    if catalogue_module is not None:
+        caches["catalogue_bundles"] = {tenant_id: bundle for tenant_id, (_, bundle) in list(catalogue_module._bundles.items())}
+    tenants = sys.modules.get("tenants")
+    if tenants is not None:
+        caches["string_pool"] = tenants.string_pool.snapshot()
+    return catalogue, engines, caches
+
+def build_report(sessions=None, extra_caches=None, top=20):
+    """
+    전체 메모리 보고서
+    Args:
+        sessions (dict): 세션 ID → 챗봇 세션 (서버에서는 sessions_lock을 잡고 만든 사본)
+        extra_caches (dict): 이름 → 객체 (서버의 정적 파일 캐시, 요청 제한 버킷 등 - 잠금을 잡고 만든 사본)
+        top (int): tracemalloc 할당 위치 보고 수
+    """
+    started = time.perf_counter()
+    catalogue, engines, caches = loaded_structures()
+    caches.update(extra_caches or {})
+    
+    # 같은 내용의 테넌트는 엔진 하나를 공유하므로 엔진 객체별로 한 번만 계산
+    engine_reports, by_engine = {}, {}
+    for tenant_id, engine in sorted(engines.items()):
+        if id(engine) in by_engine:
+            engine_reports[by_engine[id(engine)]].setdefault("shared_with", []).append(tenant_id)
+            continue
+        by_engine[id(engine)] = tenant_id
+        engine_reports[tenant_id] = engine_report(engine)
+    
+    report = {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "process": process_memory(),
+        "sessions": session_report(sessions or {}, engines.values()),
+        "catalogue": {name: deep_size(data) for name, data in catalogue.items()},
+        "engines": engine_reports,
+        "caches": {name: deep_size(value) for name, value in caches.items()},
+        "tracemalloc": tracemalloc_report(top)
+    }
+    report["report_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+def _location(statistic):
+    """tracemalloc 통계의 할당 위치 ("파일:줄")"""
+    frame = statistic.traceback[0]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+def tracemalloc_report(top=20):
+    """tracemalloc 현재/최대 사용량과 할당 위치별 상위 사용량 (꺼져 있으면 tracing False만)"""
+    if not tracemalloc.is_tracing():
+        return {"tracing": False}
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces(TRACEMALLOC_FILTERS)
+    return {
+        "tracing": True,
+        "current_bytes": current,
+        "peak_bytes": peak,
+        "top": [
+            {"where": _location(statistic), "bytes": statistic.size, "count": statistic.count}
+            for statistic in snapshot.statistics("lineno")[:top]
+        ]
+    }
+
+def _flatten(value, prefix=""):
+    """보고서의 숫자 항목을 "sessions.total_bytes" 형식 키로 펼침 (비율·시간 제외)"""
+    flat = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in ("tracemalloc", "report_ms", "history_share"):
+                continue
+            flat.update(_flatten(item, f"{prefix}{key}."))
+    elif isinstance(value, int) and not isinstance(value, bool):
+        flat[prefix[:-1]] = value
+    return flat
+
+class MemorySnapshots:
+    """
+    메모리 스냅샷 비교 - 스냅샷을 찍을 때마다 직전 스냅샷과의 차이 보고
+    tracemalloc이 꺼져 있으면 첫 스냅샷에서 켜므로 (이후 할당만 추적) 누수 확인은 두 번째 스냅샷부터
+    """
+    
+    def __init__(self, frames=1):
+        self.frames = frames
+        self._previous = None   # (번호, 시각, tracemalloc 스냅샷, 펼친 보고서)
+        self.count = 0
+    
+    def take(self, report, top=20):
+        """
+        스냅샷을 찍고 직전 스냅샷과 비교
+        Args:
+            report (dict): 지금 시점의 build_report 결과
+        """
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.frames)
+        snapshot = tracemalloc.take_snapshot().filter_traces(TRACEMALLOC_FILTERS)
+        flat = _flatten(report)
+        self.count += 1
+        
+        result = {
+            "snapshot": self.count,
+            "timestamp": report["timestamp"],
+            "tracemalloc_started": started_tracing,
+            "previous": None
+        }
+        if self._previous is not None:
+            number, timestamp, previous_snapshot, previous_flat = self._previous
+            result["previous"] = {"snapshot": number, "timestamp": timestamp}
+            result["structures_delta"] = {
+                key: flat[key] - previous_flat[key]
+                for key in sorted(flat.keys() & previous_flat.keys()) if flat[key] != previous_flat[key]
+            }
+            result["top_growth"] = [
+                {"where": _location(statistic), "bytes_delta": statistic.size_diff,
+                 "count_delta": statistic.count_diff, "bytes": statistic.size}
+                for statistic in snapshot.compare_to(previous_snapshot, "lineno")[:top]
+            ]
+        self._previous = (self.count, report["timestamp"], snapshot, flat)
+        return result
+    
+    def stop(self):
+        """tracemalloc 끄고 스냅샷 삭제 (추적 중에는 할당마다 추가 메모리·시간 사용)"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._previous = None
+        self.count = 0
+
+def format_bytes(size):
+    """읽기 쉬운 크기 ("1.2MB")"""
+    if size is None:
+        return "-"
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+def print_report(report):
+    """보고서를 사람이 읽기 쉬운 형태로 출력"""
+    process = report["process"]
+    print(f"🧠 메모리 보고서 ({report['timestamp']}, 계산 {report.get('report_ms')}ms)")
+    print(f"   프로세스 RSS {format_bytes(process['rss_bytes'])} (최대 {format_bytes(process['peak_rss_bytes'])})")
+    
+    sessions = report["sessions"]
+    print(f"\n세션 {sessions['count']}개: 합계 {format_bytes(sessions['total_bytes'])}, "
+          f"평균 {format_bytes(sessions['mean_bytes'])}, p99 {format_bytes(sessions['p99_bytes'])}, "
+          f"최대 {format_bytes(sessions['max_bytes'])}, 대화 기록 비율 {sessions['history_share']}")
+    
+    print("\n카탈로그 데이터")
+    for name, size in report["catalogue"].items():
+        print(f"   {name:28} {format_bytes(size):>10}")
+    
+    for tenant_id, engine in report["engines"].items():
+        shared = f" (공유: {', '.join(engine['shared_with'])})" if engine.get("shared_with") else ""
+        print(f"\n엔진 {tenant_id}{shared}: {format_bytes(engine['total_bytes'])}")
+        for name, size in engine["parts"].items():
+            print(f"   {name:28} {format_bytes(size):>10}")
+    
+    print("\n캐시")
+    for name, size in report["caches"].items():
+        print(f"   {name:28} {format_bytes(size):>10}")
+    
+    traced = report["tracemalloc"]
+    if traced["tracing"]:
+        print(f"\ntracemalloc 현재 {format_bytes(traced['current_bytes'])} (최대 {format_bytes(traced['peak_bytes'])})")
+        for entry in traced["top"]:
+            print(f"   {entry['where']:40} {format_bytes(entry['bytes']):>10} ({entry['count']}개)")
+
+SAMPLE_MESSAGES = ("안녕하세요", "격리실", "수리 요청", "의공 번호", "거즈", "ㄱㄹㅅ", "처음으로", "물품 청구")
+
+def local_report(session_count, messages_per_session):
+    """이 프로세스에서 엔진을 만들고 세션마다 예시 메시지를 처리한 뒤 보고서 생성"""
+    from hierarchical_chatbot import HierarchicalHospitalChatbot
+    from chatbot_engine import get_engine
+    
+    engine = get_engine()
+    sessions = {}
+    # 세션 시작 안내 출력은 숨김
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(session_count):
+            session = HierarchicalHospitalChatbot(engine)
+            for j in range(messages_per_session):
+                session.process_message(SAMPLE_MESSAGES[(i + j) % len(SAMPLE_MESSAGES)])
+            sessions[i] = session
+    return build_report(sessions)
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='챗봇 메모리 사용량 보고서')
+    parser.add_argument('--server', help='실행 중인 서버 주소 (GET /admin/memory, 없으면 이 프로세스에서 측정)')
+    parser.add_argument('--token', default=os.environ.get('CHATBOT_ADMIN_TOKEN'),
+                        help='관리자 토큰 (기본값: CHATBOT_ADMIN_TOKEN 환경 변수)')
+    parser.add_argument('--sessions', type=int, default=100, help='측정용으로 만들 세션 수 (기본값: 100)')
+    parser.add_argument('--messages', type=int, default=10, help='세션마다 처리할 예시 메시지 수 (기본값: 10)')
+    parser.add_argument('--tracemalloc', action='store_true', help='엔진 생성 전부터 할당 위치 추적')
+    parser.add_argument('--json', action='store_true', help='JSON으로 출력')
+    args = parser.parse_args()
+    
+    if args.server:
+        request = urllib.request.Request(args.server.rstrip('/') + '/admin/memory',
+                                         headers={'X-Admin-Token': args.token or ''})
+        with urllib.request.urlopen(request) as response:
+            report = json.loads(response.read())
+    else:
+        if args.tracemalloc:
+            tracemalloc.start()
+        report = local_report(args.sessions, args.messages)
+    
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
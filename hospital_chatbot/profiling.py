@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+운영 중 프로파일링
+- 스택 샘플링: 정해진 시간 동안 작업자 스레드의 스택을 주기적으로 읽어(sys._current_frames)
+  플레임 그래프용 collapsed stack("스레드;함수;함수 횟수")으로 집계 - 측정 대상 코드는 그대로 실행
+- 요청 하나 프로파일: 다음 채팅 요청 하나만 cProfile로 실행하여 함수별 누적 시간 보고
+한 번에 하나만 실행하고 시간 상한을 두어 운영 서버에서 몇 초 동안 켜도 안전하도록 함
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+
+# 샘플링 허용 범위
+MAX_SAMPLE_SECONDS = 30.0
+MIN_SAMPLE_INTERVAL = 0.001
+
+# 기본 측정 대상 스레드 (PriorityDispatcher 작업자)
+WORKER_THREAD_PREFIXES = ("worker-", "emergency-worker-")
+
+# 맨 위 프레임이 이 파일들이면 일감을 기다리는 중 (기본적으로 집계에서 제외)
+IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+# 동시에 하나의 프로파일만 실행
+_profile_lock = threading.Lock()
+
+class ProfilerBusy(Exception):
+    """이미 다른 프로파일이 실행 중"""
+
+def _thread_group(name):
+    """스레드 이름의 번호 제거 ("worker-3" → "worker") - 같은 종류 스레드를 함께 집계"""
+    return re.sub(r"-\d+$", "", name)
+
+class StackSampler:
+    """시간 제한 스택 샘플링 프로파일러"""
+    
+    def __init__(self, seconds=5.0, interval=0.005, thread_prefixes=WORKER_THREAD_PREFIXES, include_idle=False):
+        """
+        Args:
+            seconds (float): 측정 시간 (최대 MAX_SAMPLE_SECONDS)
+            interval (float): 샘플 간격 (초, 최소 MIN_SAMPLE_INTERVAL)
+            thread_prefixes (tuple): 측정할 스레드 이름 접두어 (빈 값이면 전체)
+            include_idle (bool): 대기 중인 스택도 집계할지
+        """
+        self.seconds = min(max(seconds, 0.0), MAX_SAMPLE_SECONDS)
+        self.interval = max(interval, MIN_SAMPLE_INTERVAL)
+        self.thread_prefixes = tuple(thread_prefixes or ())
+        self.include_idle = include_idle
+        self.counts = {}
+        self.samples = 0
+        self.idle = 0
+        self._labels = {}   # 코드 객체 → 프레임 이름 (샘플마다 문자열을 만들지 않음)
+    
+    def _label(self, code):
+        """프레임 이름 ("함수 (파일:첫 줄)")"""
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+    
+    def run(self):
+        """
+        호출한 스레드에서 측정 (자기 자신은 제외)
+        Returns:
+            str: collapsed stack 텍스트 (flamegraph.pl, speedscope 등에서 바로 사용)
+        Raises:
+            ProfilerBusy: 다른 프로파일 실행 중
+        """
+        if not _profile_lock.acquire(blocking=False):
+            raise ProfilerBusy()
+        try:
+            self._sample_until(time.perf_counter() + self.seconds)
+        finally:
+            _profile_lock.release()
+        return self.collapsed()
+    
+    def _sample_until(self, deadline):
+        """deadline까지 interval 간격으로 스택 수집"""
+        own_ident = threading.get_ident()
+        names = {}
+        while time.perf_counter() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                name = names.get(ident)
+                if name is None:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    name = names.get(ident, f"thread-{ident}")
+                if self.thread_prefixes and not name.startswith(self.thread_prefixes):
+                    continue
+                if not self.include_idle and os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    self.idle += 1
+                    continue
+                
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(_thread_group(name))
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+            time.sleep(self.interval)
+    
+    def collapsed(self):
+        """집계 결과 (많이 잡힌 스택 순)"""
+        lines = [f"{stack} {count}" for stack, count in sorted(self.counts.items(), key=lambda item: -item[1])]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+class RequestProfiler:
+    """다음 채팅 요청 하나를 cProfile로 측정 (요청 처리 스레드에서만 측정)"""
+    
+    def __init__(self, top=40):
+        self.top = top
+        self._lock = threading.Lock()
+        self._done = None
+        self.armed = False
+        self.result = None
+    
+    def arm(self):
+        """
+        다음 요청 측정 예약
+        Raises:
+            ProfilerBusy: 다른 프로파일 실행 중
+        """
+        if not _profile_lock.acquire(blocking=False):
+            raise ProfilerBusy()
+        with self._lock:
+            self.result = None
+            self._done = threading.Event()
+            self.armed = True
+    
+    def claim(self):
+        """예약된 측정이 있으면 이 요청이 가져감 (예약이 없을 때는 속성 확인 한 번)"""
+        if not self.armed:
+            return False
+        with self._lock:
+            if not self.armed:
+                return False
+            self.armed = False
+            return True
+    
+    def run(self, function, label):
+        """function()을 cProfile로 실행하고 결과 보관"""
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            return function()
+        finally:
+            profile.disable()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(self.top)
+            self.result = f"{label} ({elapsed_ms:.1f}ms)\n{stream.getvalue()}"
+            self._done.set()
+    
+    def wait(self, timeout):
+        """
+        측정 결과 대기 - 시간 안에 요청이 없으면 예약 취소
+        Returns:
+            str: pstats 텍스트 (요청이 없었으면 None)
+        """
+        try:
+            if self._done.wait(timeout):
+                return self.result
+            with self._lock:
+                if not self.armed:
+                    # 취소 직전에 요청이 측정을 가져간 경우 끝날 때까지 대기
+                    self._done.wait()
+                    return self.result
+                self.armed = False
+            return None
+        finally:
+            _profile_lock.release()
+
+# 프로세스 전체에서 하나 (요청 처리 코드에서 claim 확인)
+request_profiler = RequestProfiler()
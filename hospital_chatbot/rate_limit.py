@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+토큰 버킷 요청 제한
+클라이언트(IP)·세션별로 초당 허용 요청 수(rate)와 순간 허용량(burst)을 두어
+재시도가 폭주하는 단말 하나가 다른 간호사들의 응답을 늦추지 않도록 함
+가득 찬 버킷은 새로 만든 버킷과 같으므로, 오래 쓰이지 않은 키는 주기적으로 지워 메모리를 제한
+"""
+
+import threading
+import time
+
+class TokenBucket:
+    """키 하나의 버킷 (키가 많아질 수 있으므로 __slots__로 객체 크기 최소화)"""
+    __slots__ = ("tokens", "updated_at")
+    
+    def __init__(self, tokens, updated_at):
+        self.tokens = tokens
+        self.updated_at = updated_at
+
+class RateLimiter:
+    """키(IP, 세션 ID 등)별 토큰 버킷 모음 - 스레드 안전"""
+    
+    def __init__(self, rate, burst, max_keys=100000, sweep_interval=60.0):
+        """
+        Args:
+            rate (float): 초당 채워지는 토큰 수 (지속 허용 요청 수)
+            burst (float): 버킷 크기 (한꺼번에 허용하는 요청 수)
+            max_keys (int): 보관할 최대 키 수 - 가득 차면 새 키는 거절
+            sweep_interval (float): 가득 찬(쉬고 있는) 버킷 정리 주기 (초)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval
+        self.allowed = 0
+        self.limited = 0
+    
+    def acquire(self, key, cost=1.0):
+        """
+        요청 하나 허용 여부 확인 (허용하면 토큰 차감)
+        Returns:
+            float: 허용이면 0, 거절이면 토큰이 다시 찰 때까지 기다릴 시간 (초)
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._sweep(now)
+                    if len(self._buckets) >= self.max_keys:
+                        self.limited += 1
+                        return self.burst / self.rate
+                bucket = self._buckets[key] = TokenBucket(self.burst, now)
+            else:
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * self.rate)
+                bucket.updated_at = now
+            
+            if bucket.tokens >= cost:
+                bucket.tokens -= cost
+                self.allowed += 1
+                return 0.0
+            self.limited += 1
+            return (cost - bucket.tokens) / self.rate
+    
+    def _sweep(self, now):
+        """다시 가득 찼을 버킷 제거 (잠금을 잡은 상태에서 호출)"""
+        expired = [
+            key for key, bucket in self._buckets.items()
+            if bucket.tokens + (now - bucket.updated_at) * self.rate >= self.burst
+        ]
+        for key in expired:
+            del self._buckets[key]
+        self._next_sweep = now + self.sweep_interval
+    
+    def snapshot(self):
+        """메모리 보고용 버킷 사본 (잠금을 잡고 복사)"""
+        with self._lock:
+            return dict(self._buckets)
+    
+    def stats(self):
+        """상태 확인용 집계"""
+        with self._lock:
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "tracked_keys": len(self._buckets),
+                "allowed": self.allowed,
+                "limited": self.limited
+            }
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+트래픽 재현 도구
+server.py --capture로 기록한 실제 병동 트래픽을 로컬 서버에 다시 보내
+성능 변경을 배포 전에 실제 부하 모양으로 확인
+
+    python3 replay.py run capture.jsonl.gz --server http://localhost:8000 --speed 1 --output before.jsonl
+    python3 replay.py run capture.jsonl.gz --server http://localhost:8001 --speed max --output after.jsonl
+    python3 replay.py diff before.jsonl after.jsonl
+
+- 기록된 도착 간격을 --speed 배로 줄여 재현 (max는 간격 없이 --concurrency개씩 동시에)
+- 같은 세션의 요청은 기록 순서대로, 앞 요청의 응답을 받은 뒤 보냄 (새 세션 ID는 응답에서 받아 이어 사용)
+- 결과 파일에는 요청별 상태 코드, 지연 시간, 응답 요약(카테고리, 본문·버튼 digest)을 기록
+- diff는 두 결과의 지연 분포와 응답이 달라진 요청을 보고 (달라진 요청이 있으면 종료 코드 1)
+
+요청 제한에 걸리지 않도록 재현 대상 서버는 --no-rate-limit으로 실행
+"""
+
+import argparse
+import collections
+import hashlib
+import http.client
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from capture import read_capture
+
+# 응답 본문이 매번 달라지는 카테고리 (인사말은 무작위 문구·시간대 인사) - 카테고리만 비교
+NONDETERMINISTIC_CATEGORIES = ("인사",)
+
+def percentile(samples, p):
+    """정렬된 표본의 백분위 값 (표본이 없으면 None)"""
+    if not samples:
+        return None
+    return round(samples[min(len(samples) - 1, int(len(samples) * p))], 2)
+
+def latency_summary(results):
+    """성공 응답(2xx)의 지연 분포"""
+    samples = sorted(result["latency_ms"] for result in results if 200 <= result["status"] < 300)
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 0.50),
+        "p95_ms": percentile(samples, 0.95),
+        "p99_ms": percentile(samples, 0.99),
+        "max_ms": round(samples[-1], 2) if samples else None
+    }
+
+def parse_sse(raw):
+    """SSE 응답 → /chat 응답과 같은 모양의 dict (meta + chunk 이어붙인 message + buttons)"""
+    response = {"message": ""}
+    for block in raw.decode("utf-8", "replace").split("\n\n"):
+        event, data = None, None
+        for line in block.split("\n"):
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: "):
+                data = json.loads(line[6:])
+        if event == "meta":
+            response.update(data)
+        elif event == "chunk":
+            response["message"] += data["text"]
+        elif event == "buttons":
+            response["buttons"] = data["buttons"]
+    return response
+
+def response_digest(response):
+    """응답 본문과 버튼 digest (본문이 매번 달라지는 카테고리는 None)"""
+    if response.get("category") in NONDETERMINISTIC_CATEGORIES:
+        return None
+    content = json.dumps([response.get("message"), response.get("buttons", [])], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+class Replayer:
+    """기록된 요청을 서버에 다시 보내는 재현기"""
+    
+    def __init__(self, server, records, speed=1.0, concurrency=16, timeout=10.0):
+        """
+        Args:
+            server (str): 대상 서버 주소 (http://localhost:8000)
+            records (list): read_capture의 요청 기록 (도착 시각순)
+            speed (float): 재현 속도 배율 (None이면 간격 없이 최대 속도)
+            concurrency (int): 동시에 보내는 최대 요청 수
+        """
+        self.server = server.rstrip("/")
+        self.records = records
+        self.speed = speed
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.results = [None] * len(records)
+        self._server_sessions = {}   # 기록 세션 번호 → 대상 서버가 준 세션 ID
+        self._busy = set()           # 응답을 기다리는 요청이 있는 세션 번호
+        self._waiting = {}           # 세션 번호 → 앞 요청을 기다리는 요청 번호 deque
+        self._lock = threading.Lock()
+        self.started_at = None
+        # 기록 시작부터 첫 요청까지의 시간은 건너뜀
+        self._origin = records[0]["t"] if records else 0.0
+    
+    def _offset(self, record):
+        """재현 시작 후 요청을 보낼 시각 (초, 최대 속도면 0)"""
+        return (record["t"] - self._origin) / 1000 / self.speed if self.speed else 0.0
+    
+    def run(self):
+        """모든 요청 재현 (끝날 때까지 대기) - Returns: 요청별 결과 목록"""
+        self.started_at = time.perf_counter()
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            for index, record in enumerate(self.records):
+                delay = self.started_at + self._offset(record) - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                self._schedule(executor, index)
+        return self.results
+    
+    def _schedule(self, executor, index):
+        """요청 하나 보내기 예약 - 같은 세션의 앞 요청이 진행 중이면 그 뒤에 대기"""
+        session = self.records[index]["s"]
+        if session is not None:
+            with self._lock:
+                if session in self._busy:
+                    self._waiting.setdefault(session, collections.deque()).append(index)
+                    return
+                self._busy.add(session)
+        executor.submit(self._send_session, index)
+    
+    def _send_session(self, index):
+        """요청을 보내고, 같은 세션에서 기다리던 요청을 이어서 순서대로 보냄"""
+        session = self.records[index]["s"]
+        while True:
+            self._send(index)
+            if session is None:
+                return
+            with self._lock:
+                waiting = self._waiting.get(session)
+                if not waiting:
+                    self._busy.discard(session)
+                    return
+                index = waiting.popleft()
+    
+    def _send(self, index):
+        """요청 하나 전송 후 결과 기록"""
+        record = self.records[index]
+        session = record["s"]
+        body = {"message": record["m"]}
+        if session in self._server_sessions:
+            body["session_id"] = self._server_sessions[session]
+        if "n" in record:
+            body["navigation"] = record["n"]
+        if "tn" in record:
+            body["tenant"] = record["tn"]
+        
+        request = urllib.request.Request(
+            self.server + record["p"], data=json.dumps(body, ensure_ascii=False).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        sent_at = time.perf_counter()
+        error = None
+        try:
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    status, raw = response.status, response.read()
+            except urllib.error.HTTPError as e:
+                status, raw = e.code, e.read()
+        except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+            status, raw, error = 0, b"", str(e) or type(e).__name__
+        latency_ms = (time.perf_counter() - sent_at) * 1000
+        
+        response = {}
+        if 200 <= status < 300:
+            # 본문이 잘렸거나 JSON이 아니면 실패(상태 0)로 기록 - 결과에 빈 자리가 남지 않도록
+            try:
+                response = parse_sse(raw) if record["p"].endswith("/stream") else json.loads(raw)
+                if not isinstance(response, dict):
+                    raise ValueError("JSON 객체가 아닌 응답")
+            except ValueError as e:
+                status, response, error = 0, {}, f"HTTP {status} 응답 해석 실패: {e}"
+            if session is not None and response.get("session_id"):
+                self._server_sessions[session] = response["session_id"]
+        
+        scheduled_at = self.started_at + self._offset(record)
+        self.results[index] = {
+            "i": index,
+            "p": record["p"],
+            "s": session,
+            "m": record["m"],
+            "status": status,
+            "latency_ms": round(latency_ms, 2),
+            "late_ms": round(max(0.0, sent_at - scheduled_at) * 1000, 1),
+            "category": response.get("category"),
+            "digest": response_digest(response) if response else None,
+            "error": error
+        }
+
+def run_command(args):
+    """기록 파일 재현 후 요약 출력, 결과 파일 저장"""
+    header, records = read_capture(args.capture)
+    speed = None if args.speed == "max" else float(args.speed)
+    span_seconds = (records[-1]["t"] - records[0]["t"]) / 1000 if records else 0
+    print(f"▶️ {args.capture}: 요청 {len(records)}개, 세션 {len({r['s'] for r in records if r['s']})}개, "
+          f"기록 길이 {span_seconds:.1f}초 (기록 시작 {header.get('started', '-')})")
+    print(f"   대상 {args.server}, 속도 {'최대' if speed is None else f'{speed:g}배'}, 동시 요청 {args.concurrency}")
+    
+    replayer = Replayer(args.server, records, speed, args.concurrency, args.timeout)
+    started = time.perf_counter()
+    results = replayer.run()
+    elapsed = time.perf_counter() - started
+    
+    statuses = collections.Counter(result["status"] for result in results)
+    summary = latency_summary(results)
+    late = sorted(result["late_ms"] for result in results)
+    print(f"✅ {elapsed:.1f}초에 완료 - 상태 코드 " + ", ".join(f"{code}: {n}" for code, n in sorted(statuses.items())))
+    print(f"   지연(ms) p50 {summary['p50_ms']}  p95 {summary['p95_ms']}  p99 {summary['p99_ms']}  max {summary['max_ms']}")
+    if speed is not None:
+        print(f"   예정 시각보다 늦게 보낸 시간(ms) p95 {percentile(late, 0.95)} (세션 순서 대기·동시 요청 부족)")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "replay": args.capture, "server": args.server, "speed": args.speed,
+                "elapsed_seconds": round(elapsed, 2), "latency": summary
+            }, ensure_ascii=False) + "\n")
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        print(f"💾 결과 저장: {args.output}")
+    return 0
+
+def read_results(path):
+    """결과 파일 읽기 - Returns: (헤더, 요청 번호 → 결과)"""
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        return header, {result["i"]: result for result in map(json.loads, f)}
+
+def mismatch_reason(old, new):
+    """같은 요청의 두 결과가 다른 이유 (같으면 None)"""
+    if old["status"] != new["status"]:
+        return "상태 코드"
+    if old["category"] != new["category"]:
+        return "카테고리"
+    if old["digest"] and new["digest"] and old["digest"] != new["digest"]:
+        return "본문/버튼"
+    return None
+
+def diff_command(args):
+    """두 재현 결과의 지연 분포와 응답 차이 비교"""
+    before_header, before = read_results(args.before)
+    after_header, after = read_results(args.after)
+    if before_header.get("replay") != after_header.get("replay"):
+        print(f"⚠️ 서로 다른 기록 파일의 결과입니다: {before_header.get('replay')} / {after_header.get('replay')}")
+    
+    before_summary = latency_summary(before.values())
+    after_summary = latency_summary(after.values())
+    print(f"{'':8}{'before':>10}{'after':>10}{'변화':>10}")
+    for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms"):
+        old, new = before_summary[key], after_summary[key]
+        change = f"{(new - old) / old * 100:+.1f}%" if old and new is not None else "-"
+        print(f"{key:8}{old if old is not None else '-':>10}{new if new is not None else '-':>10}{change:>10}")
+    
+    mismatches = []
+    for index in sorted(before.keys() & after.keys()):
+        reason = mismatch_reason(before[index], after[index])
+        if reason:
+            mismatches.append((reason, before[index], after[index]))
+    
+    compared = len(before.keys() & after.keys())
+    print(f"\n응답 비교: {compared}개 중 {len(mismatches)}개 다름")
+    for reason, old, new in mismatches[:args.show]:
+        print(f"  #{old['i']} {old['m'][:30]!r} ({reason}): "
+              f"{old['status']} {old['category']} → {new['status']} {new['category']}")
+    if len(mismatches) > args.show:
+        print(f"  ... 외 {len(mismatches) - args.show}개")
+    return 1 if mismatches else 0
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='기록한 채팅 트래픽 재현·비교 도구')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    run_parser = commands.add_parser('run', help='기록 파일을 서버에 재현')
+    run_parser.add_argument('capture', help='server.py --capture로 기록한 파일')
+    run_parser.add_argument('--server', default='http://localhost:8000', help='대상 서버 (기본값: http://localhost:8000)')
+    run_parser.add_argument('--speed', default='1', help='재현 속도 배율 또는 max (기본값: 1)')
+    run_parser.add_argument('--concurrency', type=int, default=16, help='동시에 보내는 최대 요청 수 (기본값: 16)')
+    run_parser.add_argument('--timeout', type=float, default=10.0, help='요청 제한 시간 초 (기본값: 10)')
+    run_parser.add_argument('--output', help='요청별 결과 파일 (diff 비교용)')
+    
+    diff_parser = commands.add_parser('diff', help='두 재현 결과 비교')
+    diff_parser.add_argument('before', help='기준 결과 파일')
+    diff_parser.add_argument('after', help='비교할 결과 파일')
+    diff_parser.add_argument('--show', type=int, default=10, help='표시할 다른 응답 수 (기본값: 10)')
+    
+    args = parser.parse_args()
+    if args.command == 'run':
+        return run_command(args)
+    return diff_command(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+요청 우선순위 스케줄링
+연결이 들어오면 요청 앞부분을 엿보아(MSG_PEEK, 소비하지 않음) 응급 키워드가 있으면
+응급 전용 대기열로 보내고, 응급 요청만 처리하는 예약 작업자를 따로 두어
+일반 요청이 밀려 있어도 응급 응답 지연이 늘어나지 않도록 함
+"""
+
+import json
+import re
+import select
+import socket
+import threading
+import time
+from collections import deque
+
+EMERGENCY_LANE = "emergency"
+NORMAL_LANE = "normal"
+
+# 분류를 위해 엿볼 최대 바이트 수 (헤더 + 본문 앞부분)
+PEEK_BYTES = 4096
+
+CONTENT_LENGTH_PATTERN = re.compile(rb"(?i)\r\ncontent-length:[ \t]*(\d+)")
+
+# 본문의 "message" 값 (다른 필드·문자열 속 키워드로 응급 대기열에 들어오지 않도록 이 값만 검사,
+# 엿본 범위에서 잘린 값은 잘린 데까지)
+MESSAGE_VALUE_PATTERN = re.compile(rb'(?<!\\)"message"\s*:\s*"((?:[^"\\]|\\.)*)')
+
+def _keyword_pattern(keywords):
+    """
+    본문에서 찾을 키워드 정규식 (UTF-8 원문과 JSON \\uXXXX 이스케이프 형태)
+    이스케이프의 16진수는 인코더에 따라 대문자(\\uC751)일 수 있으므로 대소문자 구분 없이 일치
+    """
+    patterns = set()
+    for keyword in keywords:
+        patterns.add(keyword.encode('utf-8'))
+        patterns.add(json.dumps(keyword)[1:-1].encode('ascii'))
+    return re.compile(b"|".join(re.escape(pattern) for pattern in sorted(patterns)), re.IGNORECASE)
+
+# 응급 키워드 정규식 (카탈로그 모듈을 소켓 바인딩 전에 읽지 않도록 서버가 바인딩 후 설정,
+# 설정 전에는 응급 전용 경로만 응급 대기열 - 본문은 처리 시 파싱한 메시지로 확인)
+_emergency_pattern = None
+
+def set_emergency_keywords(keywords):
+    """본문에서 찾을 응급 키워드 설정"""
+    global _emergency_pattern
+    _emergency_pattern = _keyword_pattern(keywords)
+
+def peek_request(request):
+    """
+    지금까지 도착한 요청 앞부분 (소켓에서 소비하지 않음, 기다리지 않음)
+    Returns:
+        bytes: 도착한 바이트 (아직 없으면 b""), 연결이 닫혔으면 None
+    """
+    try:
+        readable, _, _ = select.select([request], [], [], 0)
+        if not readable:
+            return b""
+        head = request.recv(PEEK_BYTES, socket.MSG_PEEK)
+    except (InterruptedError, OSError, ValueError):
+        return None
+    return head or None
+
+def is_head_complete(head):
+    """분류에 필요한 만큼 도착했는지 (헤더 전체 + 본문, 최대 PEEK_BYTES)"""
+    if len(head) >= PEEK_BYTES:
+        return True
+    header_end = head.find(b"\r\n\r\n")
+    if header_end < 0:
+        return False
+    if not head.startswith(b"POST "):
+        return True
+    match = CONTENT_LENGTH_PATTERN.search(head, 0, header_end + 2)
+    body_length = int(match.group(1)) if match else 0
+    return len(head) >= header_end + 4 + body_length
+
+def classify_head(head):
+    """
+    요청 앞부분의 응급 키워드 여부(또는 응급 전용 경로)로 대기열 결정 (제한된 길이만 검사)
+    POST는 본문 "message" 값에 응급 키워드가 있을 때만 응급 대기열 (처리 시 파싱한 메시지로 다시 확인)
+    """
+    if not head:
+        return NORMAL_LANE
+    if head.startswith(b"GET /emergency"):
+        return EMERGENCY_LANE
+    if head.startswith(b"POST ") and _emergency_pattern is not None:
+        match = MESSAGE_VALUE_PATTERN.search(head, head.find(b"\r\n\r\n") + 4)
+        if match and _emergency_pattern.search(match.group(1)):
+            return EMERGENCY_LANE
+    return NORMAL_LANE
+
+class ArrivalClassifier:
+    """
+    연결 분류 스레드
+    accept 직후에는 본문이 아직 도착하지 않았을 수 있으므로 max_wait 동안
+    poll_interval 간격으로 엿보다가, 요청이 다 도착하거나 시간이 지나면 대기열에 넣음
+    (accept 루프는 기다리지 않음)
+    """
+    
+    def __init__(self, dispatch, max_wait=0.02, poll_interval=0.002):
+        """
+        Args:
+            dispatch (callable): dispatch(lane, item) - 분류가 끝난 연결 전달
+        """
+        self._dispatch = dispatch
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._incoming = deque()
+        self.pending = 0   # 분류를 기다리는 연결 수
+        threading.Thread(target=self._run, name="arrival-classifier", daemon=True).start()
+    
+    def add(self, request, item):
+        """새 연결 분류 요청"""
+        with self._cond:
+            self._incoming.append((request, item, time.perf_counter() + self.max_wait))
+            self.pending += 1
+            self._cond.notify()
+    
+    def _run(self):
+        """분류 루프"""
+        pending = []
+        while True:
+            with self._cond:
+                if not self._incoming:
+                    self._cond.wait(self.poll_interval if pending else None)
+                pending.extend(self._incoming)
+                self._incoming.clear()
+            
+            now = time.perf_counter()
+            waiting = []
+            for request, item, deadline in pending:
+                head = peek_request(request)
+                if head is None or is_head_complete(head) or now >= deadline:
+                    self._dispatch(classify_head(head), item)
+                    with self._cond:
+                        self.pending -= 1
+                else:
+                    waiting.append((request, item, deadline))
+            pending = waiting
+
+class Deadline:
+    """요청 하나의 처리 시간 예산 (연결 접수 시각부터 계산 - 대기 시간 포함)"""
+    __slots__ = ("expires_at",)
+    
+    def __init__(self, seconds, started_at=None):
+        self.expires_at = (started_at or time.perf_counter()) + seconds
+    
+    def remaining(self):
+        """남은 시간 (초, 지났으면 음수)"""
+        return self.expires_at - time.perf_counter()
+    
+    def expired(self):
+        return self.remaining() <= 0
+
+class LatencyTracker:
+    """대기열별 응답 지연 (최근 표본의 백분위수와 목표 초과 횟수)"""
+    
+    def __init__(self, slo_ms, samples=1000):
+        self.slo_ms = slo_ms
+        self._samples = deque(maxlen=samples)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.slo_violations = 0
+    
+    def record(self, seconds):
+        """요청 하나의 지연 기록 (대기 시간 + 처리 시간)"""
+        ms = seconds * 1000
+        with self._lock:
+            self._samples.append(ms)
+            self.count += 1
+            if ms > self.slo_ms:
+                self.slo_violations += 1
+    
+    def stats(self):
+        """상태 확인용 집계"""
+        with self._lock:
+            samples = sorted(self._samples)
+            count, violations = self.count, self.slo_violations
+        
+        def percentile(p):
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 2)
+        
+        return {
+            "count": count,
+            "slo_ms": self.slo_ms,
+            "slo_violations": violations,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(samples[-1], 2) if samples else None
+        }
+
+class PriorityDispatcher:
+    """
+    두 대기열(응급/일반)과 고정 작업자 스레드
+    일반 작업자는 응급 대기열을 먼저 비우고, 예약 작업자는 응급 대기열만 처리
+    """
+    
+    def __init__(self, handle, workers=16, reserved_workers=2, emergency_slo_ms=200, normal_slo_ms=1000):
+        """
+        Args:
+            handle (callable): handle(item, lane, queued_seconds) - 작업자 스레드에서 호출
+            workers (int): 일반 작업자 수
+            reserved_workers (int): 응급 전용 작업자 수
+        """
+        self._handle = handle
+        lock = threading.Lock()
+        self._any_work = threading.Condition(lock)        # 일반 작업자 대기
+        self._emergency_work = threading.Condition(lock)  # 예약 작업자 대기
+        self._queues = {EMERGENCY_LANE: deque(), NORMAL_LANE: deque()}
+        self._active = 0   # 작업자가 처리 중인 작업 수
+        self.latency = {
+            EMERGENCY_LANE: LatencyTracker(emergency_slo_ms),
+            NORMAL_LANE: LatencyTracker(normal_slo_ms)
+        }
+        self.workers = workers
+        self.reserved_workers = reserved_workers
+        
+        for i in range(workers):
+            threading.Thread(target=self._work, args=(False,), name=f"worker-{i}", daemon=True).start()
+        for i in range(reserved_workers):
+            threading.Thread(target=self._work, args=(True,), name=f"emergency-worker-{i}", daemon=True).start()
+    
+    def submit(self, lane, item, arrived_at=None):
+        """
+        작업을 대기열에 추가
+        Args:
+            arrived_at (float): 연결 접수 시각 (perf_counter) - 지연 측정 기준, 없으면 지금
+        """
+        with self._any_work:
+            self._queues[lane].append((item, arrived_at or time.perf_counter()))
+            # 응급 작업은 예약 작업자와 일반 작업자 중 먼저 깨어난 쪽이 처리
+            if lane == EMERGENCY_LANE:
+                self._emergency_work.notify()
+            self._any_work.notify()
+    
+    def _next(self, emergency_only):
+        """처리할 다음 작업 (응급 우선) - 없으면 대기"""
+        emergency, normal = self._queues[EMERGENCY_LANE], self._queues[NORMAL_LANE]
+        condition = self._emergency_work if emergency_only else self._any_work
+        with condition:
+            while True:
+                if emergency:
+                    self._active += 1
+                    return EMERGENCY_LANE, emergency.popleft()
+                if normal and not emergency_only:
+                    self._active += 1
+                    return NORMAL_LANE, normal.popleft()
+                condition.wait()
+    
+    def _work(self, emergency_only):
+        """작업자 루프"""
+        while True:
+            lane, (item, queued_at) = self._next(emergency_only)
+            started = time.perf_counter()
+            try:
+                self._handle(item, lane, started - queued_at)
+            except Exception as e:
+                print(f"작업자 처리 오류: {e}")
+            finally:
+                self.latency[lane].record(time.perf_counter() - queued_at)
+                with self._any_work:
+                    self._active -= 1
+    
+    def in_flight(self):
+        """대기 중이거나 처리 중인 작업 수 (종료 전 drain 확인용)"""
+        with self._any_work:
+            return self._active + sum(len(queue) for queue in self._queues.values())
+    
+    def stats(self):
+        """상태 확인용 집계"""
+        with self._any_work:
+            depths = {lane: len(queue) for lane, queue in self._queues.items()}
+        return {
+            "workers": self.workers,
+            "reserved_emergency_workers": self.reserved_workers,
+            "queue_depth": depths,
+            "active": self._active,
+            "latency": {lane: tracker.stats() for lane, tracker in self.latency.items()}
+        }
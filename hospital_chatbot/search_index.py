@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+한글 자모 기반 검색 인덱스
+음절을 초성/중성/종성 자모로 분해한 n-gram 역색인으로
+한 글자 오타("심잔도" → "심전도")도 인덱스 조회만으로 찾아냄
+초성만 입력한 줄임말("ㄱㄹㅅ" → "격리실")은 초성 사전으로 바로 찾아냄
+입력 중인 접두어("격ㄹ")는 자모 트라이로 자동완성
+동의어·약어("ekg" ↔ "심전도")는 색인 생성 시 덧붙여 검색할 때는 한 번만 조회
+"""
+
+import re
+
+# 호환용 자모 (키보드로 직접 입력되는 글자와 같은 코드)
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSUNG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ",
+            "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+
+# 검색어/색인 대상 단어 (영문 소문자, 숫자, 한글 음절 및 자모)
+TERM_PATTERN = re.compile(r"[0-9a-z가-힣ㄱ-ㅎㅏ-ㅣ]+")
+
+# 오타 허용 검색 입력 제한 (자모 편집 거리 계산량 상한)
+MAX_FUZZY_TERMS = 8
+MAX_FUZZY_TERM_LENGTH = 30
+
+# 이름을 초성 색인용 조각으로 나누는 구분자 ("멸균품/거즈" → "멸균품", "거즈")
+NAME_SEGMENT_PATTERN = re.compile(r"[/(),\n]")
+
+def decompose_jamo(text):
+    """
+    한글 음절을 자모로 분해 (그 외 글자는 그대로)
+    예: "심전도" → "ㅅㅣㅁㅈㅓㄴㄷㅗ"
+    """
+    result = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            offset = code - HANGUL_BASE
+            result.append(CHOSUNG[offset // 588])
+            result.append(JUNGSUNG[(offset % 588) // 28])
+            result.append(JONGSUNG[offset % 28])
+        else:
+            result.append(char)
+    return "".join(result)
+
+def to_chosung(text):
+    """
+    한글 음절의 초성만 추출 (공백, 영문, 숫자 등은 제외)
+    예: "격리실" → "ㄱㄹㅅ", "ICU 전동" → "ㅈㄷ"
+    """
+    result = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            result.append(CHOSUNG[(code - HANGUL_BASE) // 588])
+        elif char in CHOSUNG:
+            result.append(char)
+    return "".join(result)
+
+def is_chosung_query(text):
+    """공백을 제외한 입력이 모두 초성(2글자 이상)인지 확인"""
+    compact = text.replace(" ", "")
+    return len(compact) >= 2 and all(char in CHOSUNG for char in compact)
+
+def tokenize(text):
+    """소문자 단어 목록 (괄호/쉼표 등으로 구분)"""
+    return TERM_PATTERN.findall(text.lower())
+
+def bounded_edit_distance(a, b, max_distance):
+    """
+    편집 거리 계산 - max_distance를 넘으면 즉시 max_distance + 1 반환
+    (행의 최솟값이 한도를 넘는 순간 중단)
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            cost = 0 if char_a == char_b else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return max_distance + 1
+        previous = current
+    
+    return previous[-1]
+
+class FuzzyIndex:
+    """자모 n-gram 역색인 - 단어 단위로 색인하고 항목 번호 집합을 연결"""
+    
+    def __init__(self, n=3):
+        self.n = n
+        self.terms = []          # 단어 원문
+        self.term_jamo = []      # 단어 자모 분해 문자열
+        self.term_entries = []   # 단어 → 포함 항목 번호 집합
+        self.term_ids = {}       # 단어 원문 → 단어 번호
+        self.postings = {}       # n-gram → 단어 번호 목록
+    
+    def _grams(self, jamo):
+        """시작/끝 표시를 붙인 자모 n-gram 집합"""
+        padded = f"^{jamo}$"
+        if len(padded) <= self.n:
+            return {padded}
+        return {padded[i:i + self.n] for i in range(len(padded) - self.n + 1)}
+    
+    def add(self, entry_id, text):
+        """항목의 텍스트를 단어 단위로 색인"""
+        for term in tokenize(text):
+            if len(term) < 2:
+                continue
+            
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                term_id = len(self.terms)
+                self.term_ids[term] = term_id
+                jamo = decompose_jamo(term)
+                self.terms.append(term)
+                self.term_jamo.append(jamo)
+                self.term_entries.append(set())
+                for gram in self._grams(jamo):
+                    self.postings.setdefault(gram, []).append(term_id)
+            
+            self.term_entries[term_id].add(entry_id)
+    
+    def max_distance_for(self, jamo):
+        """허용 편집 거리 (짧은 단어일수록 엄격하게)"""
+        if len(jamo) <= 3:
+            return 0
+        if len(jamo) <= 9:
+            return 1
+        return 2
+    
+    def lookup(self, term, max_candidates=20):
+        """
+        단어 하나에 대한 유사 단어 조회
+        Returns:
+            list: (단어, 편집 거리, 항목 번호 집합) - 거리순
+        """
+        jamo = decompose_jamo(term)
+        max_distance = self.max_distance_for(jamo)
+        if max_distance == 0:
+            term_id = self.term_ids.get(term)
+            return [(term, 0, self.term_entries[term_id])] if term_id is not None else []
+        
+        # n-gram 공유 개수로 후보 단어 선별 (q-gram 보조정리: 편집 1회당 최대 n개 손실)
+        grams = self._grams(jamo)
+        counts = {}
+        for gram in grams:
+            for term_id in self.postings.get(gram, ()):
+                counts[term_id] = counts.get(term_id, 0) + 1
+        
+        threshold = len(grams) - self.n * max_distance
+        candidates = [term_id for term_id, count in counts.items() if count >= threshold]
+        candidates.sort(key=lambda term_id: counts[term_id], reverse=True)
+        
+        matches = []
+        for term_id in candidates[:max_candidates]:
+            distance = bounded_edit_distance(jamo, self.term_jamo[term_id], max_distance)
+            if distance <= max_distance:
+                matches.append((self.terms[term_id], distance, self.term_entries[term_id]))
+        
+        matches.sort(key=lambda match: match[1])
+        return matches
+    
+    def search(self, text):
+        """
+        검색어 전체에 대한 오타 허용 검색
+        Returns:
+            dict: 항목 번호 → (점수, 교정된 단어 또는 None)
+        """
+        scores = {}
+        for query_term in tokenize(text)[:MAX_FUZZY_TERMS]:
+            if len(query_term) < 2 or len(query_term) > MAX_FUZZY_TERM_LENGTH:
+                continue
+            
+            # 검색어 단어마다 항목별 최고 점수만 반영
+            best = {}
+            for term, distance, entry_ids in self.lookup(query_term):
+                # 긴 단어 일치일수록, 편집 거리가 작을수록 높은 점수
+                score = len(term) * 2 - distance * 3
+                corrected = term if distance > 0 else None
+                for entry_id in entry_ids:
+                    if entry_id not in best or best[entry_id][0] < score:
+                        best[entry_id] = (score, corrected)
+            
+            for entry_id, (score, term) in best.items():
+                previous = scores.get(entry_id)
+                scores[entry_id] = (score, term) if previous is None else (previous[0] + score, previous[1] or term)
+        return scores
+
+class JamoSubstringIndex:
+    """
+    자모 2-gram 역색인 - 검색어의 모든 단어가 (자모 단위 부분 문자열로) 들어 있는 항목 조회
+    자모로 비교하므로 조합 중인 글자("격ㄹ")도 이어지는 입력("격리")과 같은 항목으로 좁혀짐
+    """
+    
+    def __init__(self):
+        self.jamo_texts = []  # 항목 번호 → 자모 분해 문자열
+        self.postings = {}    # 자모 2-gram → 항목 번호 목록 (오름차순)
+    
+    def add(self, text):
+        """항목 추가 (항목 번호는 추가 순서)"""
+        entry_id = len(self.jamo_texts)
+        jamo = decompose_jamo(text.lower())
+        self.jamo_texts.append(jamo)
+        for gram in {jamo[i:i + 2] for i in range(len(jamo) - 1)}:
+            self.postings.setdefault(gram, []).append(entry_id)
+    
+    def lookup(self, terms):
+        """
+        모든 단어가 들어 있는 항목 번호 (오름차순)
+        Args:
+            terms (list): 자모 분해한 검색어 단어 목록
+        """
+        grams = {term[i:i + 2] for term in terms for i in range(len(term) - 1)}
+        if not grams:
+            return self.narrow(range(len(self.jamo_texts)), terms)
+        
+        # 짧은 목록부터 교집합 (하나라도 없으면 결과 없음)
+        postings = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return self.narrow(sorted(candidates), terms)
+    
+    def narrow(self, candidates, terms):
+        """후보 중 모든 단어가 들어 있는 항목 번호 (후보 순서 유지)"""
+        return [entry_id for entry_id in candidates
+                if all(term in self.jamo_texts[entry_id] for term in terms)]
+
+class SynonymTable:
+    """
+    동의어·약어 묶음 (synonym_data.SYNONYM_GROUPS)
+    색인 생성 시 텍스트에 나오는 표기와 같은 묶음의 나머지 표기를 찾아 덧붙이거나 (자동완성·오타 허용·입력 중 검색),
+    검색어의 표기를 다른 표기로 바꾼 검색어를 만듦 (자유텍스트 검색 - 항목 점수는 원문 기준 유지)
+    모든 표기를 정규식 하나로 조회
+    """
+    
+    # 이 길이 이하의 한글 표기는 다른 단어 속("대변인", "액티비티")에서 일치하지 않도록 단어 단위로만 일치
+    SHORT_TERM_LENGTH = 2
+    
+    def __init__(self, groups):
+        self.groups = [[term.lower() for term in group] for group in groups]
+        self.term_groups = {term: group_id for group_id, group in enumerate(self.groups) for term in group}
+        # 긴 표기 먼저 ("pulse oximeter"가 "oximeter"보다 먼저 일치), 영문·짧은 한글 표기는 단어 단위로만 일치
+        alternatives = []
+        for term in sorted(self.term_groups, key=len, reverse=True):
+            escaped = re.escape(term)
+            if term.isascii():
+                escaped = rf"(?<![0-9a-z]){escaped}(?![0-9a-z])"
+            elif len(term) <= self.SHORT_TERM_LENGTH:
+                escaped = rf"(?<![가-힣]){escaped}(?![가-힣])"
+            alternatives.append(escaped)
+        self.pattern = re.compile("|".join(alternatives)) if alternatives else None
+    
+    def expand(self, text):
+        """
+        텍스트에 나오는 표기의 다른 표기 목록 (텍스트에 이미 있는 표기는 제외, 묶음 순서대로)
+        Args:
+            text (str): 소문자로 정규화된 텍스트
+        """
+        if self.pattern is None:
+            return []
+        group_ids = sorted({self.term_groups[match.group(0)] for match in self.pattern.finditer(text)})
+        return [term for group_id in group_ids for term in self.groups[group_id] if term not in text]
+    
+    def variants(self, text):
+        """
+        검색어에 나오는 표기를 같은 묶음의 다른 표기로 하나씩 바꾼 검색어 목록 ("ekg 수리" → "심전도 수리", "ecg 수리")
+        Args:
+            text (str): 소문자로 정규화된 검색어
+        """
+        if self.pattern is None:
+            return []
+        variants = []
+        for match in self.pattern.finditer(text):
+            before, after = text[:match.start()], text[match.end():]
+            for term in self.groups[self.term_groups[match.group(0)]]:
+                variant = f"{before}{term}{after}"
+                if term != match.group(0) and variant not in variants:
+                    variants.append(variant)
+        return variants
+
+class ChosungIndex:
+    """초성 문자열 → 노드 목록 사전 (노드는 호출하는 쪽에서 정한 튜플)"""
+    
+    def __init__(self):
+        self.nodes = {}
+    
+    def add(self, name, node):
+        """이름 전체와 구분자로 나눈 조각의 초성을 노드에 연결"""
+        segments = [name] + NAME_SEGMENT_PATTERN.split(name)
+        for segment in segments:
+            key = to_chosung(segment)
+            if len(key) < 2:
+                continue
+            
+            nodes = self.nodes.setdefault(key, [])
+            if node not in nodes:
+                nodes.append(node)
+    
+    def lookup(self, query):
+        """초성 입력에 해당하는 노드 목록 (등록 순서, 없으면 빈 목록)"""
+        return self.nodes.get(query.replace(" ", ""), [])
+
+class PrefixTrie:
+    """
+    자모 단위 접두어 트라이
+    조합 중인 글자("격ㄹ" = "ㄱㅕㄱㄹ")도 접두어로 일치하도록 자모로 분해하여 저장하고,
+    노드마다 하위 항목 번호를 보관하여 조회 비용은 접두어 길이에만 비례
+    """
+    
+    # 노드 딕셔너리에서 항목 번호 목록을 담는 키 (자모 글자와 겹치지 않음)
+    ENTRIES = None
+    
+    def __init__(self):
+        self.root = {}
+    
+    def insert(self, text, entry_id):
+        """텍스트의 모든 접두어 노드에 항목 번호 연결 (같은 항목은 한 번만)"""
+        node = self.root
+        for char in decompose_jamo(text.lower()):
+            node = node.setdefault(char, {})
+            entry_ids = node.setdefault(self.ENTRIES, [])
+            if entry_id not in entry_ids:
+                entry_ids.append(entry_id)
+    
+    def lookup(self, prefix):
+        """접두어로 시작하는 항목 번호 목록 (삽입 순서, 없으면 빈 목록)"""
+        node = self.root
+        for char in decompose_jamo(prefix.lower()):
+            node = node.get(char)
+            if node is None:
+                return []
+        return node.get(self.ENTRIES, [])
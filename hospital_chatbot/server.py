@@ -8,8 +8,149 @@ import os
 import json
 import urllib.parse
 import uuid
+import argparse
+import errno
+import hmac
+import math
+import signal
+import sys
+import socket
+import threading
+import time
+from datetime import datetime
 from http.server import HTTPServer, BaseHTTPRequestHandler
-from hierarchical_chatbot import HierarchicalHospitalChatbot
+from cache import search_cache, single_flight
+from scheduling import PriorityDispatcher, ArrivalClassifier, Deadline, NORMAL_LANE, set_emergency_keywords
+from rate_limit import RateLimiter
+from contacts import CONTACT_FIELDS
+from tracing import tracer, SpanExporter
+from session_snapshot import save_snapshot, load_snapshot
+from supervisor import Supervisor, inherited_fds, notify_ready, wait_for_turn
+from tenants import DEFAULT_TENANT, tenant_exists, available_tenants, string_pool, configure as configure_tenants
+from emergency import (
+    EmergencyAudit, emergency_keywords, emergency_responses, emergency_message, find_emergency_keyword,
+    current_timestamp, prepare as prepare_emergency
+)
+
+# 프로세스 시작 시각 (첫 응답까지 걸린 시간 보고용)
+PROCESS_START = time.perf_counter()
+
+class CatalogueLoader:
+    """카탈로그·인덱스 백그라운드 로더
+    
+    챗봇 모듈 import(엑셀 데이터 리터럴 실행), 엔진 인덱스/화면, 카탈로그 번들 생성을
+    소켓 바인딩 이후 별도 스레드에서 수행하여 정적 파일은 즉시 제공
+    """
+    
+    def __init__(self):
+        self._ready = threading.Event()
+        self.chatbot_class = None
+        self.engine = None
+        self.get_engine = None
+        self.get_bundle = None
+        self.loaded_tenants = None
+        self.help_text = None
+        self.error = None
+        self.load_seconds = None
+    
+    def start(self):
+        """백그라운드 로딩 시작"""
+        threading.Thread(target=self._load, name="catalogue-loader", daemon=True).start()
+    
+    def _load(self):
+        """챗봇 모듈과 카탈로그 구조 로드"""
+        started = time.perf_counter()
+        try:
+            from hierarchical_chatbot import HierarchicalHospitalChatbot
+            from chatbot_engine import get_engine, loaded_tenants, HELP_TEXT
+            from catalogue import get_catalogue_bundle
+            
+            engine = get_engine()
+            get_catalogue_bundle()
+            
+            self.chatbot_class = HierarchicalHospitalChatbot
+            self.engine = engine
+            self.get_engine = get_engine
+            self.get_bundle = get_catalogue_bundle
+            self.loaded_tenants = loaded_tenants
+            self.help_text = HELP_TEXT
+            self.load_seconds = time.perf_counter() - started
+            print(f"📚 카탈로그 로드 완료: {self.load_seconds * 1000:.1f}ms")
+        except Exception as e:
+            self.error = e
+            print(f"❌ 카탈로그 로드 오류: {e}")
+        finally:
+            self._ready.set()
+    
+    def wait(self, timeout):
+        """로딩 완료 대기 - 사용 가능하면 True"""
+        return self._ready.wait(timeout) and self.error is None
+    
+    @property
+    def ready(self):
+        return self._ready.is_set() and self.error is None
+
+# 프로세스 전체에서 공유하는 로더
+catalogue_loader = CatalogueLoader()
+
+# 작업자 스레드별 현재 요청 정보 (대기열 종류, 접수 시각, 대기 시간)
+request_context = threading.local()
+
+class PriorityHTTPServer(HTTPServer):
+    """응급/일반 대기열과 고정 작업자로 요청을 처리하는 HTTP 서버
+    
+    accept 루프는 연결을 분류 스레드에 넘기기만 하고, 분류가 끝난 연결은
+    응급 요청을 먼저 꺼내는 작업자 스레드가 처리 (응급 전용 작업자 예약)
+    """
+    
+    # 관리자 엔드포인트(/admin/...) 토큰 - 없으면 관리자 엔드포인트 비활성화
+    admin_token = None
+    
+    def __init__(self, server_address, handler_class, workers=16, reserved_workers=2, listen_fd=None):
+        """listen_fd: 감독 프로세스(supervisor.py)가 넘긴 리스닝 소켓 - 있으면 바인딩하지 않고 그 소켓에서 accept"""
+        super().__init__(server_address, handler_class, bind_and_activate=listen_fd is None)
+        if listen_fd is not None:
+            self.socket.close()
+            self.socket = socket.socket(fileno=listen_fd)
+            self.server_address = self.socket.getsockname()
+            self.server_name, self.server_port = self.server_address[:2]
+        self.dispatcher = PriorityDispatcher(self._process, workers, reserved_workers)
+        self.classifier = ArrivalClassifier(self._dispatch)
+        self.emergency_audit = EmergencyAudit(handler_class.record_emergency_history)
+    
+    def process_request(self, request, client_address):
+        """accept 직후 호출 - 분류 스레드로 넘기고 바로 다음 연결을 받음"""
+        self.classifier.add(request, (request, client_address, time.perf_counter()))
+    
+    def drain(self, timeout=10.0):
+        """
+        accept 루프를 멈춘 뒤 분류·대기·처리 중인 요청이 모두 끝날 때까지 대기
+        Returns:
+            int: 제한 시간이 지나 남은 요청 수 (0이면 모두 완료)
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = self.classifier.pending + self.dispatcher.in_flight()
+            if remaining == 0 or time.monotonic() >= deadline:
+                return remaining
+            time.sleep(0.05)
+    
+    def _dispatch(self, lane, item):
+        """분류가 끝난 연결을 해당 대기열에 추가 (지연은 accept 시각부터 측정)"""
+        self.dispatcher.submit(lane, item, arrived_at=item[2])
+    
+    def _process(self, item, lane, queued_seconds):
+        """작업자 스레드에서 요청 하나 처리"""
+        request, client_address, arrived_at = item
+        request_context.lane = lane
+        request_context.arrived_at = arrived_at
+        request_context.queued_seconds = queued_seconds
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
 
 class ChatbotRequestHandler(BaseHTTPRequestHandler):
     """챗봇 웹 서버 요청 처리 클래스"""
@@ -17,23 +158,100 @@ class ChatbotRequestHandler(BaseHTTPRequestHandler):
     # 클래스 변수로 사용자 세션 관리
     user_sessions = {}
     
-    def __init__(self, *args, **kwargs):
-        # 현재 파일의 디렉토리 경로
-        self.base_path = os.path.dirname(os.path.abspath(__file__))
-        super().__init__(*args, **kwargs)
+    # 요청마다 스레드가 달라지므로 세션 생성과 세션별 대화 처리를 잠금으로 보호
+    sessions_lock = threading.Lock()
+    session_locks = {}
+    
+    # 세션 ID → 테넌트 ID (세션은 만들어진 테넌트의 카탈로그로만 대화)
+    session_tenants = {}
+    
+    # 재시작 전 스냅샷에서 읽은 세션 (세션 ID → (테넌트 ID, 상태)) - 첫 요청 때 챗봇 세션으로 복원
+    pending_sessions = {}
+    hydrated_sessions = 0
+    
+    # 클라이언트 로컬 네비게이션 통계 (테넌트 ID → 화면 경로 → 조회 수)
+    navigation_stats = {}
+    
+    # 현재 파일의 디렉토리 경로 (요청마다 계산하지 않음)
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    
+    # 정적 파일 캐시 (경로 → (수정 시각, 내용 bytes))
+    static_cache = {}
+    
+    # 카탈로그 준비 대기 최대 시간 (초) - 초과 시 503
+    catalogue_wait_timeout = 10.0
+    
+    # 소켓 읽기 제한 시간 (초) - 요청을 보내지 않는 연결이 작업자를 붙잡지 않도록
+    timeout = 30
+    
+    # 채팅 요청 하나의 시간 예산 (초, 대기 시간 포함) - 부족하면 검색 대신 메뉴 응답
+    request_budget = 2.0
+    
+    # 일반 대기열에서 이 시간(초) 이상 기다린 요청은 처리하지 않고 바로 503
+    max_queue_seconds = 1.0
+    shed_count = 0
+    
+    # 요청 본문 최대 크기 (bytes)
+    max_body_bytes = 16 * 1024
+    
+    # 채팅 요청 제한 (토큰 버킷) - 초과 시 429와 Retry-After
+    # 병동 단말 여러 대가 같은 IP를 쓸 수 있으므로 IP 제한은 세션 제한보다 넉넉하게
+    client_limiter = RateLimiter(rate=10, burst=40)
+    session_limiter = RateLimiter(rate=2, burst=10)
+    # 새 세션 생성 속도 - 세션 ID 없이 반복 요청하는 클라이언트가 세션을 무한히 만들지 않도록 IP별로 제한하고,
+    # 전체 합계는 여러 IP가 함께 몰릴 때만 걸리는 훨씬 넉넉한 상한 (한 클라이언트가 병원 전체의 새 세션을 막지 않도록)
+    new_session_limiter = RateLimiter(rate=1, burst=20)
+    new_session_total_limiter = RateLimiter(rate=50, burst=500)
+    # 응급 키워드가 있는 메시지는 어떤 제한도 받지 않음 (본문을 읽어 확인한 뒤 제한)
+    # 부하 재현(replay.py --speed max 등) 시에는 --no-rate-limit으로 끔
+    rate_limit_enabled = True
+    
+    # 트래픽 기록 (--capture, 없으면 기록하지 않음)
+    traffic_capture = None
+    
+    # 관리자 기능 (profiling, memory_report 모듈은 처음 사용할 때 import - 서버 시작 시간에 포함하지 않음)
+    # 요청 하나 프로파일 (POST /admin/profile 요청 모드를 처음 쓰면 설정)
+    request_profiler = None
+    # 메모리 스냅샷 비교 (POST /admin/memory/snapshot)
+    memory_snapshots = None
+    
+    # 시작 후 첫 응답 시간 보고 여부
+    first_response_reported = False
+    first_chat_reported = False
     
     def do_GET(self):
         """GET 요청 처리 (HTML 페이지 및 정적 파일 서빙)"""
         try:
-            if self.path == '/' or self.path == '/index.html':
+            parsed = urllib.parse.urlparse(self.path)
+            path = parsed.path
+            if path == '/' or path == '/index.html':
                 self._serve_file('templates/hierarchical_index.html', 'text/html')
-            elif self.path == '/static/style.css':
+            elif path == '/static/style.css':
                 self._serve_file('static/style.css', 'text/css')
-            elif self.path == '/static/script.js':
+            elif path == '/static/script.js':
                 self._serve_file('static/script.js', 'application/javascript')
-            elif self.path == '/help':
+            elif path == '/sw.js':
+                # 서비스 워커는 루트 경로에서 제공해야 전체 페이지를 제어할 수 있음
+                self._serve_file('static/sw.js', 'application/javascript')
+            elif path == '/catalogue':
+                self._handle_catalogue_request(urllib.parse.parse_qs(parsed.query))
+            elif path == '/catalogue/version':
+                self._handle_catalogue_version_request(urllib.parse.parse_qs(parsed.query))
+            elif path == '/suggest':
+                if not self._shed_if_overloaded():
+                    self._handle_suggest_request(urllib.parse.parse_qs(parsed.query))
+            elif path == '/contact':
+                if not self._shed_if_overloaded():
+                    self._handle_contact_request(urllib.parse.parse_qs(parsed.query))
+            elif path == '/emergency':
+                self._handle_emergency_request(urllib.parse.parse_qs(parsed.query))
+            elif path == '/health':
+                self._handle_health_request()
+            elif path == '/admin/memory':
+                self._handle_memory_request()
+            elif path == '/help':
                 self._handle_help_request()
-            elif self.path == '/favicon.ico':
+            elif path == '/favicon.ico':
                 # favicon 요청 무시
                 self.send_response(204)
                 self.end_headers()
@@ -44,10 +262,36 @@ class ChatbotRequestHandler(BaseHTTPRequestHandler):
             self._send_error(500, "서버 내부 오류가 발생했습니다.")
     
     def do_POST(self):
+        """POST 요청 처리 - 채팅 요청은 trace ID를 붙여 구간별로 추적"""
+        if self.path not in ('/chat', '/chat/stream'):
+            self._handle_post()
+            return
+        
+        tracer.start(f"POST {self.path}",
+                     getattr(request_context, 'arrived_at', None),
+                     getattr(request_context, 'queued_seconds', 0.0),
+                     {"url.path": self.path,
+                      "client.address": self.client_address[0],
+                      "chatbot.lane": getattr(request_context, 'lane', None) or NORMAL_LANE})
+        try:
+            self._handle_post()
+        finally:
+            tracer.finish()
+    
+    def _handle_post(self):
         """POST 요청 처리 (챗봇 메시지 처리)"""
         try:
+            # 채팅 요청의 요청 제한(429)·대기 시간 초과(503)는 본문의 응급 키워드를 확인한 뒤 _read_chat_request에서
             if self.path == '/chat':
                 self._handle_chat_request()
+            elif self.path == '/chat/stream':
+                self._handle_chat_stream_request()
+            elif self.path == '/analytics':
+                self._handle_analytics_request()
+            elif self.path == '/admin/profile':
+                self._handle_profile_request()
+            elif self.path == '/admin/memory/snapshot':
+                self._handle_memory_snapshot_request()
             elif self.path == '/help':
                 self._handle_help_request()
             else:
@@ -56,52 +300,277 @@ class ChatbotRequestHandler(BaseHTTPRequestHandler):
             print(f"POST 요청 처리 오류: {e}")
             self._send_error(500, "서버 내부 오류가 발생했습니다.")
     
-    def _get_user_session(self, request_data):
+    def _get_user_session(self, request_data, tenant_id=DEFAULT_TENANT):
         """사용자 세션 가져오기 또는 생성"""
         session_id = request_data.get('session_id')
+        # 처음 요청된 테넌트는 엔진 생성이 오래 걸릴 수 있으므로 세션 잠금 밖에서 준비
+        engine = catalogue_loader.get_engine(tenant_id)
+        
+        # 세션 ID가 없거나 유효하지 않거나 다른 테넌트의 세션이면 새로 생성
+        with self.sessions_lock:
+            if session_id and session_id not in self.user_sessions and session_id in self.pending_sessions:
+                self._hydrate_session(session_id, tenant_id, engine)
+            if (not session_id or session_id not in self.user_sessions
+                    or self.session_tenants.get(session_id) != tenant_id):
+                session_id = str(uuid.uuid4())
+                self.user_sessions[session_id] = catalogue_loader.chatbot_class(engine)
+                self.session_locks[session_id] = threading.Lock()
+                self.session_tenants[session_id] = tenant_id
+                print(f"새 사용자 세션 생성: {session_id[:8]}...")
+            
+            return session_id, self.user_sessions[session_id]
+    
+    def _hydrate_session(self, session_id, tenant_id, engine):
+        """스냅샷에 있던 세션을 챗봇 세션으로 복원 (sessions_lock을 잡은 상태에서 호출)"""
+        snapshot_tenant, state = self.pending_sessions.pop(session_id)
+        if snapshot_tenant != tenant_id:
+            return
+        user_chatbot = catalogue_loader.chatbot_class(engine)
+        user_chatbot.restore_state(state)
+        self.user_sessions[session_id] = user_chatbot
+        self.session_locks[session_id] = threading.Lock()
+        self.session_tenants[session_id] = tenant_id
+        ChatbotRequestHandler.hydrated_sessions += 1
+    
+    @classmethod
+    def save_sessions(cls, path):
+        """세션 상태 스냅샷 저장 (아직 복원되지 않은 스냅샷 세션 포함) - Returns: 저장한 세션 수"""
+        with cls.sessions_lock:
+            sessions = [
+                (session_id, cls.session_tenants[session_id], user_chatbot.export_state())
+                for session_id, user_chatbot in cls.user_sessions.items()
+            ]
+            sessions.extend(
+                (session_id, tenant_id, state) for session_id, (tenant_id, state) in cls.pending_sessions.items()
+            )
+        return save_snapshot(path, sessions)
+    
+    def _shed_if_overloaded(self):
+        """
+        일반 대기열에서 너무 오래 기다린 요청이면 503 응답 후 True (응급 요청은 제외)
+        채팅 요청은 분류 시 키워드를 놓쳤을 수 있으므로 본문의 응급 키워드를 확인한 뒤 호출
+        """
+        if getattr(request_context, 'lane', None) != NORMAL_LANE:
+            return False
+        if request_context.queued_seconds < self.max_queue_seconds:
+            return False
+        
+        ChatbotRequestHandler.shed_count += 1
+        self._send_error(503, "요청이 많아 잠시 후 다시 시도해주세요.", {'Retry-After': '1'})
+        return True
+    
+    def _limit_client(self):
+        """클라이언트(IP)별 요청 제한 - 초과하면 429 응답 후 True (응급 메시지를 걸러낸 뒤 호출)"""
+        return self._reject_if_limited(self.client_limiter, self.client_address[0])
+    
+    def _limit_session(self, data):
+        """세션별 요청 제한, 새 세션이면 IP별·전체 세션 생성 속도 제한 - 초과하면 429 응답 후 True"""
+        session_id = data.get('session_id')
+        if session_id and (session_id in self.user_sessions or session_id in self.pending_sessions):
+            return self._reject_if_limited(self.session_limiter, session_id)
+        return (self._reject_if_limited(self.new_session_limiter, self.client_address[0])
+                or self._reject_if_limited(self.new_session_total_limiter, None))
+    
+    def _reject_if_limited(self, limiter, key):
+        """limiter에서 토큰을 얻지 못하면 429 응답 후 True"""
+        if not self.rate_limit_enabled:
+            return False
+        retry_after = limiter.acquire(key)
+        if not retry_after:
+            return False
+        seconds = max(1, math.ceil(retry_after))
+        self._send_error(429, f"요청이 너무 잦습니다. {seconds}초 후 다시 시도해주세요.",
+                         {'Retry-After': str(seconds)})
+        return True
+    
+    def _request_tenant(self, data=None, query=None):
+        """
+        요청의 테넌트 ID (X-Tenant-ID 헤더 → 본문 tenant → 쿼리 tenant 순, 없으면 기본 테넌트)
+        알 수 없는 테넌트면 404 응답 후 None
+        """
+        tenant_id = self.headers.get('X-Tenant-ID')
+        if not tenant_id and isinstance(data, dict):
+            tenant_id = data.get('tenant')
+        if not tenant_id and query:
+            tenant_id = query.get('tenant', [None])[0]
+        tenant_id = str(tenant_id).strip().lower() if tenant_id else DEFAULT_TENANT
+        
+        if not tenant_exists(tenant_id):
+            self._send_error(404, "등록되지 않은 병동/병원입니다.")
+            return None
+        return tenant_id
+    
+    def _process_chat(self, data, user_message, tenant_id=DEFAULT_TENANT, on_session=None, on_chunk=None):
+        """
+        세션의 챗봇으로 메시지 처리 (같은 세션의 동시 요청은 순서대로)
+        관리자가 요청 하나 프로파일을 예약했으면 이 요청을 cProfile로 실행
+        Args:
+            on_session (callable): on_session(세션 ID) - 세션을 찾은 직후, 매칭 전에 호출 (스트리밍 응답)
+            on_chunk (callable): on_chunk(단락, 카테고리) - 검색 결과 단락을 만드는 대로 호출 (스트리밍 응답)
+        Returns:
+            tuple: (세션 ID, 응답, 네비게이션 위치)
+        """
+        profiler = self.request_profiler
+        if profiler is not None and profiler.claim():
+            return profiler.run(
+                lambda: self._run_chat(data, user_message, tenant_id, on_session, on_chunk),
+                f"POST {self.path} {user_message[:30]!r}"
+            )
+        return self._run_chat(data, user_message, tenant_id, on_session, on_chunk)
+    
+    def _run_chat(self, data, user_message, tenant_id, on_session=None, on_chunk=None):
+        """_process_chat 본체"""
+        # 시간 예산은 연결 접수 시각부터 (대기열에서 기다린 시간 포함)
+        deadline = Deadline(self.request_budget, getattr(request_context, 'arrived_at', None))
+        with tracer.span("session.lookup", tenant=tenant_id) as span:
+            session_id, user_chatbot = self._get_user_session(data, tenant_id)
+            span.set("session_id", session_id[:8])
+        if on_session:
+            on_session(session_id)
+        
+        session_lock = self.session_locks[session_id]
+        with tracer.span("session.lock_wait"):
+            session_lock.acquire()
+        try:
+            if 'navigation' in data:
+                user_chatbot.sync_navigation(data['navigation'])
+            with tracer.span("process_message"):
+                bot_response = user_chatbot.process_message(user_message, deadline, on_chunk)
+            return session_id, bot_response, user_chatbot.get_navigation()
+        finally:
+            session_lock.release()
+    
+    def _require_catalogue(self):
+        """카탈로그 로딩 완료 대기 - 준비되지 않으면 503 응답 후 False"""
+        if catalogue_loader.wait(self.catalogue_wait_timeout):
+            return True
+        self._send_error(503, "챗봇 데이터를 불러오는 중입니다. 잠시 후 다시 시도해주세요.")
+        return False
+    
+    def _report_first_chat(self):
+        """프로세스 시작 후 첫 챗봇 응답까지 걸린 시간 출력 (1회)"""
+        if not ChatbotRequestHandler.first_chat_reported:
+            ChatbotRequestHandler.first_chat_reported = True
+            elapsed = (time.perf_counter() - PROCESS_START) * 1000
+            print(f"⏱️ 시작 후 첫 챗봇 응답까지 {elapsed:.1f}ms")
+    
+    def _handle_health_request(self):
+        """상태 확인 (컨테이너 readiness 확인용)"""
+        self._send_json_response({
+            "status": "ok" if catalogue_loader.ready else "loading",
+            "catalogue_ready": catalogue_loader.ready,
+            "catalogue_load_ms": round(catalogue_loader.load_seconds * 1000, 1) if catalogue_loader.load_seconds else None,
+            "search_cache": search_cache.stats(),
+            "single_flight": single_flight.stats(),
+            "scheduling": self.server.dispatcher.stats() if hasattr(self.server, 'dispatcher') else None,
+            "shed_requests": self.shed_count,
+            "sessions": {
+                "active": len(self.user_sessions),
+                "pending_snapshot": len(self.pending_sessions),
+                "hydrated": self.hydrated_sessions
+            },
+            "emergency_audit": self.server.emergency_audit.stats() if hasattr(self.server, 'emergency_audit') else None,
+            "tracing": tracer.stats(),
+            "capture": self.traffic_capture.stats() if self.traffic_capture else None,
+            "tenants": {
+                "available": available_tenants(),
+                "loaded": catalogue_loader.loaded_tenants() if catalogue_loader.ready else [],
+                "string_pool": string_pool.stats()
+            },
+            "rate_limit": {
+                "client": self.client_limiter.stats(),
+                "session": self.session_limiter.stats(),
+                "new_session": self.new_session_limiter.stats(),
+                "new_session_total": self.new_session_total_limiter.stats()
+            },
+            "uptime_seconds": round(time.perf_counter() - PROCESS_START, 1)
+        })
+    
+    def _read_chat_request(self, stream=False):
+        """
+        채팅 요청 본문을 읽어 (데이터, 메시지, 테넌트 ID) 반환 - 오류 시 응답 후 None
+        응급 키워드가 있으면 카탈로그·세션을 거치지 않고 미리 만든 응답을 보낸 뒤 None
+        (IP별 요청 제한과 대기 시간 초과도 응급 키워드를 확인한 뒤에 적용 - 응급 메시지는 제한하지 않음)
+        """
+        # 요청 데이터 읽기
+        content_length = int(self.headers.get('Content-Length', 0))
+        if content_length == 0:
+            self._send_error(400, "요청 데이터가 없습니다.")
+            return None
+        if content_length > self.max_body_bytes:
+            self._send_error(413, "요청 데이터가 너무 큽니다.")
+            return None
+        
+        post_data = self.rfile.read(content_length)
+        
+        # JSON 데이터 파싱
+        try:
+            data = json.loads(post_data.decode('utf-8'))
+        except json.JSONDecodeError:
+            self._send_error(400, "잘못된 JSON 형식입니다.")
+            return None
+        if not isinstance(data, dict):
+            self._send_error(400, "잘못된 요청 형식입니다.")
+            return None
         
-        # 세션 ID가 없거나 유효하지 않으면 새로 생성
-        if not session_id or session_id not in self.user_sessions:
-            session_id = str(uuid.uuid4())
-            self.user_sessions[session_id] = HierarchicalHospitalChatbot()
-            print(f"새 사용자 세션 생성: {session_id[:8]}...")
+        user_message = data.get('message', '').strip()
+        if not user_message:
+            self._send_error(400, "메시지가 비어있습니다.")
+            return None
         
-        return session_id, self.user_sessions[session_id]
+        # 응급 안내는 챗봇 처리의 첫 단계와 같은 판별 - 카탈로그 로딩 중에도 바로 응답
+        keyword = find_emergency_keyword(user_message)
+        if keyword:
+            self._send_emergency(keyword, '/chat/stream' if stream else '/chat',
+                                 user_message, data.get('session_id'))
+            self._capture_request(data, user_message, data.get('session_id'))
+            return None
+        
+        # 응급 대기열로 분류되었어도 메시지에 응급 키워드가 없으면 일반 요청으로 처리 (대기 시간 초과·세션 제한 적용)
+        request_context.lane = NORMAL_LANE
+        if self._limit_client() or self._shed_if_overloaded():
+            return None
+        
+        if not self._require_catalogue():
+            return None
+        
+        tenant_id = self._request_tenant(data)
+        if tenant_id is None:
+            return None
+        
+        if self._limit_session(data):
+            return None
+        
+        return data, user_message, tenant_id
+    
+    def _capture_request(self, data, user_message, session_id, tenant_id=DEFAULT_TENANT):
+        """트래픽 기록 중이면 채팅 요청 기록 (세션 ID는 응답한 세션 기준)"""
+        if self.traffic_capture is None:
+            return
+        self.traffic_capture.record(
+            getattr(request_context, 'arrived_at', None), self.path, user_message, session_id,
+            data.get('navigation'), tenant_id if tenant_id != DEFAULT_TENANT else None
+        )
     
     def _handle_chat_request(self):
         """챗봇 메시지 처리"""
         try:
-            # 요청 데이터 읽기
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length == 0:
-                self._send_error(400, "요청 데이터가 없습니다.")
-                return
-            
-            post_data = self.rfile.read(content_length)
-            
-            # JSON 데이터 파싱
-            try:
-                data = json.loads(post_data.decode('utf-8'))
-            except json.JSONDecodeError:
-                self._send_error(400, "잘못된 JSON 형식입니다.")
-                return
-            
-            user_message = data.get('message', '').strip()
-            if not user_message:
-                self._send_error(400, "메시지가 비어있습니다.")
+            request = self._read_chat_request()
+            if request is None:
                 return
+            data, user_message, tenant_id = request
             
-            # 사용자 세션 가져오기
-            session_id, user_chatbot = self._get_user_session(data)
-            
-            # 챗봇 응답 생성
-            bot_response = user_chatbot.process_message(user_message)
+            # 사용자 세션에서 챗봇 응답 생성
+            session_id, bot_response, navigation = self._process_chat(data, user_message, tenant_id)
+            self._capture_request(data, user_message, session_id, tenant_id)
             
-            # 세션 ID를 응답에 포함
+            # 세션 ID와 네비게이션 위치를 응답에 포함
             bot_response['session_id'] = session_id
+            bot_response['navigation'] = navigation
             
             # 성공 응답 전송
             self._send_json_response(bot_response)
+            self._report_first_chat()
             
             # 서버 로그 출력
             print(f"[{bot_response['timestamp']}] 세션 {session_id[:8]}: {user_message}")
@@ -111,17 +580,387 @@ class ChatbotRequestHandler(BaseHTTPRequestHandler):
             print(f"챗봇 요청 처리 오류: {e}")
             self._send_error(500, "챗봇 처리 중 오류가 발생했습니다.")
     
+    def _handle_chat_stream_request(self):
+        """챗봇 메시지 스트리밍 처리 (Server-Sent Events)
+        
+        세션을 찾으면 매칭·검색 전에 헤더와 meta(세션) 이벤트를 먼저 보내고,
+        검색 결과는 meta(카테고리) 뒤에 제목과 결과 단락을 만드는 대로 chunk로 전송
+        처리가 끝나면 meta(카테고리/네비게이션) → (아직 보내지 않은 본문) chunk → buttons → done
+        매 이벤트마다 flush 하여 첫 줄이 바로 표시되도록 함
+        """
+        self._stream_started = False
+        self._streamed_chunks = 0
+        session_id = None
+        try:
+            request = self._read_chat_request(stream=True)
+            if request is None:
+                return
+            data, user_message, tenant_id = request
+            
+            session_id, bot_response, navigation = self._process_chat(
+                data, user_message, tenant_id, self._start_stream, self._send_stream_chunk
+            )
+            self._capture_request(data, user_message, session_id, tenant_id)
+            with tracer.span("stream.send"):
+                self._send_sse_events(session_id, bot_response, navigation)
+            self._report_first_chat()
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 스트림 도중 연결을 끊은 경우
+            print(f"스트리밍 연결 종료: 세션 {(session_id or '-')[:8]}")
+            return
+        except Exception as e:
+            print(f"챗봇 스트리밍 요청 처리 오류: {e}")
+            if self._stream_started:
+                self._send_stream_error("챗봇 처리 중 오류가 발생했습니다.")
+            else:
+                self._send_error(500, "챗봇 처리 중 오류가 발생했습니다.")
+            return
+        
+        print(f"[{bot_response['timestamp']}] 세션 {session_id[:8]} (stream): {user_message}")
+    
+    def _start_stream(self, session_id):
+        """SSE 응답 헤더와 meta(세션) 이벤트 전송 - 세션을 찾은 직후, 매칭 전에 호출"""
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')  # 프록시 버퍼링 방지
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self._stream_started = True
+        self._send_sse_event('meta', {"session_id": session_id})
+    
+    def _send_stream_chunk(self, text, category):
+        """처리 중 만들어진 본문 단락 전송 (첫 단락 앞에 카테고리)"""
+        if not self._streamed_chunks:
+            self._send_sse_event('meta', {"category": category})
+        self._send_sse_event('chunk', {"text": text})
+        self._streamed_chunks += 1
+    
+    def _send_stream_error(self, message):
+        """헤더를 보낸 뒤 오류가 나면 안내 단락과 done으로 스트림 종료"""
+        try:
+            self._send_sse_event('chunk', {"text": f"\n\n{message}" if self._streamed_chunks else message})
+            self._send_sse_event('done', {})
+        except OSError:
+            pass
+    
+    def _send_sse_events(self, session_id, bot_response, navigation):
+        """처리 결과 전송 - 처리 중 보낸 단락이 없으면 본문도 단락 단위로 전송"""
+        self._send_sse_event('meta', {
+            "session_id": session_id,
+            "category": bot_response['category'],
+            "timestamp": bot_response['timestamp'],
+            "user_name": bot_response.get('user_name'),
+            "navigation": navigation
+        })
+        if not self._streamed_chunks:
+            for chunk in self._iter_message_chunks(bot_response['message']):
+                self._send_sse_event('chunk', {"text": chunk})
+        self._send_sse_event('buttons', {"buttons": bot_response.get('buttons', [])})
+        self._send_sse_event('done', {})
+    
+    def _iter_message_chunks(self, message):
+        """메시지를 단락 단위로 나누기 (제목 단락이 첫 청크, 빈 단락은 보내지 않음)"""
+        paragraphs = message.split("\n\n")
+        for i, paragraph in enumerate(paragraphs):
+            # 단락 구분자를 유지하여 클라이언트에서 이어붙이면 원문과 동일
+            chunk = paragraph if i == len(paragraphs) - 1 else paragraph + "\n\n"
+            if chunk:
+                yield chunk
+    
+    def _send_sse_event(self, event, data):
+        """SSE 이벤트 하나를 전송하고 즉시 flush"""
+        payload = json.dumps(data, ensure_ascii=False)
+        self.wfile.write(f"event: {event}\ndata: {payload}\n\n".encode('utf-8'))
+        self.wfile.flush()
+    
+    def _handle_emergency_request(self, query):
+        """응급 안내 전용 경로 (GET /emergency?q=입력) - 키워드가 없으면 404"""
+        text = query.get('q', [''])[0][:200]
+        keyword = find_emergency_keyword(text)
+        if not keyword:
+            self._send_error(404, "응급 키워드를 찾을 수 없습니다.")
+            return
+        self._send_emergency(keyword, '/emergency', text, query.get('session_id', [None])[0])
+    
+    def _send_emergency(self, keyword, route, user_message, session_id=None):
+        """미리 직렬화한 응급 응답을 소켓에 바로 쓰고 감사 기록은 대기열에 추가"""
+        prepared = emergency_responses()[keyword]['sse' if route == '/chat/stream' else 'json']
+        session_id, navigation = self._emergency_session(session_id)
+        # send_response를 거치지 않으므로 추적 ID 헤더와 응답 상태를 여기서 처리
+        trace = tracer.current()
+        tracer.set_status(200)
+        self.wfile.write(prepared.render(
+            current_timestamp(), trace.trace_id if trace else None, session_id, navigation
+        ))
+        self.wfile.flush()
+        self.close_connection = True
+        self.server.emergency_audit.record(keyword, route, user_message, session_id, self.client_address[0])
+    
+    def _emergency_session(self, session_id):
+        """
+        응급 응답에 담을 세션 ID와 네비게이션 위치 (세션을 새로 만들지 않음)
+        Returns:
+            tuple: (있는 세션이면 그 ID, 아니면 None / 현재 네비게이션 위치, 복원 전이거나 없으면 None)
+        """
+        if not session_id:
+            return None, None
+        with self.sessions_lock:
+            user_chatbot = self.user_sessions.get(session_id)
+            if user_chatbot is None and session_id not in self.pending_sessions:
+                return None, None
+        # 같은 세션의 긴 요청을 기다리지 않도록 세션 잠금 없이 위치만 읽음
+        return session_id, user_chatbot.get_navigation() if user_chatbot else None
+    
+    @classmethod
+    def record_emergency_history(cls, entry):
+        """응급 감사 기록을 세션 대화 기록에 반영 (감사 스레드에서 호출)"""
+        session_id = entry['session_id']
+        if not session_id or entry['message'] is None:
+            return
+        with cls.sessions_lock:
+            user_chatbot = cls.user_sessions.get(session_id)
+            session_lock = cls.session_locks.get(session_id)
+        if user_chatbot is None or session_lock is None:
+            return
+        with session_lock:
+            user_chatbot.conversation_history.append(f"사용자: {entry['message']}")
+            user_chatbot.conversation_history.append(f"봇: {emergency_message(entry['keyword'])[:100]}...")
+    
     def _handle_help_request(self):
         """도움말 요청 처리"""
         try:
-            # 임시 챗봇 인스턴스로 도움말 생성
-            temp_chatbot = HierarchicalHospitalChatbot()
-            help_response = temp_chatbot.get_help_message()
+            if not self._require_catalogue():
+                return
+            # 도움말은 고정 문구이므로 챗봇 인스턴스를 만들지 않고 응답
+            help_response = {
+                "message": catalogue_loader.help_text,
+                "category": "도움말",
+                "timestamp": self._get_current_time(),
+                "user_name": None
+            }
             self._send_json_response(help_response)
         except Exception as e:
             print(f"도움말 요청 처리 오류: {e}")
             self._send_error(500, "도움말 로드 중 오류가 발생했습니다.")
     
+    def _handle_catalogue_request(self, query):
+        """테넌트 카탈로그 번들 제공 (ETag 재검증 및 gzip 압축 지원)"""
+        if not self._require_catalogue():
+            return
+        tenant_id = self._request_tenant(query=query)
+        if tenant_id is None:
+            return
+        bundle = catalogue_loader.get_bundle(tenant_id)
+        
+        # 클라이언트가 같은 버전을 가지고 있으면 본문 없이 304
+        if self.headers.get('If-None-Match') == bundle['etag']:
+            self.send_response(304)
+            self.send_header('ETag', bundle['etag'])
+            self.end_headers()
+            return
+        
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = bundle['gzip_body'] if use_gzip else bundle['body']
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', bundle['etag'])
+        self.send_header('Cache-Control', 'no-cache')  # 매번 ETag로 재검증
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _handle_catalogue_version_request(self, query):
+        """테넌트 카탈로그 버전 (서비스 워커 갱신 확인용)"""
+        if not self._require_catalogue():
+            return
+        tenant_id = self._request_tenant(query=query)
+        if tenant_id is not None:
+            self._send_json_response({"version": catalogue_loader.get_bundle(tenant_id)['version']})
+    
+    def _handle_suggest_request(self, query):
+        """
+        검색창 자동완성 (GET /suggest?q=접두어&limit=N) - 조회 수 많은 화면 우선
+        results=N이면 입력 중 검색 결과도 함께 반환 (session_id가 있으면 이전 입력의 후보를 이어서 사용)
+        """
+        prefix = query.get('q', [''])[0][:50]
+        try:
+            limit = max(1, min(int(query.get('limit', ['5'])[0]), 10))
+            result_limit = max(0, min(int(query.get('results', ['0'])[0]), 10))
+        except ValueError:
+            limit, result_limit = 5, 0
+        
+        tenant_id = self._request_tenant(query=query)
+        if tenant_id is None:
+            return
+        
+        # 입력 중 요청이므로 카탈로그 로딩을 기다리지 않고 빈 목록 반환
+        suggestions = []
+        results = []
+        if catalogue_loader.ready:
+            engine = catalogue_loader.get_engine(tenant_id)
+            suggestions = engine.suggest(prefix, limit, self.navigation_stats.get(tenant_id))
+            if result_limit:
+                results = self._narrow_search(engine, prefix, result_limit, query.get('session_id', [None])[0])
+        
+        response = {"query": prefix, "suggestions": suggestions}
+        if result_limit:
+            response["results"] = results
+        self._send_json_response(response)
+    
+    def _narrow_search(self, engine, text, limit, session_id):
+        """입력 중 검색 - 세션에 이전 입력의 후보를 보관 (세션은 새로 만들지 않음)"""
+        user_chatbot = self.user_sessions.get(session_id) if session_id else None
+        state = user_chatbot.search_state if user_chatbot is not None else None
+        results, state = engine.narrow_search(text, limit, state)
+        if user_chatbot is not None:
+            # 튜플 하나를 바꾸므로 세션 잠금 없이 교체 (동시에 들어온 입력은 나중 상태만 남음)
+            user_chatbot.search_state = state
+        return results
+    
+    def _handle_contact_request(self, query):
+        """부서 연락처 조회 (GET /contact?q=부서 이름·초성·내선 번호) - 엔진 연락처 색인만 조회"""
+        text = query.get('q', [''])[0][:50]
+        if not self._require_catalogue():
+            return
+        tenant_id = self._request_tenant(query=query)
+        if tenant_id is None:
+            return
+        
+        records = catalogue_loader.get_engine(tenant_id).find_contacts(text, require_intent=False)
+        contacts = [{field: record[field] for field in CONTACT_FIELDS} for record in records]
+        self._send_json_response({"query": text, "contacts": contacts})
+    
+    def _require_admin(self):
+        """관리자 토큰(X-Admin-Token) 확인 - 토큰 미설정이면 404, 틀리면 403 응답 후 False"""
+        admin_token = getattr(self.server, 'admin_token', None)
+        if not admin_token:
+            self._send_error(404, "API 엔드포인트를 찾을 수 없습니다.")
+            return False
+        given = self.headers.get('X-Admin-Token', '').encode('utf-8')
+        if not hmac.compare_digest(given, admin_token.encode('utf-8')):
+            self._send_error(403, "관리자 권한이 필요합니다.")
+            return False
+        return True
+    
+    def _handle_profile_request(self):
+        """
+        운영 중 프로파일링 (POST /admin/profile, 관리자 전용)
+        {"mode": "sample", "seconds": 5, "interval_ms": 5} - 작업자 스레드 스택 샘플링, collapsed stack 텍스트
+        {"mode": "request", "seconds": 10} - 그 시간 안에 들어오는 채팅 요청 하나를 cProfile로 측정
+        """
+        if not self._require_admin():
+            return
+        from profiling import StackSampler, ProfilerBusy, request_profiler, MAX_SAMPLE_SECONDS
+        
+        content_length = int(self.headers.get('Content-Length', 0))
+        try:
+            data = json.loads(self.rfile.read(content_length).decode('utf-8')) if content_length else {}
+            mode = data.get('mode', 'sample')
+            seconds = min(float(data.get('seconds', 5)), MAX_SAMPLE_SECONDS)
+            interval = float(data.get('interval_ms', 5)) / 1000
+        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError, TypeError, ValueError):
+            self._send_error(400, "잘못된 프로파일 요청입니다.")
+            return
+        
+        try:
+            if mode == 'request':
+                ChatbotRequestHandler.request_profiler = request_profiler
+                request_profiler.arm()
+                print(f"🔬 요청 프로파일 대기 ({seconds:.0f}초)")
+                result = request_profiler.wait(seconds)
+                if result is None:
+                    self._send_error(408, "시간 안에 채팅 요청이 없었습니다.")
+                    return
+                self._send_text_response(result)
+            else:
+                sampler = StackSampler(seconds, interval, include_idle=bool(data.get('include_idle')))
+                print(f"🔬 스택 샘플링 시작 ({sampler.seconds:.0f}초, {sampler.interval * 1000:.0f}ms 간격)")
+                collapsed = sampler.run()
+                self._send_text_response(collapsed, {
+                    'X-Profile-Samples': str(sampler.samples),
+                    'X-Profile-Idle-Stacks': str(sampler.idle)
+                })
+        except ProfilerBusy:
+            self._send_error(409, "다른 프로파일이 실행 중입니다.")
+    
+    def _memory_report(self):
+        """세션·카탈로그·엔진·캐시 메모리 보고서 (서버가 가진 캐시 포함)"""
+        from memory_report import build_report as build_memory_report
+        # 요청 스레드가 바꾸는 딕셔너리는 잠금을 잡고 만든 사본으로 계산 (순회 중 크기 변경 방지)
+        with self.sessions_lock:
+            sessions = dict(self.user_sessions)
+            session_locks = dict(self.session_locks)
+            session_tenants = dict(self.session_tenants)
+        return build_memory_report(sessions, {
+            "static_files": dict(self.static_cache),
+            "session_locks": session_locks,
+            "session_tenants": session_tenants,
+            "navigation_stats": {tenant_id: dict(stats) for tenant_id, stats in list(self.navigation_stats.items())},
+            "rate_limit": [limiter.snapshot() for limiter in (
+                self.client_limiter, self.session_limiter,
+                self.new_session_limiter, self.new_session_total_limiter
+            )]
+        })
+    
+    def _handle_memory_request(self):
+        """메모리 사용량 보고 (GET /admin/memory, 관리자 전용)"""
+        if self._require_admin():
+            self._send_json_response(self._memory_report())
+    
+    def _handle_memory_snapshot_request(self):
+        """
+        메모리 스냅샷 (POST /admin/memory/snapshot, 관리자 전용) - 직전 스냅샷과의 차이 응답
+        {"stop": true}면 tracemalloc을 끄고 스냅샷 삭제
+        """
+        if not self._require_admin():
+            return
+        
+        content_length = int(self.headers.get('Content-Length', 0))
+        try:
+            data = json.loads(self.rfile.read(content_length).decode('utf-8')) if content_length else {}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self._send_error(400, "잘못된 JSON 형식입니다.")
+            return
+        
+        if ChatbotRequestHandler.memory_snapshots is None:
+            from memory_report import MemorySnapshots
+            ChatbotRequestHandler.memory_snapshots = MemorySnapshots()
+        if isinstance(data, dict) and data.get('stop'):
+            self.memory_snapshots.stop()
+            self._send_json_response({"stopped": True})
+            return
+        self._send_json_response(self.memory_snapshots.take(self._memory_report()))
+    
+    def _handle_analytics_request(self):
+        """클라이언트 로컬 네비게이션 분석 핑 처리"""
+        content_length = int(self.headers.get('Content-Length', 0))
+        try:
+            data = json.loads(self.rfile.read(content_length).decode('utf-8')) if content_length else {}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self._send_error(400, "잘못된 JSON 형식입니다.")
+            return
+        if not isinstance(data, dict):
+            self._send_error(400, "잘못된 요청 형식입니다.")
+            return
+        
+        tenant_id = self._request_tenant(data)
+        if tenant_id is None:
+            return
+        
+        screen = str(data.get('screen', ''))[:200]
+        if screen:
+            stats = self.navigation_stats.setdefault(tenant_id, {})
+            stats[screen] = stats.get(screen, 0) + 1
+        
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+    
     def _serve_file(self, file_path, content_type):
         """파일 서빙"""
         # 보안: 경로 탐색 공격 방지
@@ -137,15 +976,23 @@ class ChatbotRequestHandler(BaseHTTPRequestHandler):
             return
         
         try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # 파일이 바뀌지 않았으면 메모리에 캐시된 내용 사용
+            mtime = os.stat(full_path).st_mtime
+            cached = self.static_cache.get(full_path)
+            if cached and cached[0] == mtime:
+                body = cached[1]
+            else:
+                with open(full_path, 'r', encoding='utf-8') as f:
+                    body = f.read().encode('utf-8')
+                self.static_cache[full_path] = (mtime, body)
             
             self.send_response(200)
             self.send_header('Content-type', content_type + '; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
             self.send_header('Cache-Control', 'no-cache')
             self.send_header('X-Content-Type-Options', 'nosniff')  # 보안 헤더
             self.end_headers()
-            self.wfile.write(content.encode('utf-8'))
+            self.wfile.write(body)
             
         except FileNotFoundError:
             self._send_error(404, f"파일을 찾을 수 없습니다: {file_path}")
@@ -157,6 +1004,15 @@ class ChatbotRequestHandler(BaseHTTPRequestHandler):
             print(f"파일 서빙 오류: {e}")
             self._send_error(500, "파일 로드 중 오류가 발생했습니다.")
     
+    def send_response(self, code, message=None):
+        """상태 줄 전송 - 추적 중인 요청이면 상태 코드를 기록하고 X-Trace-ID 헤더 추가"""
+        super().send_response(code, message)
+        trace = tracer.current()
+        if trace is not None:
+            tracer.set_status(code)
+            self.send_header('X-Trace-ID', trace.trace_id)
+            self.send_header('Access-Control-Expose-Headers', 'X-Trace-ID')
+    
     def _send_json_response(self, data):
         """JSON 응답 전송"""
         self.send_response(200)
@@ -166,14 +1022,30 @@ class ChatbotRequestHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
         
-        response_data = json.dumps(data, ensure_ascii=False, indent=2)
-        self.wfile.write(response_data.encode('utf-8'))
+        with tracer.span("serialize") as span:
+            response_data = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+            span.set("bytes", len(response_data))
+        self.wfile.write(response_data)
+    
+    def _send_text_response(self, text, headers=None):
+        """텍스트 응답 전송 (프로파일 결과 등)"""
+        body = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
     
-    def _send_error(self, status_code, message):
-        """에러 응답 전송"""
+    def _send_error(self, status_code, message, headers=None):
+        """에러 응답 전송 (headers: Retry-After 등 추가 헤더)"""
         self.send_response(status_code)
         self.send_header('Content-type', 'application/json; charset=utf-8')
         self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         
         error_data = {
@@ -196,32 +1068,71 @@ class ChatbotRequestHandler(BaseHTTPRequestHandler):
     
     def _get_current_time(self):
         """현재 시간 반환"""
-        from datetime import datetime
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     def log_message(self, format, *args):
         """서버 로그 메시지 포맷팅"""
         print(f"[서버] {self._get_current_time()} - {format % args}")
+        
+        if not ChatbotRequestHandler.first_response_reported:
+            ChatbotRequestHandler.first_response_reported = True
+            elapsed = (time.perf_counter() - PROCESS_START) * 1000
+            print(f"⏱️ 시작 후 첫 응답까지 {elapsed:.1f}ms")
 
 class HospitalChatbotServer:
     """병원 챗봇 서버 클래스"""
     
-    def __init__(self, host='localhost', port=8000):
+    def __init__(self, host='localhost', port=8000, workers=16, emergency_workers=2, admin_token=None,
+                 session_snapshot=None, drain_timeout=10.0, ready_timeout=120.0):
         self.host = host
         self.port = port
+        self.workers = workers
+        self.emergency_workers = emergency_workers
+        self.admin_token = admin_token
+        self.session_snapshot = session_snapshot
+        self.drain_timeout = drain_timeout
+        self.ready_timeout = ready_timeout
         self.server = None
+        self.serving = False
     
     def start(self):
         """서버 시작"""
         try:
             server_address = (self.host, self.port)
-            self.server = HTTPServer(server_address, ChatbotRequestHandler)
+            # 고정 작업자 + 응급 전용 작업자 - 일반 요청이 밀려도 응급 요청은 바로 처리
+            # 감독 프로세스(--supervise) 아래에서는 감독 프로세스가 연 소켓을 이어받음
+            listen_fd, ready_fd, go_fd = inherited_fds()
+            self.server = PriorityHTTPServer(
+                server_address, ChatbotRequestHandler, self.workers, self.emergency_workers, listen_fd
+            )
+            self.server.admin_token = self.admin_token
+            bind_ms = (time.perf_counter() - PROCESS_START) * 1000
+            
+            # 배포 도구의 SIGTERM도 Ctrl+C와 같이 정상 종료 (요청 drain, 세션 저장)
+            signal.signal(signal.SIGTERM, signal.default_int_handler)
+            
+            # 응급 키워드·응답은 바인딩 직후 준비 (연결은 serve_forever 전까지 대기열에서 기다림)
+            prepare_emergency()
+            set_emergency_keywords(emergency_keywords())
+            
+            # 소켓 바인딩 후 카탈로그를 백그라운드에서 로드
+            catalogue_loader.start()
+            
+            # 재시작: 카탈로그가 준비되면 알리고, 기존 프로세스가 세션을 저장하고 끝날 때까지 대기
+            if ready_fd is not None:
+                notify_ready(ready_fd, catalogue_loader.wait(self.ready_timeout))
+                wait_for_turn(go_fd)
+            
+            # 이전 실행의 세션은 상태만 읽어 두고 첫 요청 때 복원
+            ChatbotRequestHandler.pending_sessions = load_snapshot(self.session_snapshot)
+            if ChatbotRequestHandler.pending_sessions:
+                print(f"♻️ 세션 스냅샷 {len(ChatbotRequestHandler.pending_sessions)}개 (첫 요청 때 복원)")
             
             print("=" * 60)
             print("🏥 삼성서울병원 중앙간호사 도우미 서버")
             print("=" * 60)
             print(f"📍 서버 주소: http://{self.host}:{self.port}")
-            print(f"🚀 서버가 시작되었습니다...")
+            print(f"🚀 서버가 시작되었습니다... (바인딩까지 {bind_ms:.1f}ms)")
             print("=" * 60)
             print("📋 이용 방법:")
             print("   1. 웹 브라우저에서 위 주소로 접속")
@@ -230,13 +1141,17 @@ class HospitalChatbotServer:
             print("=" * 60)
             
             # 서버 실행
+            self.serving = True
             self.server.serve_forever()
             
         except KeyboardInterrupt:
             print("\n🛑 서버를 종료합니다...")
+            # 종료 중 들어오는 시그널(감독 프로세스의 SIGTERM 등)로 세션 저장이 끊기지 않도록 무시
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
             self.stop()
         except OSError as e:
-            if e.errno == 48:  # Address already in use
+            if e.errno == errno.EADDRINUSE:
                 print(f"❌ 포트 {self.port}가 이미 사용 중입니다.")
                 print(f"   다른 포트를 사용하거나 기존 프로세스를 종료해주세요.")
             else:
@@ -245,24 +1160,81 @@ class HospitalChatbotServer:
             print(f"❌ 예상치 못한 오류가 발생했습니다: {e}")
     
     def stop(self):
-        """서버 중지"""
-        if self.server:
+        """서버 중지 - 새 연결을 받지 않고 진행 중인 요청을 마친 뒤 세션 스냅샷 저장"""
+        # serve_forever 전(재시작 대기 중)에 종료되면 받은 요청도 읽은 세션도 없으므로 소켓만 정리
+        if self.server and self.serving:
             self.server.shutdown()
+            remaining = self.server.drain(self.drain_timeout)
+            if remaining:
+                print(f"⚠️ {self.drain_timeout:.0f}초 안에 끝나지 않은 요청 {remaining}개")
+            if self.session_snapshot:
+                try:
+                    count = ChatbotRequestHandler.save_sessions(self.session_snapshot)
+                    print(f"💾 세션 {count}개 저장: {self.session_snapshot}")
+                except OSError as e:
+                    print(f"❌ 세션 스냅샷 저장 오류: {e}")
             self.server.server_close()
+            if tracer.exporter:
+                tracer.exporter.flush()
+            if ChatbotRequestHandler.traffic_capture:
+                ChatbotRequestHandler.traffic_capture.flush()
             print("✅ 서버가 정상적으로 종료되었습니다.")
 
 def main():
     """메인 실행 함수"""
-    import argparse
-    
     parser = argparse.ArgumentParser(description='삼성서울병원 중앙간호사 도우미 서버')
     parser.add_argument('--host', default='localhost', help='서버 호스트 (기본값: localhost)')
     parser.add_argument('--port', type=int, default=8000, help='서버 포트 (기본값: 8000)')
+    parser.add_argument('--workers', type=int, default=16, help='일반 작업자 스레드 수 (기본값: 16)')
+    parser.add_argument('--emergency-workers', type=int, default=2, help='응급 전용 작업자 스레드 수 (기본값: 2)')
+    parser.add_argument('--tenants-dir', help='병동/병원별 카탈로그 JSON 디렉토리 (<테넌트 ID>.json)')
+    parser.add_argument('--admin-token', default=os.environ.get('CHATBOT_ADMIN_TOKEN'),
+                        help='관리자 엔드포인트(/admin/...) 토큰 (기본값: CHATBOT_ADMIN_TOKEN 환경 변수, 없으면 비활성화)')
+    parser.add_argument('--session-snapshot', metavar='FILE',
+                        help='종료 시 세션 상태를 저장하고 시작 시 복원할 파일 (.jsonl.gz)')
+    parser.add_argument('--drain-timeout', type=float, default=10.0,
+                        help='종료 시 진행 중인 요청을 기다리는 최대 시간 초 (기본값: 10)')
+    parser.add_argument('--capture', metavar='FILE',
+                        help='채팅 요청을 이름·번호를 가려 기록할 파일 (.jsonl.gz, replay.py로 재현)')
+    parser.add_argument('--no-rate-limit', action='store_true',
+                        help='요청 제한 끄기 (replay.py 부하 재현·벤치마크용)')
+    parser.add_argument('--trace-dir', help='요청 trace(JSON lines, OTLP 형식)를 기록할 디렉토리 (없으면 기록하지 않음)')
+    parser.add_argument('--trace-slow-ms', type=float, default=500.0,
+                        help='이 시간(ms) 이상 걸린 요청은 trace를 항상 기록 (기본값: 500)')
+    parser.add_argument('--trace-sample-rate', type=float, default=0.01,
+                        help='빠르고 정상인 요청 중 trace를 기록할 비율 (기본값: 0.01)')
+    
+    parser.add_argument('--supervise', action='store_true',
+                        help='감독 프로세스로 실행 - 소켓을 유지한 채 SIGHUP으로 서버 프로세스 무중단 재시작 '
+                             '(--session-snapshot 없이 실행하면 재시작할 때마다 모든 세션이 초기화됨)')
+    parser.add_argument('--ready-timeout', type=float, default=120.0,
+                        help='재시작 시 새 프로세스의 카탈로그 로드를 기다리는 최대 시간 초 (기본값: 120)')
     
     args = parser.parse_args()
+    if args.supervise:
+        # 서버 프로세스는 같은 인자로 실행 (--supervise 제외)
+        server_args = [arg for arg in sys.argv[1:] if arg != '--supervise']
+        if not args.session_snapshot:
+            print("⚠️ --session-snapshot 없이 실행하면 재시작(SIGHUP)할 때마다 모든 세션이 초기화됩니다.")
+        supervisor = Supervisor(args.host, args.port, server_args, args.ready_timeout, args.drain_timeout + 20.0)
+        sys.exit(supervisor.run())
+    configure_tenants(args.tenants_dir)
+    tracer.configure(SpanExporter(args.trace_dir) if args.trace_dir else None,
+                     args.trace_slow_ms, args.trace_sample_rate)
+    if args.no_rate_limit:
+        ChatbotRequestHandler.rate_limit_enabled = False
+    if args.capture:
+        from capture import TrafficCapture
+        try:
+            ChatbotRequestHandler.traffic_capture = TrafficCapture(args.capture)
+        except FileExistsError:
+            print(f"❌ 기록 파일 {args.capture}가 이미 있습니다. 다른 파일 이름을 사용해주세요.")
+            return
+        print(f"🎙️ 트래픽 기록: {args.capture}")
     
     # 서버 시작
-    server = HospitalChatbotServer(args.host, args.port)
+    server = HospitalChatbotServer(args.host, args.port, args.workers, args.emergency_workers, args.admin_token,
+                                   args.session_snapshot, args.drain_timeout, args.ready_timeout)
     server.start()
 
 if __name__ == "__main__":
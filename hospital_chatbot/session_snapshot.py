@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+세션 스냅샷
+서버를 정상 종료할 때 세션별 네비게이션 위치·사용자 이름을 gzip JSON lines 파일로 저장하고,
+다시 시작하면 파일은 세션 ID → 상태 튜플로만 읽어 두었다가 그 세션의 첫 요청에서 챗봇 세션을 복원
+배포 후에도 간호사가 보던 화면이 유지되고, 재시작 직후 세션이 한꺼번에 다시 만들어지지 않음
+(대화 기록은 저장하지 않음)
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime
+
+SNAPSHOT_VERSION = 1
+
+def save_snapshot(path, sessions):
+    """
+    세션 상태를 파일에 저장 (임시 파일에 한 줄씩 쓴 뒤 교체 - 쓰는 도중 종료되어도 이전 파일 유지)
+    Args:
+        sessions (iterable): (세션 ID, 테넌트 ID, export_state() 결과)
+    Returns:
+        int: 저장한 세션 수
+    """
+    temp_path = f"{path}.tmp"
+    count = 0
+    with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "version": SNAPSHOT_VERSION,
+            "saved": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }) + "\n")
+        for session_id, tenant_id, state in sessions:
+            f.write(json.dumps({"id": session_id, "t": tenant_id, **state},
+                               ensure_ascii=False, separators=(",", ":")) + "\n")
+            count += 1
+    os.replace(temp_path, path)
+    return count
+
+def load_snapshot(path):
+    """
+    저장된 세션 상태 읽기 (챗봇 세션은 만들지 않음)
+    Returns:
+        dict: 세션 ID → (테넌트 ID, 상태 dict) - 파일이 없거나 형식이 다르면 빈 dict
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    pending = {}
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("version") != SNAPSHOT_VERSION:
+                print(f"⚠️ 세션 스냅샷 형식이 다릅니다: {path}")
+                return {}
+            for line in f:
+                entry = json.loads(line)
+                pending[entry.pop("id")] = (entry.pop("t"), entry)
+    except (OSError, EOFError, ValueError, KeyError) as e:
+        print(f"⚠️ 세션 스냅샷을 읽지 못했습니다 ({e}) - 읽은 {len(pending)}개만 복원")
+    return pending
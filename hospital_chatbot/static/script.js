@@ -9,6 +9,11 @@ let isTyping = false;
 let sessionId = null;
 let currentNavigationLevel = 0;
 
+// 검색창 자동완성: 입력이 멈춘 뒤 요청하고, 새 입력이 오면 이전 요청 취소
+const SUGGEST_DEBOUNCE_MS = 120;
+let suggestTimer = null;
+let suggestController = null;
+
 // DOM 요소 참조
 const messageInput = document.getElementById('messageInput');
 const sendButton = document.getElementById('sendButton');
@@ -118,6 +123,9 @@ async function sendMessage() {
         } else if (error.message.includes('HTTP 500')) {
             errorMessage = '서버에서 오류가 발생했습니다. 잠시 후 다시 시도해주세요.';
             errorTitle = '서버 오류';
+        } else if (error.message.includes('HTTP 429')) {
+            errorMessage = '요청이 너무 잦습니다. 잠시 후 다시 시도해주세요.';
+            errorTitle = '요청 제한';
         } else if (error.message.includes('HTTP 400')) {
             errorMessage = '요청이 올바르지 않습니다. 메시지를 다시 입력해주세요.';
             errorTitle = '요청 오류';
@@ -576,6 +584,7 @@ function hideSearchInput() {
     searchContainer.style.display = 'none';
     navigationButtons.style.display = 'flex';
     searchInput.value = '';
+    clearSearchSuggestions();
 }
 
 /**
@@ -623,6 +632,103 @@ function setupSearchInput() {
                 hideSearchInput();
             }
         });
+        
+        // 입력 중 자동완성
+        searchInput.addEventListener('input', scheduleSearchSuggest);
+    }
+}
+
+/**
+ * 자동완성 요청 예약 (마지막 입력 후 한 번만 요청)
+ */
+function scheduleSearchSuggest() {
+    const searchInput = document.getElementById('searchInput');
+    const prefix = searchInput.value.trim();
+    
+    clearTimeout(suggestTimer);
+    if (!prefix) {
+        clearSearchSuggestions();
+        return;
+    }
+    suggestTimer = setTimeout(() => fetchSearchSuggestions(prefix), SUGGEST_DEBOUNCE_MS);
+}
+
+/**
+ * 자동완성 후보 조회 - 진행 중인 이전 요청은 취소
+ */
+async function fetchSearchSuggestions(prefix) {
+    if (suggestController) {
+        suggestController.abort();
+    }
+    suggestController = new AbortController();
+    
+    try {
+        // 입력 중 검색 결과도 함께 요청 (세션이 있으면 서버가 이전 입력의 후보를 이어서 사용)
+        let url = `/suggest?q=${encodeURIComponent(prefix)}&limit=5&results=3`;
+        if (sessionId) {
+            url += `&session_id=${encodeURIComponent(sessionId)}`;
+        }
+        const response = await fetch(url, {
+            signal: suggestController.signal
+        });
+        if (!response.ok) return;
+        
+        const data = await response.json();
+        // 응답 사이에 입력이 바뀌었으면 무시
+        if (data.query === document.getElementById('searchInput').value.trim()) {
+            renderSearchSuggestions(data.suggestions, data.results);
+        }
+    } catch (error) {
+        if (error.name !== 'AbortError') {
+            console.error('자동완성 오류:', error);
+        }
+    }
+}
+
+/**
+ * 자동완성 후보와 입력 중 검색 결과 표시 (같은 화면은 한 번만) - 선택하면 해당 항목으로 검색
+ */
+function renderSearchSuggestions(suggestions, results) {
+    const suggestionList = document.getElementById('searchSuggestions');
+    if (!suggestionList) return;
+    
+    const paths = new Set((suggestions || []).map(suggestion => suggestion.path));
+    suggestions = (suggestions || []).concat((results || []).filter(result => !paths.has(result.path)));
+    
+    suggestionList.innerHTML = '';
+    if (suggestions.length === 0) {
+        suggestionList.style.display = 'none';
+        return;
+    }
+    
+    suggestions.forEach(suggestion => {
+        const item = document.createElement('button');
+        item.className = 'suggestion-item';
+        item.textContent = suggestion.text;
+        item.title = suggestion.label;
+        item.onclick = () => {
+            sendQuickMessage(suggestion.button.text);
+            hideSearchInput();
+        };
+        suggestionList.appendChild(item);
+    });
+    suggestionList.style.display = 'flex';
+}
+
+/**
+ * 자동완성 후보 숨김 및 대기 중인 요청 취소
+ */
+function clearSearchSuggestions() {
+    clearTimeout(suggestTimer);
+    if (suggestController) {
+        suggestController.abort();
+        suggestController = null;
+    }
+    
+    const suggestionList = document.getElementById('searchSuggestions');
+    if (suggestionList) {
+        suggestionList.innerHTML = '';
+        suggestionList.style.display = 'none';
     }
 }
 
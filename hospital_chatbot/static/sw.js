@@ -0,0 +1,141 @@
+/**
+ * 병원 간호사 도우미 챗봇 - 서비스 워커
+ * 화면(HTML/CSS/JS)과 카탈로그 번들을 캐시하여 Wi-Fi 음영 지역에서도 동작
+ *
+ * - 정적 파일과 카탈로그: stale-while-revalidate (캐시 즉시 응답 후 백그라운드 갱신)
+ * - 캐시 이름에 서버의 카탈로그 버전을 붙여 버전이 바뀌면 새 캐시로 교체
+ * - /chat 등 POST 요청은 캐시하지 않음 (오프라인 질문은 페이지에서 대기열 처리)
+ */
+
+// 병동/병원(테넌트) - 페이지가 /sw.js?tenant=ID 로 등록하면 그 테넌트의 카탈로그를 캐시
+const TENANT_QUERY = self.location.search;
+const CATALOGUE_URL = '/catalogue' + TENANT_QUERY;
+
+const CACHE_PREFIX = 'ward-chatbot-';
+const SHELL_URLS = [
+    '/',
+    '/static/style.css',
+    '/static/script.js',
+    CATALOGUE_URL
+];
+
+/**
+ * 서버의 현재 카탈로그 버전 조회 (실패 시 null)
+ */
+async function fetchCatalogueVersion() {
+    try {
+        const response = await fetch('/catalogue/version' + TENANT_QUERY, { cache: 'no-store' });
+        if (!response.ok) return null;
+        const data = await response.json();
+        return data.version;
+    } catch (error) {
+        return null;
+    }
+}
+
+/**
+ * 현재 사용 중인 캐시 이름 (가장 최근 버전)
+ */
+async function currentCacheName() {
+    const names = await caches.keys();
+    const ours = names.filter(name => name.startsWith(CACHE_PREFIX));
+    return ours.length > 0 ? ours[ours.length - 1] : null;
+}
+
+/**
+ * 지정한 버전의 캐시를 채우고 이전 버전 캐시 삭제
+ */
+async function installVersion(version) {
+    const cacheName = CACHE_PREFIX + version;
+    const cache = await caches.open(cacheName);
+    await cache.addAll(SHELL_URLS);
+
+    const names = await caches.keys();
+    await Promise.all(
+        names
+            .filter(name => name.startsWith(CACHE_PREFIX) && name !== cacheName)
+            .map(name => caches.delete(name))
+    );
+    return cacheName;
+}
+
+/**
+ * 카탈로그 버전이 바뀌었으면 캐시를 교체하고 열린 화면에 알림
+ */
+async function checkForUpdate() {
+    const version = await fetchCatalogueVersion();
+    if (!version) return;
+
+    const cacheName = await currentCacheName();
+    if (cacheName === CACHE_PREFIX + version) return;
+
+    await installVersion(version);
+    const clients = await self.clients.matchAll();
+    clients.forEach(client => client.postMessage({ type: 'catalogue-updated', version: version }));
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        fetchCatalogueVersion()
+            .then(version => installVersion(version || 'offline'))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(self.clients.claim());
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+
+    if (request.method !== 'GET' || url.origin !== self.location.origin) {
+        return;
+    }
+
+    // 카탈로그는 테넌트 쿼리까지 포함한 주소로 구분
+    let path = url.pathname === '/index.html' ? '/' : url.pathname;
+    if (path === '/catalogue') {
+        path += url.search;
+    }
+    if (!SHELL_URLS.includes(path)) {
+        return;
+    }
+
+    // 페이지를 열 때마다 백그라운드로 카탈로그 버전 확인
+    if (request.mode === 'navigate') {
+        event.waitUntil(checkForUpdate());
+    }
+
+    event.respondWith(staleWhileRevalidate(event, path));
+});
+
+/**
+ * 캐시된 응답을 즉시 반환하고 네트워크 응답으로 캐시 갱신
+ */
+async function staleWhileRevalidate(event, path) {
+    const cacheName = (await currentCacheName()) || CACHE_PREFIX + 'offline';
+    const cache = await caches.open(cacheName);
+    const cached = await cache.match(path);
+
+    const network = fetch(path)
+        .then(response => {
+            if (response.ok) {
+                cache.put(path, response.clone());
+            }
+            return response;
+        })
+        .catch(() => null);
+
+    if (cached) {
+        event.waitUntil(network);
+        return cached;
+    }
+
+    const response = await network;
+    return response || new Response('오프라인 상태입니다.', {
+        status: 503,
+        headers: { 'Content-Type': 'text/plain; charset=utf-8' }
+    });
+}
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+무중단 재시작 (server.py --supervise)
+감독 프로세스가 리스닝 소켓을 직접 열어 두고 서버 프로세스에 파일 디스크립터로 넘겨 실행
+SIGHUP을 받으면 같은 인자로 새 서버 프로세스를 띄워 카탈로그 로딩이 끝날 때까지 기다린 뒤,
+기존 프로세스를 정상 종료(accept 중지, 진행 중인 요청 drain, 세션 스냅샷 저장)시키고 새 프로세스가 이어서 accept
+소켓은 감독 프로세스가 계속 가지고 있으므로 교체 중에 들어온 연결은 거절되지 않고 대기열에서 기다림
+(SO_REUSEPORT는 닫히는 소켓의 대기열에 있던 연결이 끊기므로 사용하지 않음)
+세션은 기존 프로세스가 종료하며 저장한 스냅샷으로만 이어지므로 --session-snapshot 없이 실행하면
+재시작할 때마다 모든 세션(보던 화면, 사용자 이름)이 초기화됨
+
+    python3 server.py --supervise --session-snapshot sessions.jsonl.gz
+    kill -HUP <감독 프로세스 PID>      # 배포·카탈로그 갱신 후 재시작
+"""
+
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+# 서버 프로세스에 넘기는 환경 변수 (리스닝 소켓 fd, "준비 알림 fd,시작 허가 fd")
+LISTEN_FD_ENV = "CHATBOT_LISTEN_FD"
+HANDOFF_FDS_ENV = "CHATBOT_HANDOFF_FDS"
+
+# 감독 프로세스 소켓의 연결 대기열 길이 (교체 중 accept가 잠시 멈춰도 연결을 받아 둠)
+LISTEN_BACKLOG = 256
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+
+def inherited_fds():
+    """
+    감독 프로세스가 넘긴 fd (서버 프로세스에서 호출 - 자식 프로세스에 다시 넘어가지 않도록 환경 변수 삭제)
+    Returns:
+        tuple: (리스닝 소켓 fd, 준비 알림 fd, 시작 허가 fd) - 감독 없이 실행되었으면 모두 None
+    """
+    listen_fd = os.environ.pop(LISTEN_FD_ENV, None)
+    handoff = os.environ.pop(HANDOFF_FDS_ENV, None)
+    if listen_fd is None:
+        return None, None, None
+    ready_fd, go_fd = (int(fd) for fd in handoff.split(",")) if handoff else (None, None)
+    return int(listen_fd), ready_fd, go_fd
+
+def notify_ready(ready_fd, ready):
+    """감독 프로세스에 준비 완료(카탈로그 로드 성공) 여부 알림"""
+    try:
+        if ready:
+            os.write(ready_fd, b"1")
+    finally:
+        os.close(ready_fd)
+
+def wait_for_turn(go_fd):
+    """기존 서버 프로세스가 종료(세션 스냅샷 저장)될 때까지 대기 - 감독 프로세스가 fd를 닫으면 진행"""
+    try:
+        while os.read(go_fd, 1):
+            pass
+    finally:
+        os.close(go_fd)
+
+class WorkerProcess:
+    """감독 프로세스가 실행한 서버 프로세스 하나"""
+    
+    def __init__(self, process, ready_fd, go_fd):
+        self.process = process
+        self._ready_fd = ready_fd
+        self._go_fd = go_fd
+    
+    @property
+    def pid(self):
+        return self.process.pid
+    
+    def wait_ready(self, timeout):
+        """카탈로그 로드가 끝났다는 알림 대기 - Returns: 준비되었으면 True (실패·시간 초과는 False)"""
+        try:
+            readable, _, _ = select.select([self._ready_fd], [], [], timeout)
+            return bool(readable) and os.read(self._ready_fd, 1) == b"1"
+        finally:
+            os.close(self._ready_fd)
+    
+    def go(self):
+        """accept 시작 허가"""
+        os.close(self._go_fd)
+    
+    def stop(self, timeout):
+        """정상 종료 요청 (SIGTERM) 후 대기 - 시간 안에 끝나지 않으면 강제 종료"""
+        if self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            print(f"⚠️ 서버 프로세스 {self.pid}가 {timeout:.0f}초 안에 종료되지 않아 강제 종료합니다.")
+            self.process.kill()
+            self.process.wait()
+
+class Supervisor:
+    """리스닝 소켓을 가진 감독 프로세스 - 서버 프로세스 실행, 재시작(SIGHUP), 비정상 종료 시 다시 실행"""
+    
+    def __init__(self, host, port, server_args, ready_timeout=120.0, stop_timeout=30.0):
+        """
+        Args:
+            server_args (list): 서버 프로세스 실행 인자 (--supervise 제외)
+            ready_timeout (float): 새 서버 프로세스의 카탈로그 로드 대기 시간 (초)
+            stop_timeout (float): 기존 서버 프로세스 정상 종료 대기 시간 (초, drain 시간보다 길게)
+        """
+        self.host = host
+        self.port = port
+        self.server_args = server_args
+        self.ready_timeout = ready_timeout
+        self.stop_timeout = stop_timeout
+        self.socket = None
+        self.current = None
+        self._action = None
+    
+    def _spawn(self):
+        """리스닝 소켓과 준비 알림/시작 허가 파이프를 넘겨 서버 프로세스 실행"""
+        ready_read, ready_write = os.pipe()
+        go_read, go_write = os.pipe()
+        listen_fd = self.socket.fileno()
+        env = dict(os.environ)
+        env[LISTEN_FD_ENV] = str(listen_fd)
+        env[HANDOFF_FDS_ENV] = f"{ready_write},{go_read}"
+        process = subprocess.Popen(
+            [sys.executable, SERVER_SCRIPT] + self.server_args,
+            env=env, pass_fds=(listen_fd, ready_write, go_read)
+        )
+        os.close(ready_write)
+        os.close(go_read)
+        return WorkerProcess(process, ready_read, go_write)
+    
+    def _start_first(self):
+        """첫 서버 프로세스 실행 - Returns: 준비되었으면 True"""
+        worker = self._spawn()
+        if not worker.wait_ready(self.ready_timeout):
+            worker.stop(self.stop_timeout)
+            worker.go()
+            return False
+        worker.go()
+        self.current = worker
+        return True
+    
+    def restart(self):
+        """새 서버 프로세스가 준비되면 기존 프로세스를 정상 종료시키고 교체 (준비 실패 시 기존 유지)"""
+        print(f"🔄 새 서버 프로세스 시작 (기존 {self.current.pid})")
+        worker = self._spawn()
+        if not worker.wait_ready(self.ready_timeout):
+            print("❌ 새 서버 프로세스가 준비되지 않아 기존 프로세스로 계속 서비스합니다.")
+            worker.stop(self.stop_timeout)
+            worker.go()
+            return
+        self.current.stop(self.stop_timeout)
+        worker.go()
+        print(f"✅ 재시작 완료 (서버 프로세스 {self.current.pid} → {worker.pid})")
+        self.current = worker
+    
+    def _request(self, action):
+        """시그널 처리기 - 메인 루프에서 처리할 작업 기록"""
+        def handler(signum, frame):
+            self._action = action
+        return handler
+    
+    def run(self):
+        """감독 루프 - Returns: 종료 코드"""
+        try:
+            self.socket = socket.create_server((self.host, self.port), backlog=LISTEN_BACKLOG)
+        except OSError as e:
+            print(f"❌ 포트 {self.port}를 열 수 없습니다: {e}")
+            return 1
+        
+        signal.signal(signal.SIGHUP, self._request("restart"))
+        signal.signal(signal.SIGTERM, self._request("stop"))
+        signal.signal(signal.SIGINT, self._request("stop"))
+        print(f"👀 감독 프로세스 {os.getpid()}: http://{self.host}:{self.port} (재시작: kill -HUP {os.getpid()})")
+        
+        if not self._start_first():
+            print("❌ 서버 프로세스를 시작하지 못했습니다.")
+            return 1
+        
+        while True:
+            time.sleep(0.2)
+            action, self._action = self._action, None
+            if action == "stop":
+                self.current.stop(self.stop_timeout)
+                self.socket.close()
+                return 0
+            if action == "restart":
+                self.restart()
+            elif self.current.process.poll() is not None:
+                print(f"⚠️ 서버 프로세스 {self.current.pid}가 종료되었습니다 (코드 {self.current.process.returncode}) - 다시 시작")
+                time.sleep(1.0)
+                self._start_first()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+검색용 동의어·약어 묶음 (엑셀 원본 데이터와 함께 관리)
+카탈로그의 영문 장비명·약어와 병동에서 부르는 이름을 한 묶음으로 적으면,
+자동완성·오타 허용·입력 중 검색은 엔진 생성 시 항목에 나오는 표기의 나머지 표기를 색인에 덧붙이고,
+자유텍스트 검색은 검색어에 나오는 표기를 나머지 표기로 바꾼 검색어로 함께 검색 (항목 점수는 원문 기준)
+- 대소문자 구분 없음, 영문 표기와 두 글자 이하 한글 표기("석션", "소변")는 단어 단위로,
+  세 글자 이상 한글 표기는 부분 문자열로 일치 (조사가 붙은 "석션을"은 일치하지 않음)
+- 뜻이 더 넓은 표기("혈당", "산소", "혈압")는 같은 묶음에 넣지 않음 (그 말이 나오는 항목·검색어마다 장비명이 덧붙음)
+"""
+
+SYNONYM_GROUPS = [
+    # 의료기기
+    ["심전도", "ekg", "ecg"],
+    ["산소포화도", "spo2", "oximeter", "옥시미터", "pulse oximeter"],
+    ["인퓨전펌프", "infusion pump", "inpusion pump", "수액펌프", "주입펌프"],
+    ["혈압계", "nibp", "비침습혈압"],
+    ["제세동기", "defibrillator", "defib", "디피브"],
+    ["고유량 산소", "hfnc", "high flow", "하이플로우"],
+    ["네뷸라이저", "nebulizer", "neb", "네블라이저"],
+    ["석션", "suction", "흡인기"],
+    ["엠부", "ambu", "앰부", "앰부백"],
+    ["혈당측정기", "bst", "glucometer"],
+    ["중심정맥관", "picc", "픽라인"],
+    ["레빈튜브", "l-tube", "levin tube", "비위관"],
+    ["넬라톤", "nelaton", "넬라톤 카테터"],
+    ["인슐린펜", "pen needle", "펜니들"],
+    # 전자·통신기기
+    ["컴퓨터", "pc", "피씨"],
+    ["와이파이", "wifi", "wi-fi", "무선인터넷"],
+    ["인터넷 전화", "ip phone", "아이피폰"],
+    ["티비", "tv", "텔레비전"],
+    ["콜벨", "call bell", "너스콜", "호출벨"],
+    # 검체·물품
+    ["소변", "urine"],
+    ["대변", "stool"],
+    ["객담", "sputum"],
+    ["정도관리", "qc"],
+    # 감염·부서·시스템
+    ["반코마이신내성장알균", "vre"],
+    ["카바페넴내성장내세균", "cpe", "cre"],
+    ["코로나", "coronavirus", "covid", "covid-19"],
+    ["중환자실", "icu"],
+    ["처방전달시스템", "cpoe"],
+]
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+병동/병원(테넌트)별 카탈로그
+한 프로세스에서 여러 카탈로그를 제공하고 (테넌트마다 엔진·인덱스·화면은 따로),
+카탈로그 텍스트는 프로세스 전체 문자열 풀에 한 번만 저장하여
+연락처("📞 의공기술실: T.9233"), DARWIN 경로처럼 테넌트마다 같은 문자열은 공유
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+
+DEFAULT_TENANT = "default"
+
+# 테넌트 ID 형식 (파일 이름으로도 쓰므로 경로 구분자 등은 허용하지 않음)
+TENANT_ID_PATTERN = re.compile(r"[a-z0-9][a-z0-9_-]{0,31}")
+
+class StringPool:
+    """프로세스 전체 문자열 풀 - 같은 내용의 문자열은 객체 하나만 보관"""
+    
+    def __init__(self):
+        self._strings = {}
+        self._lock = threading.Lock()
+        self.references = 0   # intern 요청 수 (중복 포함)
+    
+    def intern(self, text):
+        """풀에 있는 같은 문자열 객체 반환 (없으면 등록)"""
+        self.references += 1
+        return self._strings.setdefault(text, text)
+    
+    def intern_data(self, value):
+        """딕셔너리/리스트/튜플 안의 모든 문자열(키 포함)을 풀의 객체로 바꾼 사본"""
+        with self._lock:
+            return self._intern_value(value)
+    
+    def _intern_value(self, value):
+        """intern_data 재귀 처리 (잠금을 잡은 상태에서 호출)"""
+        if isinstance(value, str):
+            return self.intern(value)
+        if isinstance(value, dict):
+            return {self._intern_value(key): self._intern_value(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._intern_value(item) for item in value]
+        if isinstance(value, tuple):
+            return tuple(self._intern_value(item) for item in value)
+        return value
+    
+    def snapshot(self):
+        """메모리 보고용 사본 (잠금을 잡고 복사)"""
+        with self._lock:
+            return dict(self._strings)
+    
+    def stats(self):
+        """상태 확인용 집계 (bytes는 풀에 보관 중인 문자열 크기 합계)"""
+        with self._lock:
+            return {
+                "strings": len(self._strings),
+                "references": self.references,
+                "bytes": sum(sys.getsizeof(text) for text in self._strings)
+            }
+
+# 모든 테넌트의 카탈로그 데이터와 사전 렌더링 화면이 함께 쓰는 풀
+string_pool = StringPool()
+
+# 코드에서 등록한 테넌트 데이터 (테넌트 ID → 계층 데이터)
+# 기본 테넌트는 처음 쓸 때 excel_data에서 읽음 (서버 소켓 바인딩 전에 카탈로그를 읽지 않도록)
+_registered = {DEFAULT_TENANT: None}
+
+# 테넌트 카탈로그 JSON 디렉토리 (<테넌트 ID>.json, HIERARCHICAL_WORK_DATA 형식)
+_tenants_dir = None
+
+def configure(tenants_dir=None):
+    """테넌트 카탈로그 디렉토리 설정 (서버 시작 시)"""
+    global _tenants_dir
+    _tenants_dir = tenants_dir
+
+def register_tenant(tenant_id, data):
+    """테넌트 카탈로그 데이터 등록 (파일보다 우선)"""
+    _registered[tenant_id] = data
+
+def is_valid_tenant_id(tenant_id):
+    """테넌트 ID 형식 확인 (영문 소문자, 숫자, -, _ 최대 32자)"""
+    return bool(tenant_id) and TENANT_ID_PATTERN.fullmatch(tenant_id) is not None
+
+def _tenant_path(tenant_id):
+    """테넌트 카탈로그 파일 경로"""
+    return os.path.join(_tenants_dir, f"{tenant_id}.json")
+
+def tenant_exists(tenant_id):
+    """등록되었거나 카탈로그 파일이 있는 테넌트인지"""
+    if tenant_id in _registered:
+        return True
+    return _tenants_dir is not None and is_valid_tenant_id(tenant_id) and os.path.isfile(_tenant_path(tenant_id))
+
+def tenant_data(tenant_id):
+    """
+    테넌트 카탈로그 데이터 (파일은 호출할 때마다 다시 읽음 - 재로드용)
+    Raises:
+        KeyError: 등록되지 않은 테넌트
+    """
+    if tenant_id == DEFAULT_TENANT and _registered.get(DEFAULT_TENANT) is None:
+        from excel_data import HIERARCHICAL_WORK_DATA
+        _registered[DEFAULT_TENANT] = HIERARCHICAL_WORK_DATA
+    if tenant_id in _registered:
+        return _registered[tenant_id]
+    if not tenant_exists(tenant_id):
+        raise KeyError(tenant_id)
+    with open(_tenant_path(tenant_id), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def available_tenants():
+    """제공 가능한 테넌트 ID 목록"""
+    tenant_ids = set(_registered)
+    if _tenants_dir is not None and os.path.isdir(_tenants_dir):
+        for name in os.listdir(_tenants_dir):
+            tenant_id, extension = os.path.splitext(name)
+            if extension == ".json" and is_valid_tenant_id(tenant_id):
+                tenant_ids.add(tenant_id)
+    return sorted(tenant_ids)
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+요청 추적
+채팅 요청마다 trace ID를 붙이고 (응답 헤더 X-Trace-ID) 대기열 대기, 세션 조회, 매칭 단계, 검색,
+렌더링, 직렬화 구간을 span으로 기록
+요청이 끝난 뒤 보관 여부를 정하고 (느린 요청·오류는 전부, 나머지는 일부만 - tail sampling)
+보관할 trace는 별도 스레드에서 묶어 OpenTelemetry(OTLP JSON) 형태의 JSON lines 파일로 내보냄
+집계 지표로는 알 수 없는 "이 요청은 왜 느렸나"를 요청 단위로 확인하기 위함
+"""
+
+import contextlib
+import json
+import os
+import queue
+import random
+import socket
+import threading
+import time
+
+SERVICE_NAME = "hospital-chatbot"
+SCOPE_NAME = "hospital_chatbot"
+
+# OTLP span 종류와 상태 코드
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_CODE_ERROR = 2
+
+TRACE_FILE_NAME = "traces.jsonl"
+
+def _new_id(bits):
+    """trace/span ID (16진수 문자열)"""
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+class Span:
+    """구간 하나 (요청 처리 스레드에서만 변경)"""
+    __slots__ = ("name", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes", "error")
+    
+    def __init__(self, name, parent_id=None, kind=SPAN_KIND_INTERNAL, attributes=None, start_ns=None):
+        self.name = name
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.error = None
+    
+    def set(self, key, value):
+        """속성 추가"""
+        self.attributes[key] = value
+    
+    def end(self, end_ns=None):
+        """구간 종료"""
+        self.end_ns = end_ns or time.time_ns()
+    
+    @property
+    def duration_ms(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+    
+    def to_otlp(self, trace_id):
+        """OTLP JSON span"""
+        span = {
+            "traceId": trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {}
+        }
+        if self.error:
+            span["status"] = {"code": STATUS_CODE_ERROR, "message": self.error}
+        return span
+
+class _NoopSpan:
+    """추적 중이 아닐 때 돌려주는 빈 span"""
+    __slots__ = ()
+    
+    def set(self, key, value):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+def _otlp_attribute(key, value):
+    """OTLP JSON 속성 (int64는 문자열로 표기)"""
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+class Trace:
+    """요청 하나의 span 모음"""
+    
+    def __init__(self, name, attributes=None, start_ns=None):
+        self.trace_id = _new_id(128)
+        self.root = Span(name, kind=SPAN_KIND_SERVER, attributes=attributes, start_ns=start_ns)
+        self.spans = [self.root]
+        self.stack = [self.root]
+    
+    def to_otlp(self):
+        """OTLP JSON ExportTraceServiceRequest (trace 하나)"""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    _otlp_attribute("service.name", SERVICE_NAME),
+                    _otlp_attribute("host.name", socket.gethostname()),
+                    _otlp_attribute("process.pid", os.getpid())
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": SCOPE_NAME},
+                    "spans": [span.to_otlp(self.trace_id) for span in self.spans]
+                }]
+            }]
+        }
+
+class SpanExporter:
+    """
+    trace 비동기 내보내기
+    요청 스레드는 대기열에 넣기만 하고, 내보내기 스레드가 batch_size개 또는 flush_interval초마다 묶어서
+    <디렉토리>/traces.jsonl에 한 줄에 trace 하나씩 기록 (max_bytes를 넘으면 traces.jsonl.1 … 로 교체)
+    """
+    
+    def __init__(self, directory, max_bytes=10 * 1024 * 1024, backup_count=5,
+                 batch_size=64, flush_interval=1.0, maxsize=10000):
+        """
+        Args:
+            directory (str): 파일을 쓸 디렉토리 (없으면 생성)
+            max_bytes (int): 파일 하나의 최대 크기
+            backup_count (int): 보관할 이전 파일 수
+            maxsize (int): 대기열 최대 길이 - 가득 차면 trace를 버리고 요청은 지연시키지 않음
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, TRACE_FILE_NAME)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize)
+        self.exported = 0
+        self.dropped = 0
+        self.batches = 0
+        threading.Thread(target=self._run, name="span-exporter", daemon=True).start()
+    
+    def export(self, trace):
+        """trace 내보내기 예약 (기다리지 않음)"""
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _run(self):
+        """내보내기 루프 - 첫 trace를 받은 뒤 flush_interval 동안 모아서 한 번에 기록"""
+        while True:
+            batch = [self._queue.get()]
+            flush_at = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = flush_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"trace 내보내기 오류: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _write(self, batch):
+        """trace 묶음을 파일에 추가"""
+        data = "".join(
+            json.dumps(trace.to_otlp(), ensure_ascii=False, separators=(",", ":")) + "\n" for trace in batch
+        ).encode("utf-8")
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size and size + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "ab") as f:
+            f.write(data)
+        self.exported += len(batch)
+        self.batches += 1
+    
+    def _rotate(self):
+        """traces.jsonl → traces.jsonl.1 → … → traces.jsonl.<backup_count> (가장 오래된 파일은 삭제)"""
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+    
+    def flush(self, timeout=2.0):
+        """대기열의 trace를 모두 기록할 때까지 대기 (서버 종료 시)"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+    
+    def stats(self):
+        """상태 확인용 집계"""
+        return {
+            "path": self.path,
+            "exported": self.exported,
+            "batches": self.batches,
+            "pending": self._queue.qsize(),
+            "dropped": self.dropped
+        }
+
+class Tracer:
+    """
+    요청 추적기 - 현재 trace는 작업자 스레드별로 보관 (요청 하나를 스레드 하나가 처리)
+    trace가 없는 스레드에서 span()을 호출하면 아무것도 기록하지 않음
+    """
+    
+    def __init__(self, exporter=None, slow_ms=500.0, sample_rate=0.01):
+        """
+        Args:
+            exporter (SpanExporter): 내보내기 (없으면 trace ID만 붙이고 기록은 버림)
+            slow_ms (float): 이 시간 이상 걸린 요청은 항상 보관
+            sample_rate (float): 빠르고 정상인 요청 중 보관할 비율 (0~1)
+        """
+        self._local = threading.local()
+        self.configure(exporter, slow_ms, sample_rate)
+        self.started = 0
+        self.kept = 0
+        self.sampled_out = 0
+    
+    def configure(self, exporter=None, slow_ms=500.0, sample_rate=0.01):
+        """내보내기와 샘플링 설정 (서버 시작 시)"""
+        self.exporter = exporter
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+    
+    def current(self):
+        """이 스레드에서 진행 중인 trace (없으면 None)"""
+        return getattr(self._local, "trace", None)
+    
+    def start(self, name, arrived_at=None, queued_seconds=0.0, attributes=None):
+        """
+        trace 시작 - 연결 접수 시각(arrived_at, perf_counter 기준)을 주면 root span을 그 시각부터 잡고
+        대기열에서 기다린 구간을 queue.wait span으로 기록
+        """
+        now_ns = time.time_ns()
+        start_ns = now_ns
+        if arrived_at is not None:
+            start_ns -= int((time.perf_counter() - arrived_at) * 1e9)
+        trace = Trace(name, attributes, start_ns)
+        if queued_seconds:
+            wait = Span("queue.wait", trace.root.span_id, start_ns=start_ns)
+            wait.end(start_ns + int(queued_seconds * 1e9))
+            trace.spans.append(wait)
+        self._local.trace = trace
+        self.started += 1
+        return trace
+    
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        """구간 기록 (with tracer.span("search") as span: ...) - 예외가 나면 오류로 표시"""
+        trace = self.current()
+        if trace is None:
+            yield _NOOP_SPAN
+            return
+        
+        span = Span(name, trace.stack[-1].span_id, attributes=attributes)
+        trace.spans.append(span)
+        trace.stack.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end()
+            trace.stack.pop()
+    
+    def annotate(self, **attributes):
+        """현재 구간에 속성 추가 (추적 중이 아니면 무시)"""
+        trace = self.current()
+        if trace is not None:
+            trace.stack[-1].attributes.update(attributes)
+    
+    def set_status(self, status_code):
+        """응답 상태 코드 기록 (5xx는 오류)"""
+        trace = self.current()
+        if trace is not None:
+            trace.root.set("http.response.status_code", status_code)
+            if status_code >= 500:
+                trace.root.error = f"HTTP {status_code}"
+    
+    def finish(self):
+        """
+        trace 종료 - 느린 요청과 오류는 항상, 나머지는 sample_rate 비율로 내보냄
+        Returns:
+            Trace: 종료한 trace (진행 중인 trace가 없었으면 None)
+        """
+        trace = self.current()
+        if trace is None:
+            return None
+        self._local.trace = None
+        trace.root.end()
+        
+        if trace.root.error or any(span.error for span in trace.spans):
+            reason = "error"
+        elif trace.root.duration_ms >= self.slow_ms:
+            reason = "slow"
+        elif random.random() < self.sample_rate:
+            reason = "sampled"
+        else:
+            self.sampled_out += 1
+            return trace
+        
+        trace.root.set("sampling.reason", reason)
+        self.kept += 1
+        if self.exporter is not None:
+            self.exporter.export(trace)
+        return trace
+    
+    def stats(self):
+        """상태 확인용 집계"""
+        return {
+            "started": self.started,
+            "kept": self.kept,
+            "sampled_out": self.sampled_out,
+            "slow_ms": self.slow_ms,
+            "sample_rate": self.sample_rate,
+            "exporter": self.exporter.stats() if self.exporter else None
+        }
+
+# 프로세스 전체에서 하나 (서버 시작 시 configure로 내보내기 설정)
+tracer = Tracer()
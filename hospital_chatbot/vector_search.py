@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+해시 문자 n-gram 벡터 검색
+세부항목2의 free_text를 2·3글자 n-gram 해시 벡터로 만들어 하나의 행렬에 담고,
+검색어(또는 검색어 묶음)를 행렬 곱 한 번으로 전체 항목과 점수 계산
+NumPy가 있으면 행렬 연산과 argpartition을 사용하고, 없으면 순수 파이썬 역색인으로 동작
+"""
+
+import heapq
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 없이도 동작 (순수 파이썬 경로)
+    np = None
+
+# n-gram 길이별 검색어 가중치 (match_score의 2글자 2점, 3글자 연장 보너스 2점과 같은 비율)
+NGRAM_WEIGHTS = {2: 2, 3: 2}
+
+def hashed_ngrams(text, dimensions):
+    """
+    텍스트의 n-gram 해시 버킷별 등장 횟수
+    프로세스마다 달라지는 hash() 대신 crc32를 사용하여 오프라인 평가와 결과가 같음
+    """
+    counts = {}
+    for n, weight in NGRAM_WEIGHTS.items():
+        for i in range(len(text) - n + 1):
+            bucket = zlib.crc32(text[i:i + n].encode('utf-8')) % dimensions
+            counts[bucket] = counts.get(bucket, 0) + weight
+    return counts
+
+class HashedNgramIndex:
+    """항목 텍스트의 해시 n-gram 존재 여부 행렬 (항목 수 × dimensions)"""
+    
+    def __init__(self, texts, dimensions=2048, use_numpy=None):
+        """
+        인덱스 생성 (엔진 로드 시 한 번)
+        Args:
+            texts (list): 소문자 정규화된 항목 텍스트 (순서 = 항목 번호)
+            dimensions (int): 해시 버킷 수
+            use_numpy (bool): None이면 NumPy 설치 여부로 결정
+        """
+        self.dimensions = dimensions
+        self.size = len(texts)
+        self.use_numpy = (np is not None) if use_numpy is None else (use_numpy and np is not None)
+        
+        item_buckets = [hashed_ngrams(text, dimensions).keys() for text in texts]
+        
+        if self.use_numpy:
+            self.matrix = np.zeros((self.size, dimensions), dtype=np.float32)
+            for item_id, buckets in enumerate(item_buckets):
+                self.matrix[item_id, list(buckets)] = 1.0
+        else:
+            # 버킷 → 항목 번호 목록 (희소 행렬의 열 방향 표현)
+            self.postings = {}
+            for item_id, buckets in enumerate(item_buckets):
+                for bucket in buckets:
+                    self.postings.setdefault(bucket, []).append(item_id)
+    
+    def _query_vectors(self, queries):
+        """검색어 묶음을 (검색어 수 × dimensions) 행렬로 변환"""
+        rows, buckets, weights = [], [], []
+        for row, query in enumerate(queries):
+            for bucket, weight in hashed_ngrams(query, self.dimensions).items():
+                rows.append(row)
+                buckets.append(bucket)
+                weights.append(weight)
+        
+        vectors = np.zeros((len(queries), self.dimensions), dtype=np.float32)
+        vectors[rows, buckets] = weights
+        return vectors
+    
+    def score_batch(self, queries):
+        """
+        검색어 묶음 × 전체 항목 점수
+        Returns:
+            NumPy 사용 시 (검색어 수 × 항목 수) 배열, 아니면 항목 번호 → 점수 딕셔너리 목록
+        """
+        if self.use_numpy:
+            return self._query_vectors(queries) @ self.matrix.T
+        
+        results = []
+        for query in queries:
+            scores = {}
+            for bucket, weight in hashed_ngrams(query, self.dimensions).items():
+                for item_id in self.postings.get(bucket, ()):
+                    scores[item_id] = scores.get(item_id, 0) + weight
+            results.append(scores)
+        return results
+    
+    def top_k_batch(self, queries, k, chunk_size=1024):
+        """
+        검색어마다 점수 상위 k개 항목
+        Args:
+            chunk_size (int): NumPy 사용 시 한 번에 곱할 검색어 수 (점수 행렬 메모리 상한)
+        Returns:
+            list: 검색어별 [(항목 번호, 점수)] - 점수 내림차순, 같은 점수는 항목 번호순, 0점 제외
+        """
+        if not queries or self.size == 0:
+            return [[] for _ in queries]
+        
+        k = min(k, self.size)
+        
+        if not self.use_numpy:
+            return [
+                heapq.nsmallest(k, ((item_id, score) for item_id, score in row.items() if score > 0),
+                                key=lambda pair: (-pair[1], pair[0]))
+                for row in self.score_batch(queries)
+            ]
+        
+        results = []
+        for start in range(0, len(queries), chunk_size):
+            scores = self.score_batch(queries[start:start + chunk_size])
+            
+            # 행마다 상위 k개만 부분 정렬한 뒤 그 안에서 (점수 내림차순, 항목 번호순) 정렬
+            if k < self.size:
+                candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                candidates = np.broadcast_to(np.arange(self.size), scores.shape)
+            candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+            order = np.lexsort((candidates, -candidate_scores), axis=1)
+            
+            item_rows = np.take_along_axis(candidates, order, axis=1).tolist()
+            score_rows = np.take_along_axis(candidate_scores, order, axis=1).tolist()
+            for item_ids, row_scores in zip(item_rows, score_rows):
+                results.append([
+                    (item_id, score) for item_id, score in zip(item_ids, row_scores) if score > 0
+                ])
+        return results
+    
+    def top_k(self, query, k):
+        """검색어 하나의 상위 k개 항목 [(항목 번호, 점수)]"""
+        return self.top_k_batch([query], k)[0]